@@ -0,0 +1,385 @@
+"""Offline bulk analysis of ATS exports.
+
+    python -m app.cli INPUT [INPUT ...] --output results.jsonl [options]
+
+Each INPUT is a directory (every supported document under it), a .jsonl file
+of {"id", "text"} postings, or a single document. Results are appended to the
+output file as one /analyze-batch style line per item ({"id", "success",
+"result" | "error"}) in completion order, not input order; re-running the same command skips items already in it, so
+an interrupted run resumes where it stopped. Documents are extracted in a pool
+of worker processes while the Gemini analysis runs on the event loop with a
+concurrency cap.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+from app.models.schemas import BatchItemError, BatchResultLine
+from app.services.analysis_selection import AnalysisSelection
+from app.services.batch_processor import BatchOutcome, BatchProcessor
+from app.services.result_export import export_results, require_pyarrow
+from app.utils.logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.gif', '.pdf', '.txt', '.docx', '.doc'}
+MAX_DOCUMENT_BYTES = 10 * 1024 * 1024
+# Error types of the statuses the CLI records, as in API error responses
+ERROR_TYPES = {400: "validation_error", 413: "file_too_large", 500: "internal_server_error",
+               503: "service_unavailable"}
+
+
+class WorkItem:
+    """One posting to analyze: inline text, a document to extract, or an input error"""
+
+    __slots__ = ("id", "text", "path", "error")
+
+    def __init__(self, item_id: str, text: Optional[str] = None, path: Optional[str] = None,
+                 error: Optional[str] = None):
+        self.id = item_id
+        self.text = text
+        self.path = path
+        self.error = error
+
+
+def iter_items(inputs: Iterable[str]) -> Iterator[WorkItem]:
+    """Work items of the inputs, in a stable order so IDs match between runs"""
+    for source in inputs:
+        if os.path.isdir(source):
+            for root, dirs, files in os.walk(source):
+                dirs.sort()
+                for name in sorted(files):
+                    if os.path.splitext(name)[1].lower() in DOCUMENT_EXTENSIONS:
+                        path = os.path.join(root, name)
+                        yield WorkItem(os.path.relpath(path, source), path=path)
+        elif source.endswith(".jsonl"):
+            yield from _jsonl_items(source)
+        else:
+            yield WorkItem(os.path.basename(source), path=source)
+
+
+def _jsonl_items(path: str) -> Iterator[WorkItem]:
+    with open(path, encoding="utf-8") as lines:
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            fallback_id = f"{os.path.basename(path)}:{line_number}"
+            try:
+                value = json.loads(line)
+            except ValueError:
+                yield WorkItem(fallback_id, error=f"Invalid JSON on line {line_number}")
+                continue
+            if not isinstance(value, dict) or not isinstance(value.get("text"), str):
+                yield WorkItem(fallback_id, error="Postings need a 'text' field")
+                continue
+            yield WorkItem(str(value.get("id", fallback_id)), text=value["text"])
+
+
+class ResultsCheckpoint:
+    """The results file, doubling as the record of which items are done.
+
+    A line cut short by an interrupted run is dropped when the file is opened.
+    Lines are flushed as they are written and synced to disk every
+    `sync_every` lines.
+    """
+
+    def __init__(self, path: str, sync_every: int = 20):
+        self.path = path
+        self.sync_every = sync_every
+        self.outcomes: Dict[str, bool] = {}
+        self._file: Optional[TextIO] = None
+        self._unsynced = 0
+
+    def open(self) -> "ResultsCheckpoint":
+        """Load the item outcomes already recorded (the last line of an ID wins)"""
+        if os.path.exists(self.path):
+            self._truncate_partial_line()
+            with open(self.path, encoding="utf-8") as lines:
+                for line in lines:
+                    try:
+                        record = json.loads(line)
+                        self.outcomes[str(record["id"])] = bool(record.get("success"))
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning("Skipping an unreadable line in %s", self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        return self
+
+    def _truncate_partial_line(self) -> None:
+        with open(self.path, "rb+") as results:
+            content = results.read()
+            if content and not content.endswith(b"\n"):
+                results.truncate(content.rfind(b"\n") + 1)
+
+    def is_done(self, item_id: str, retry_failed: bool = False) -> bool:
+        outcome = self.outcomes.get(item_id)
+        return outcome is not None and (outcome or not retry_failed)
+
+    def write(self, line: BatchResultLine) -> None:
+        self._file.write(line.model_dump_json() + "\n")
+        self._file.flush()
+        self.outcomes[line.id] = line.success
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every:
+            self._sync()
+
+    def _sync(self) -> None:
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+            self._file = None
+
+
+class Progress:
+    """Counts outcomes and estimates throughput and time remaining"""
+
+    def __init__(self, total: int, skipped: int = 0, clock=time.monotonic):
+        self.total = total
+        self.skipped = skipped
+        self.succeeded = 0
+        self.failed = 0
+        self.clock = clock
+        self.started = clock()
+
+    @property
+    def done(self) -> int:
+        return self.succeeded + self.failed
+
+    def record(self, success: bool) -> None:
+        if success:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+
+    def rate(self) -> float:
+        elapsed = self.clock() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def eta_seconds(self) -> Optional[float]:
+        rate = self.rate()
+        return (self.total - self.done) / rate if rate else None
+
+    def line(self) -> str:
+        percent = self.done / self.total if self.total else 1.0
+        eta = self.eta_seconds()
+        return (f"{self.done}/{self.total} ({percent:.0%}) {self.rate():.2f} items/s, "
+                f"{self.failed} failed, ETA {_duration(eta) if eta is not None else '?'}")
+
+    def summary(self) -> str:
+        elapsed = self.clock() - self.started
+        return (f"Analyzed {self.done} items in {_duration(elapsed)} ({self.rate():.2f} items/s): "
+                f"{self.succeeded} succeeded, {self.failed} failed, {self.skipped} already done")
+
+
+def _duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}h{minutes:02d}m{seconds:02d}s" if hours else f"{minutes}m{seconds:02d}s"
+
+
+class ExtractionFailed(Exception):
+    """A document yielded no text; unlike HTTPException, it survives the trip back from a worker process"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(status_code, message)
+        self.status_code = status_code
+        self.message = message
+
+
+# One TextExtractor per worker process, created on first use (it loads the OCR model)
+_extractor = None
+
+
+def extract_document(path: str) -> str:
+    """Text of the document at `path`; raises ExtractionFailed where the upload endpoints return an error"""
+    global _extractor
+    with open(path, "rb") as document:
+        content = document.read(MAX_DOCUMENT_BYTES + 1)
+    if len(content) > MAX_DOCUMENT_BYTES:
+        raise ExtractionFailed(413, "File too large. Maximum size is 10MB")
+    if not content:
+        raise ExtractionFailed(400, "Empty file provided")
+    if _extractor is None:
+        from app.services.text_extractor import TextExtractor
+        _extractor = TextExtractor()
+    result = asyncio.run(_extractor.extract_from_content(content, os.path.basename(path)))
+    if not result.success:
+        raise ExtractionFailed(400, result.error_message)
+    return result.extracted_text
+
+
+class BulkAnalyzer:
+    """Extracts and analyzes work items, appending each outcome to the checkpoint.
+
+    Up to `read_ahead` documents are extracted in `executor` ahead of the
+    analyses, and at most `concurrency` analyses run at once.
+    """
+
+    def __init__(self, detector, executor: Executor, checkpoint: ResultsCheckpoint, concurrency: int = 4,
+                 read_ahead: int = 8, stages=None, retry_failed: bool = False):
+        self.detector = detector
+        self.executor = executor
+        self.checkpoint = checkpoint
+        self.processor = BatchProcessor(max_concurrency=concurrency)
+        self.read_ahead = max(1, read_ahead)
+        self.stages = stages or AnalysisSelection.parse().stages
+        self.retry_failed = retry_failed
+
+    def pending(self, items: Iterable[WorkItem]) -> Iterator[WorkItem]:
+        return (item for item in items if not self.checkpoint.is_done(item.id, self.retry_failed))
+
+    async def run(self, items: Iterable[WorkItem], progress: Progress, report_every: float = 5.0,
+                  report=None) -> Progress:
+        last_report = time.monotonic()
+        async for outcome in self.processor.run(self._jobs(self.pending(items))):
+            line = self._result_line(outcome)
+            self.checkpoint.write(line)
+            progress.record(line.success)
+            if report is not None and time.monotonic() - last_report >= report_every:
+                report(progress.line())
+                last_report = time.monotonic()
+        return progress
+
+    async def _jobs(self, items: Iterator[WorkItem]):
+        loop = asyncio.get_running_loop()
+        window: deque = deque()
+
+        def start(item: WorkItem) -> None:
+            extraction = None
+            if item.path is not None and item.error is None:
+                extraction = loop.run_in_executor(self.executor, extract_document, item.path)
+            window.append((item, extraction))
+
+        for item in islice(items, self.read_ahead):
+            start(item)
+        while window:
+            item, extraction = window.popleft()
+            following = next(items, None)
+            if following is not None:
+                start(following)
+            yield item.id, (lambda item=item, extraction=extraction: self._analyze(item, extraction))
+
+    async def _analyze(self, item: WorkItem, extraction: Optional[asyncio.Future]):
+        if item.error is not None:
+            raise HTTPException(status_code=400, detail=item.error)
+        try:
+            text = await extraction if extraction is not None else item.text
+        except ExtractionFailed as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
+        if not text or len(text.strip()) < 50:
+            raise HTTPException(status_code=400, detail="Job description text must be at least 50 characters long")
+        return await self.detector.analyze_comprehensive(text, stages=self.stages)
+
+    @staticmethod
+    def _result_line(outcome: BatchOutcome) -> BatchResultLine:
+        if outcome.error is None:
+            return BatchResultLine(id=outcome.item_id, success=True, result=outcome.result)
+        if isinstance(outcome.error, HTTPException):
+            status_code, message = outcome.error.status_code, outcome.error.detail
+        else:
+            logger.error("Analysis of %s failed: %s", outcome.item_id, outcome.error)
+            status_code = 503 if "Language improvement service failed" in str(outcome.error) else 500
+            message = str(outcome.error) or "Bias analysis failed due to an internal error"
+        return BatchResultLine(
+            id=outcome.item_id,
+            success=False,
+            error=BatchItemError(message=message, status_code=status_code,
+                                 type=ERROR_TYPES.get(status_code, "unknown_error"))
+        )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("inputs", nargs="+", help="directories, .jsonl files of postings or documents")
+    parser.add_argument("-o", "--output", required=True, help="results JSONL file (appended to and resumed from)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="extraction processes (0 extracts in threads of this process)")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("BATCH_MAX_CONCURRENCY", "4")),
+                        help="analyses in flight at once")
+    parser.add_argument("--stages", help="comma-separated pipeline stages to run (detect, improve)")
+    parser.add_argument("--retry-failed", action="store_true", help="re-run items recorded as failed")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="seconds between progress lines")
+    parser.add_argument("--export-parquet", metavar="DIR",
+                        help="afterwards, export the successful results in the output file as Parquet tables to DIR")
+    return parser.parse_args(argv)
+
+
+def _count(items: Iterable[WorkItem], checkpoint: ResultsCheckpoint, retry_failed: bool) -> Tuple[int, int]:
+    """(items still to analyze, items already done)"""
+    pending = skipped = 0
+    for item in items:
+        if checkpoint.is_done(item.id, retry_failed):
+            skipped += 1
+        else:
+            pending += 1
+    return pending, skipped
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    load_dotenv()
+    configure_logging()
+    try:
+        stages = AnalysisSelection.parse(stages=args.stages).stages
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if args.export_parquet:
+        try:
+            require_pyarrow()
+        except RuntimeError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+    missing = [source for source in args.inputs if not os.path.exists(source)]
+    if missing:
+        print(f"error: no such input: {', '.join(missing)}", file=sys.stderr)
+        return 2
+
+    checkpoint = ResultsCheckpoint(args.output).open()
+    total, skipped = _count(iter_items(args.inputs), checkpoint, args.retry_failed)
+    print(f"{total} items to analyze, {skipped} already in {args.output}", file=sys.stderr)
+
+    from app.services.bias_detector import BiasDetector
+    executor = ProcessPoolExecutor(args.workers) if args.workers > 0 else ThreadPoolExecutor(1)
+    analyzer = BulkAnalyzer(
+        BiasDetector(), executor, checkpoint, concurrency=args.concurrency,
+        read_ahead=2 * max(1, args.workers), stages=stages, retry_failed=args.retry_failed
+    )
+    progress = Progress(total, skipped)
+    try:
+        asyncio.run(analyzer.run(
+            iter_items(args.inputs), progress, args.progress_interval, lambda line: print(line, file=sys.stderr)
+        ))
+    except KeyboardInterrupt:
+        print(f"Interrupted; re-run the same command to resume. {progress.summary()}", file=sys.stderr)
+        return 130
+    finally:
+        executor.shutdown(cancel_futures=True)
+        checkpoint.close()
+    print(progress.summary(), file=sys.stderr)
+    if args.export_parquet:
+        with open(args.output, encoding="utf-8") as lines:
+            exported, skipped = export_results(lines, args.export_parquet)
+        print(f"Exported {exported} results to {args.export_parquet} ({skipped} failed items left out)", file=sys.stderr)
+    return 1 if progress.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -183,22 +183,69 @@
 #     uvicorn.run(app, host="0.0.0.0", port=8000)
 
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from app.models.schemas import AnalyzeRequest, BiasAnalysisResult, TextExtractionResponse,AnalyzeFileResponse
+from app.models.schemas import BatchItem, BatchAnalyzeRequest, BatchItemError, BatchResultLine
+from app.models.schemas import JobSubmitRequest, JobStatusResponse
 from app.services.text_extractor import TextExtractor
 from app.services.bias_detector import BiasDetector
+from app.services.batch_processor import BatchProcessor, RequestBodyStreamingResponse, iter_ndjson, track_consumption
+from app.services.job_queue import (
+    JobQueue, JobWorkerPool, WebhookNotifier, allowed_webhook_hosts, validate_callback_url
+)
+from app.services.cancellation import CancellationTracker, ClientDisconnected
+from app.services.admission import AdmissionPool, AdmissionRejected
+from app.services.analysis_selection import AnalysisSelection
+from app.services.live_analysis import LiveAnalysisHub
+from app.utils.metrics import REGISTRY, QUEUE_DEPTH, STAGE_LATENCY, MetricsMiddleware
+from app.utils.logging_config import configure_logging, log_payload
+from app.utils.tracing import REQUEST_ID_HEADER, TracingMiddleware, configure_tracing
+from app.services.token_usage import TOKEN_USAGE_HEADER, TokenUsageMiddleware, usage_report
+from app.utils.deadline import REQUEST_TIMEOUT_HEADER, Deadline, DeadlineExceeded
+import asyncio
+import logging
+import anyio
+import json
 import os
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from pydantic import ValidationError
 from dotenv import load_dotenv
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 
 # Load environment variables
 load_dotenv()
+configure_logging()
+configure_tracing()
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The /jobs database is opened here, not at import, so importing the app creates no files
+    global job_queue, job_workers
+    job_queue = JobQueue(os.getenv("JOB_DB_PATH", "jobs.db"), max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "3")))
+    job_workers = JobWorkerPool(
+        job_queue,
+        _run_queued_job,
+        workers=int(os.getenv("JOB_WORKERS", "2")),
+        notifier=WebhookNotifier(allowed_hosts=allowed_webhook_hosts())
+    )
+    # Background workers for the /jobs API; interrupted jobs are requeued on start
+    job_workers.start()
+    yield
+    await job_workers.stop()
+    job_queue.close()
+    if bias_detector.llm_service.prompt_cache is not None:
+        await bias_detector.llm_service.prompt_cache.close()
 
 app = FastAPI(
     title="Job Description Bias Detection API",
     description="AI-powered bias detection and language improvement for job descriptions",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware - Allow All Origins
@@ -208,11 +255,36 @@ app.add_middleware(
     allow_credentials=False,  # Set to False when using allow_origins=["*"]
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[REQUEST_ID_HEADER, TOKEN_USAGE_HEADER],
 )
+app.add_middleware(TokenUsageMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
 
 # Initialize services
 text_extractor = TextExtractor()
 bias_detector = BiasDetector()
+cancellation_tracker = CancellationTracker(bias_detector.llm_service)
+# Admission budgets: Gemini-bound analysis and CPU-bound extraction/OCR queue separately
+llm_admission = AdmissionPool(
+    "llm",
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("LLM_MAX_QUEUE", "16")),
+    initial_service_seconds=10.0
+)
+cpu_admission = AdmissionPool(
+    "cpu",
+    max_concurrency=int(os.getenv("CPU_MAX_CONCURRENCY", "4")),
+    max_queue=int(os.getenv("CPU_MAX_QUEUE", "8")),
+    initial_service_seconds=2.0
+)
+batch_processor = BatchProcessor(max_concurrency=int(os.getenv("BATCH_MAX_CONCURRENCY", "4")))
+# JSON batch bodies are parsed in full - large batches should use the NDJSON form
+BATCH_MAX_JSON_ITEMS = int(os.getenv("BATCH_MAX_JSON_ITEMS", "1000"))
+# Created by lifespan on startup
+job_queue: Optional[JobQueue] = None
+job_workers: Optional[JobWorkerPool] = None
+live_hub = LiveAnalysisHub.from_env()
 
 
 # Global exception handler for HTTPException
@@ -225,7 +297,8 @@ async def http_exception_handler(request, exc):
             "message": exc.detail,
             "status_code": exc.status_code,
             "type": get_error_type(exc.status_code)
-        }
+        },
+        headers=exc.headers
     )
 
 # Global exception handler for general exceptions
@@ -248,6 +321,7 @@ def get_error_type(status_code: int) -> str:
         401: "authentication_error",
         403: "permission_error",
         404: "not_found_error",
+        409: "conflict_error",
         413: "file_too_large",
         429: "rate_limit_exceeded",
         500: "internal_server_error",
@@ -256,6 +330,77 @@ def get_error_type(status_code: int) -> str:
     }
     return error_types.get(status_code, "unknown_error")
 
+def validate_analysis_text(text: str) -> None:
+    """Reject texts that are too short to be a job description"""
+    if not text or len(text.strip()) < 50:
+        raise HTTPException(
+            status_code=400, 
+            detail="Job description text must be at least 50 characters long"
+        )
+
+def analysis_error_to_http(e: Exception) -> HTTPException:
+    """Map an analyze_comprehensive failure to the HTTP error returned to clients"""
+    if isinstance(e, DeadlineExceeded):
+        return deadline_error(e)
+    error_msg = str(e)
+    if "Language improvement service failed" in error_msg:
+        return HTTPException(
+            status_code=503,  # Service Unavailable
+            detail="Language improvement service is temporarily unavailable. Please try again later."
+        )
+    logger.error("Unexpected error during bias analysis: %s", error_msg)
+    return HTTPException(
+        status_code=500, 
+        detail="Bias analysis failed due to an internal error"
+    )
+
+def deadline_error(e: DeadlineExceeded) -> HTTPException:
+    return HTTPException(
+        status_code=504,
+        detail=f"Request deadline exceeded during {e.stage}. Retry with a longer {REQUEST_TIMEOUT_HEADER}."
+    )
+
+def request_deadline(http_request: Request) -> Optional[Deadline]:
+    """Deadline from the X-Request-Timeout header or REQUEST_DEADLINE_SECONDS"""
+    try:
+        return Deadline.for_request(http_request.headers.get(REQUEST_TIMEOUT_HEADER))
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{REQUEST_TIMEOUT_HEADER} must be a positive number of seconds"
+        )
+
+def parse_selection(stages: Optional[str], fields: Optional[str]) -> AnalysisSelection:
+    """Validate the stages/fields query parameters"""
+    try:
+        return AnalysisSelection.parse(stages, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def overloaded_error(e: AdmissionRejected) -> HTTPException:
+    """503 telling the client when the rejected pool should have room again"""
+    return HTTPException(
+        status_code=503,
+        detail="Service is busy. Please retry later.",
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+def check_capacity(*pools: AdmissionPool) -> None:
+    """Shed load up front, before any upload processing, when a needed pool is full"""
+    try:
+        for pool in pools:
+            pool.check()
+    except AdmissionRejected as e:
+        raise overloaded_error(e)
+
+@asynccontextmanager
+async def admitted(pool: AdmissionPool):
+    try:
+        async with pool.admit():
+            yield
+    except AdmissionRejected as e:
+        raise overloaded_error(e)
+
 @app.get("/")
 async def root():
     return {"message": "Job Description Bias Detection API", "status": "running"}
@@ -267,15 +412,19 @@ async def health_check():
 @app.post("/extract", response_model=TextExtractionResponse)
 async def extract_text_from_file(file: UploadFile = File(...)):
     """Extract text from uploaded file (PDF, DOCX, images, etc.)"""
-    
+    return await _extract_file(file)
+
+async def _extract_file(file: UploadFile, deadline: Optional[Deadline] = None) -> TextExtractionResponse:
     if not file.filename:
         raise HTTPException(status_code=400, detail="No file provided")
+    check_capacity(cpu_admission)
     
     try:
         # Read file content once
-        content = await file.read()
+        with STAGE_LATENCY.time(stage="upload_read"):
+            content = await file.read()
         file_size = len(content)
-        print(f"Uploaded file size: {file_size} bytes")
+        logger.info("File uploaded", extra={"fields": {"filename": file.filename, "bytes": file_size}})
         
         if file_size > 10 * 1024 * 1024:  # 10MB
             raise HTTPException(status_code=413, detail="File too large. Maximum size is 10MB")
@@ -284,73 +433,82 @@ async def extract_text_from_file(file: UploadFile = File(...)):
             raise HTTPException(status_code=400, detail="Empty file provided")
         
         # Pass content directly to extractor
-        result = await text_extractor.extract_from_content(content, file.filename)
+        async with admitted(cpu_admission):
+            result = await text_extractor.extract_from_content(content, file.filename, deadline=deadline)
         
         if not result.success:
-            print(f"Extraction failed: {result.error_message}")
+            logger.warning("Extraction failed: %s", result.error_message)
             raise HTTPException(status_code=400, detail=result.error_message)
         
-        print(f"Extraction result: {result}")  # Debug log here also good
+        log_payload(logger, "Extraction result", result)
         return result
         
         
     except HTTPException:
         raise
+    except DeadlineExceeded as e:
+        raise deadline_error(e)
     except Exception as e:
-        print(f"Unexpected error during text extraction: {str(e)}")
+        logger.error("Unexpected error during text extraction: %s", e)
         raise HTTPException(
             status_code=500, 
             detail="Text extraction failed due to an internal error"
         )
 
-@app.post("/analyze", response_model=BiasAnalysisResult)
-async def analyze_bias(request: AnalyzeRequest):
-    """Analyze job description text for bias and suggest improvements"""
-    
-    if not request.text or len(request.text.strip()) < 50:
-        raise HTTPException(
-            status_code=400, 
-            detail="Job description text must be at least 50 characters long"
-        )
+# nginx's "client closed request"; nobody reads it, but it keeps access logs honest
+CLIENT_CLOSED_REQUEST = 499
+
+async def _analyze_text(text: str, deadline: Optional[Deadline] = None, partial: bool = False,
+                        selection: Optional[AnalysisSelection] = None,
+                        incremental: bool = False) -> BiasAnalysisResult:
+    validate_analysis_text(text)
+    selection = selection or AnalysisSelection.parse()
     
+    async with admitted(llm_admission):
+        try:
+            if incremental:
+                return await bias_detector.analyze_incremental(text, deadline=deadline, stages=selection.stages)
+            return await bias_detector.analyze_comprehensive(
+                text, deadline=deadline, allow_partial=partial, stages=selection.stages
+            )
+        except Exception as e:
+            raise analysis_error_to_http(e)
+
+@app.post("/analyze", response_model=BiasAnalysisResult)
+async def analyze_bias(request: AnalyzeRequest, http_request: Request, partial: bool = False,
+                       stages: Optional[str] = None, fields: Optional[str] = None, incremental: bool = False):
+    """Analyze job description text for bias and suggest improvements.
+
+    With ?partial=true, a failed improvement returns the detection half with a result_id to retry.
+    ?stages=detect / ?fields=scores,issues skip the Gemini calls and fields that are not needed.
+    ?incremental=true only sends paragraphs not analyzed before to Gemini (no improved_text).
+    """
+    selection = parse_selection(stages, fields)
+    deadline = request_deadline(http_request)
+    check_capacity(llm_admission)
     try:
-        result = await bias_detector.analyze_comprehensive(request.text)
-        print(f"Analysis result going from /analyze: {result}")  # Debug log
-       
+        result = await cancellation_tracker.run(
+            http_request.receive, lambda: _analyze_text(request.text, deadline, partial, selection, incremental),
+            planned_calls=selection.llm_calls
+        )
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    if selection.is_full:
         return result
-    except Exception as e:
-        error_msg = str(e)
-        if "Language improvement service failed" in error_msg:
-            raise HTTPException(
-                status_code=503,  # Service Unavailable
-                detail="Language improvement service is temporarily unavailable. Please try again later."
-            )
-        else:
-            print(f"Unexpected error during bias analysis: {error_msg}")
-            raise HTTPException(
-                status_code=500, 
-                detail="Bias analysis failed due to an internal error"
-            )
+    return JSONResponse(selection.apply(result))
 
-@app.post("/analyze-file")
-async def analyze_uploaded_file(file: UploadFile = File(...)):
-    """Extract text from file and analyze for bias - convenience endpoint"""
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="No file provided")
+async def _analyze_file(file: UploadFile, deadline: Optional[Deadline] = None, partial: bool = False,
+                        selection: Optional[AnalysisSelection] = None) -> AnalyzeFileResponse:
     try:
         # First extract text
-        extraction_result = await extract_text_from_file(file)
+        extraction_result = await _extract_file(file, deadline)
         
         if not extraction_result.success:
             raise HTTPException(status_code=400, detail=extraction_result.error_message)
         
         # Then analyze the extracted text
-        analysis_request = AnalyzeRequest(text=extraction_result.extracted_text)
-        analysis_result = await analyze_bias(analysis_request)
+        analysis_result = await _analyze_text(extraction_result.extracted_text, deadline, partial, selection)
 
-        print(f"Analysis result from /analyze-file: {analysis_result}")  # Debug log
-        
-       
         return AnalyzeFileResponse(
         extracted_text=extraction_result.extracted_text,
         analysis=analysis_result
@@ -359,12 +517,419 @@ async def analyze_uploaded_file(file: UploadFile = File(...)):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Unexpected error during file analysis: {str(e)}")
+        logger.error("Unexpected error during file analysis: %s", e)
         raise HTTPException(
             status_code=500, 
             detail="File analysis failed due to an internal error"
         )
 
+@app.post("/analyze-file")
+async def analyze_uploaded_file(http_request: Request, file: UploadFile = File(...), partial: bool = False,
+                                stages: Optional[str] = None, fields: Optional[str] = None):
+    """Extract text from file and analyze for bias - convenience endpoint"""
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="No file provided")
+    selection = parse_selection(stages, fields)
+    deadline = request_deadline(http_request)
+    check_capacity(cpu_admission, llm_admission)
+    try:
+        response = await cancellation_tracker.run(
+            http_request.receive, lambda: _analyze_file(file, deadline, partial, selection),
+            planned_calls=selection.llm_calls
+        )
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    if selection.is_full:
+        return response
+    return JSONResponse({"extracted_text": response.extracted_text, "analysis": selection.apply(response.analysis)})
+
+@app.get("/analyses/{result_id}", response_model=BiasAnalysisResult)
+async def get_analysis(result_id: str):
+    """Fetch a partial analysis, or its completed form once /improve has succeeded"""
+    result = bias_detector.get_analysis(result_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Analysis not found or expired")
+    return result
+
+async def _complete_improvement(result_id: str, deadline: Optional[Deadline]) -> BiasAnalysisResult:
+    async with admitted(llm_admission):
+        try:
+            return await bias_detector.complete_improvement(result_id, deadline=deadline)
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Analysis not found or expired")
+        except Exception as e:
+            raise analysis_error_to_http(e)
+
+@app.post("/analyses/{result_id}/improve", response_model=BiasAnalysisResult)
+async def retry_improvement(result_id: str, http_request: Request):
+    """Run only the language improvement for a partial analysis, reusing its detection results"""
+    deadline = request_deadline(http_request)
+    check_capacity(llm_admission)
+    try:
+        return await cancellation_tracker.run(
+            http_request.receive, lambda: _complete_improvement(result_id, deadline),
+            planned_calls=("improve_language",)
+        )
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text-format metrics"""
+    QUEUE_DEPTH.set(job_queue.depth(), queue="jobs")
+    QUEUE_DEPTH.set(llm_admission.waiting, queue="admission_llm")
+    QUEUE_DEPTH.set(cpu_admission.waiting, queue="admission_cpu")
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/stats")
+async def service_stats():
+    """Cancellation savings, admission load, token usage, prompt cache, model tiers, API keys, hedging, live sessions, near-duplicate reuse, boilerplate elision and batched detection"""
+    prompt_cache = bias_detector.llm_service.prompt_cache
+    router = bias_detector.llm_service.router
+    key_pool = bias_detector.llm_service.key_pool
+    hedger = bias_detector.llm_service.hedger
+    near_duplicates = bias_detector.near_duplicates
+    boilerplate = bias_detector.boilerplate
+    detection_batcher = bias_detector.detection_batcher
+    return {
+        "cancellation": cancellation_tracker.snapshot(),
+        "token_usage": usage_report.snapshot(),
+        "prompt_cache": prompt_cache.snapshot() if prompt_cache else {},
+        "model_routing": router.snapshot() if router else {},
+        "api_keys": key_pool.snapshot() if key_pool else {},
+        "hedging": hedger.snapshot() if hedger else {},
+        "live": live_hub.snapshot(),
+        "near_duplicates": near_duplicates.snapshot() if near_duplicates else {},
+        "boilerplate": boilerplate.snapshot() if boilerplate else {},
+        "batched_detection": detection_batcher.snapshot() if detection_batcher else {},
+        "admission": {"llm": llm_admission.snapshot(), "cpu": cpu_admission.snapshot()}
+    }
+
+def _ws_error(exc: HTTPException) -> dict:
+    return {
+        "type": "error",
+        "message": exc.detail,
+        "status_code": exc.status_code,
+        "error_type": get_error_type(exc.status_code)
+    }
+
+@app.websocket("/ws/analyze")
+async def live_analysis(websocket: WebSocket, stages: Optional[str] = None, fields: Optional[str] = None):
+    """Live analysis for editors.
+
+    The client sends `{"text": ..., "revision"?: int}` for each document
+    revision. Each gets a `rules` message with the keyword hits right away; the
+    Gemini analysis of the newest revision follows as an `analysis` message
+    once edits pause. `stages` and `fields` work as on /analyze.
+    """
+    await websocket.accept()
+    try:
+        selection = AnalysisSelection.parse(stages, fields)
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+
+    async def send(message: dict) -> None:
+        await websocket.send_json(jsonable_encoder(message))
+
+    async def analyze(text: str) -> dict:
+        try:
+            validate_analysis_text(text)
+            async with admitted(llm_admission):
+                try:
+                    result = await bias_detector.analyze_incremental(
+                        text, deadline=Deadline.for_request(None), stages=selection.stages
+                    )
+                except Exception as e:
+                    raise analysis_error_to_http(e)
+        except HTTPException as e:
+            return _ws_error(e)
+        return {"type": "analysis", "analysis": selection.apply(result)}
+
+    session = live_hub.open(send, analyze, bias_detector.detect_rule_based_bias)
+    if session is None:
+        # 1013: try again later
+        await websocket.close(code=1013, reason="Too many live analysis connections")
+        return
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                text, revision = message["text"], message.get("revision")
+                if not isinstance(text, str) or not (revision is None or isinstance(revision, int)):
+                    raise TypeError
+            except (ValueError, KeyError, TypeError):
+                await session.send(_ws_error(HTTPException(
+                    status_code=400, detail='Messages must be JSON objects like {"text": "...", "revision": 1}'
+                )))
+                continue
+            try:
+                await session.submit(text, revision)
+            except ValueError as e:
+                await session.send({**_ws_error(HTTPException(status_code=413, detail=str(e))),
+                                    "revision": session.revision})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        session.close()
+
+def _sse_event(event: str, payload: dict) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(payload))}\n\n"
+
+def _sse_error(exc: HTTPException, total_started: float) -> str:
+    return _sse_event("error", {
+        "message": exc.detail,
+        "status_code": exc.status_code,
+        "type": get_error_type(exc.status_code),
+        "total_ms": _elapsed_ms(total_started)
+    })
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+@app.post("/analyze-file/stream")
+async def analyze_uploaded_file_stream(file: UploadFile = File(...)):
+    """Server-sent events variant of /analyze-file.
+
+    Emits `upload`, `extracted`, `issues`, `scores`, `suggestions`, `improved_text`
+    and finally `complete` (or `error`) as each phase finishes, each with the
+    phase's `stage_ms` and the running `total_ms`.
+    """
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="No file provided")
+
+    total_started = time.perf_counter()
+    with STAGE_LATENCY.time(stage="upload_read"):
+        content = await file.read()
+    upload_ms = _elapsed_ms(total_started)
+    if len(content) > 10 * 1024 * 1024:  # 10MB
+        raise HTTPException(status_code=413, detail="File too large. Maximum size is 10MB")
+    if len(content) == 0:
+        raise HTTPException(status_code=400, detail="Empty file provided")
+    check_capacity(cpu_admission, llm_admission)
+
+    async def events():
+        yield _sse_event("upload", {"bytes": len(content), "stage_ms": upload_ms, "total_ms": upload_ms})
+
+        started = time.perf_counter()
+        try:
+            async with admitted(cpu_admission):
+                extraction_result = await text_extractor.extract_from_content(content, file.filename)
+        except HTTPException as e:
+            yield _sse_error(e, total_started)
+            return
+        if not extraction_result.success:
+            yield _sse_error(HTTPException(status_code=400, detail=extraction_result.error_message), total_started)
+            return
+        text = extraction_result.extracted_text
+        yield _sse_event("extracted", {
+            "text_length": len(text),
+            "file_type": extraction_result.file_type,
+            "stage_ms": _elapsed_ms(started),
+            "total_ms": _elapsed_ms(total_started)
+        })
+
+        try:
+            validate_analysis_text(text)
+            async with admitted(llm_admission):
+                async for event, payload in bias_detector.analyze_stages(text):
+                    if event == "complete":
+                        payload = {**payload, "extracted_text": text}
+                    yield _sse_event(event, {**payload, "total_ms": _elapsed_ms(total_started)})
+        except HTTPException as e:
+            yield _sse_error(e, total_started)
+        except Exception as e:
+            yield _sse_error(analysis_error_to_http(e), total_started)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+async def _analyze_batch_text(text: str) -> BiasAnalysisResult:
+    validate_analysis_text(text)
+    try:
+        return await bias_detector.analyze_comprehensive(text)
+    except Exception as e:
+        raise analysis_error_to_http(e)
+
+def _raise_item_error(message: str):
+    async def fail():
+        raise HTTPException(status_code=400, detail=message)
+    return fail
+
+async def _text_batch_jobs(items: List[BatchItem]):
+    for item in items:
+        yield item.id, (lambda text=item.text: _analyze_batch_text(text))
+
+async def _ndjson_batch_jobs(request: Request, body_consumed: anyio.Event):
+    async for line_number, value in iter_ndjson(track_consumption(request.stream(), body_consumed)):
+        if isinstance(value, Exception):
+            yield str(line_number), _raise_item_error(f"Invalid JSON on line {line_number}")
+            continue
+        try:
+            item = BatchItem(**value) if isinstance(value, dict) else BatchItem(id=str(line_number), text=value)
+        except (TypeError, ValidationError):
+            item_id = str(value.get("id", line_number)) if isinstance(value, dict) else str(line_number)
+            yield item_id, _raise_item_error("Batch items need an 'id' and a 'text' field")
+            continue
+        yield item.id, (lambda text=item.text: _analyze_batch_text(text))
+
+async def _file_batch_jobs(files: List[UploadFile]):
+    for file in files:
+        yield file.filename, (lambda file=file: _analyze_batch_file(file))
+
+async def _analyze_batch_file(file: UploadFile) -> BiasAnalysisResult:
+    content = await file.read()
+    if len(content) > 10 * 1024 * 1024:  # 10MB
+        raise HTTPException(status_code=413, detail="File too large. Maximum size is 10MB")
+    if len(content) == 0:
+        raise HTTPException(status_code=400, detail="Empty file provided")
+
+    extraction_result = await text_extractor.extract_from_content(content, file.filename)
+    if not extraction_result.success:
+        raise HTTPException(status_code=400, detail=extraction_result.error_message)
+
+    return await _analyze_batch_text(extraction_result.extracted_text)
+
+def _batch_result_line(outcome) -> str:
+    """Serialize one batch outcome as an NDJSON line"""
+    if outcome.error is None:
+        line = BatchResultLine(id=outcome.item_id, success=True, result=outcome.result)
+    else:
+        if isinstance(outcome.error, HTTPException):
+            status_code, message = outcome.error.status_code, outcome.error.detail
+        else:
+            logger.error("Unexpected error in batch item %s: %s", outcome.item_id, outcome.error)
+            status_code, message = 500, "Bias analysis failed due to an internal error"
+        line = BatchResultLine(
+            id=outcome.item_id,
+            success=False,
+            error=BatchItemError(message=message, status_code=status_code, type=get_error_type(status_code))
+        )
+    return line.model_dump_json() + "\n"
+
+async def _batch_lines(jobs, concurrency: Optional[int]):
+    async for outcome in batch_processor.run(jobs, concurrency):
+        yield _batch_result_line(outcome)
+
+@app.post("/analyze-batch")
+async def analyze_batch(request: Request, concurrency: Optional[int] = None):
+    """Analyze many texts, streaming NDJSON results in completion order.
+
+    Large batches should send an NDJSON body (Content-Type: application/x-ndjson)
+    with one {"id", "text"} object per line. It is read incrementally while results
+    stream back, so memory stays constant regardless of batch size. A JSON body
+    ({"items": [{"id", "text"}, ...]}) is accepted as a convenience for small
+    batches of up to BATCH_MAX_JSON_ITEMS items.
+    """
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type:
+        body_consumed = anyio.Event()
+        return RequestBodyStreamingResponse(
+            _batch_lines(_ndjson_batch_jobs(request, body_consumed), concurrency),
+            body_consumed=body_consumed,
+            media_type="application/x-ndjson"
+        )
+
+    try:
+        batch_request = BatchAnalyzeRequest(**await request.json())
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Request body must be {\"items\": [{\"id\": ..., \"text\": ...}]} or NDJSON")
+    if len(batch_request.items) > BATCH_MAX_JSON_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"JSON batches are limited to {BATCH_MAX_JSON_ITEMS} items. Send larger batches as NDJSON"
+        )
+    return StreamingResponse(_batch_lines(_text_batch_jobs(batch_request.items), concurrency), media_type="application/x-ndjson")
+
+@app.post("/analyze-batch-files")
+async def analyze_batch_files(files: List[UploadFile] = File(...), concurrency: Optional[int] = None):
+    """Extract and analyze many uploaded files, streaming NDJSON results tagged with the file names"""
+    if any(not file.filename for file in files):
+        raise HTTPException(status_code=400, detail="No file provided")
+    return StreamingResponse(_batch_lines(_file_batch_jobs(files), concurrency), media_type="application/x-ndjson")
+
+async def _run_queued_job(job: dict) -> BiasAnalysisResult:
+    """Job worker handler: extract uploaded files first, then analyze"""
+    text = job["text"]
+    if job["filename"]:
+        extraction_result = await text_extractor.extract_from_content(job["content"], job["filename"])
+        if not extraction_result.success:
+            raise HTTPException(status_code=400, detail=extraction_result.error_message)
+        text = extraction_result.extracted_text
+    return await _analyze_batch_text(text)
+
+async def _check_callback_url(callback_url: Optional[str]) -> None:
+    """400 unless `callback_url` is absent or an allowed webhook target"""
+    if callback_url is None:
+        return
+    try:
+        await asyncio.to_thread(validate_callback_url, callback_url, allowed_webhook_hosts())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _job_status(job: dict) -> JobStatusResponse:
+    error = None
+    if job["status"] == "failed":
+        error = BatchItemError(
+            message=job["error_message"],
+            status_code=job["error_status"],
+            type=get_error_type(job["error_status"])
+        )
+    return JobStatusResponse(
+        job_id=job["id"],
+        status=job["status"],
+        attempts=job["attempts"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+        error=error
+    )
+
+def _get_job_or_404(job_id: str) -> dict:
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/jobs", response_model=JobStatusResponse, status_code=202)
+async def submit_analysis_job(request: JobSubmitRequest):
+    """Queue a text for background analysis; poll /jobs/{job_id} or pass a callback_url"""
+    validate_analysis_text(request.text)
+    await _check_callback_url(request.callback_url)
+    job = job_queue.submit(text=request.text, callback_url=request.callback_url)
+    job_workers.notify_new_job()
+    return _job_status(job)
+
+@app.post("/jobs/file", response_model=JobStatusResponse, status_code=202)
+async def submit_file_analysis_job(file: UploadFile = File(...), callback_url: Optional[str] = Form(None)):
+    """Queue an uploaded file for background extraction and analysis"""
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="No file provided")
+    content = await file.read()
+    if len(content) > 10 * 1024 * 1024:  # 10MB
+        raise HTTPException(status_code=413, detail="File too large. Maximum size is 10MB")
+    if len(content) == 0:
+        raise HTTPException(status_code=400, detail="Empty file provided")
+    await _check_callback_url(callback_url)
+
+    job = job_queue.submit(filename=file.filename, content=content, callback_url=callback_url)
+    job_workers.notify_new_job()
+    return _job_status(job)
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_analysis_job(job_id: str):
+    """Poll the status of a queued analysis"""
+    return _job_status(_get_job_or_404(job_id))
+
+@app.get("/jobs/{job_id}/result", response_model=BiasAnalysisResult)
+async def get_analysis_job_result(job_id: str):
+    """Fetch the analysis of a completed job"""
+    job = _get_job_or_404(job_id)
+    if job["status"] == "failed":
+        raise HTTPException(status_code=job["error_status"], detail=job["error_message"])
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Job is still {job['status']}")
+    return BiasAnalysisResult.model_validate_json(job["result"])
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -55,14 +55,20 @@ class BiasAnalysisResult(BaseModel):
     # bias_score: float 
     # inclusivity_score: float
     # clarity_score: float
-    bias_score: Union[str, float]
-    inclusivity_score: Union[str, float]
-    clarity_score: Union[str, float]
+    # None only when the detect stage was not requested
+    bias_score: Optional[Union[str, float]] = None
+    inclusivity_score: Optional[Union[str, float]] = None
+    clarity_score: Optional[Union[str, float]] = None
     issues: List[BiasIssue]
     suggestions: List[Suggestion]
     seo_keywords: List[str]
     improved_text: Optional[str] = None
     overall_assessment: Optional[str] = None
+    # True when only the detection half is included; partial_reason is "deadline" or "improve_failed"
+    partial: bool = False
+    partial_reason: Optional[str] = None
+    # Set on partial results: POST /analyses/{result_id}/improve runs just the missing stage
+    result_id: Optional[str] = None
 
 class AnalyzeRequest(BaseModel):
     text: str
@@ -72,8 +78,40 @@ class TextExtractionResponse(BaseModel):
     extracted_text: Optional[str] = None
     file_type: Optional[str] = None
     error_message: Optional[str] = None
+    warning: Optional[str] = None
 
 
 class AnalyzeFileResponse(BaseModel):
     extracted_text: str
-    analysis: BiasAnalysisResult
\ No newline at end of file
+    analysis: BiasAnalysisResult
+
+class BatchItem(BaseModel):
+    id: str
+    text: str
+
+class BatchAnalyzeRequest(BaseModel):
+    items: List[BatchItem]
+
+class BatchItemError(BaseModel):
+    message: str
+    status_code: int
+    type: str
+
+class BatchResultLine(BaseModel):
+    id: str
+    success: bool
+    result: Optional[BiasAnalysisResult] = None
+    error: Optional[BatchItemError] = None
+
+
+class JobSubmitRequest(BaseModel):
+    text: str
+    callback_url: Optional[str] = None
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    attempts: int = 0
+    created_at: float
+    updated_at: float
+    error: Optional[BatchItemError] = None
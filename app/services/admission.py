@@ -0,0 +1,101 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict
+
+
+class AdmissionRejected(Exception):
+    """The pool's queue is full; the caller should retry after `retry_after` seconds"""
+
+    def __init__(self, pool: str, retry_after: int):
+        super().__init__(f"{pool} pool is at capacity")
+        self.pool = pool
+        self.retry_after = retry_after
+
+
+class AdmissionPool:
+    """Bounded concurrency plus a bounded wait queue for one kind of work.
+
+    Up to `max_concurrency` holders run at once and up to `max_queue` more wait
+    in FIFO order. Anything beyond that is rejected immediately instead of
+    piling up in memory. The suggested retry delay is the time the current
+    queue needs to drain, from a moving average of how long holders take.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int,
+                 initial_service_seconds: float, max_retry_after: int = 120):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.max_retry_after = max_retry_after
+        self.avg_service_seconds = initial_service_seconds
+        self.in_flight = 0
+        self.rejected = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until a newly queued request would likely be admitted"""
+        rounds = (self.waiting + 1) / self.max_concurrency
+        return min(self.max_retry_after, max(1, math.ceil(rounds * self.avg_service_seconds)))
+
+    def check(self) -> None:
+        """Raise AdmissionRejected if a new request would not even get a queue slot"""
+        if self.in_flight >= self.max_concurrency and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected(self.name, self.retry_after())
+
+    @asynccontextmanager
+    async def admit(self):
+        """Hold one slot for the duration of the block, waiting in the queue if needed"""
+        await self._acquire()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._observe(time.perf_counter() - started)
+            self._release()
+
+    async def _acquire(self) -> None:
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            return
+        self.check()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # _release hands its slot straight to us, so in_flight is already counted
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def _release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _observe(self, seconds: float) -> None:
+        # Exponential moving average; recent latency matters most when Gemini slows down
+        self.avg_service_seconds = 0.8 * self.avg_service_seconds + 0.2 * seconds
+
+    def snapshot(self) -> Dict:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+            "avg_service_seconds": round(self.avg_service_seconds, 3)
+        }
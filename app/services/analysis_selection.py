@@ -0,0 +1,80 @@
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from app.models.schemas import BiasAnalysisResult
+
+# Pipeline stages in run order, and the Gemini call each one makes
+ANALYSIS_STAGES = ("detect", "improve")
+STAGE_LLM_CALLS = {"detect": "detect_bias", "improve": "improve_language"}
+
+# Response field groups a client can ask for, and the stage that produces each
+FIELD_GROUPS: Dict[str, Tuple[str, ...]] = {
+    "scores": ("role", "industry", "bias_score", "inclusivity_score", "clarity_score", "overall_assessment"),
+    "issues": ("issues",),
+    "suggestions": ("suggestions",),
+    "seo_keywords": ("seo_keywords",),
+    "improved_text": ("improved_text",),
+}
+FIELD_STAGES = {
+    "scores": "detect",
+    "issues": "detect",
+    "suggestions": "improve",
+    "seo_keywords": "improve",
+    "improved_text": "improve",
+}
+# Status fields are returned whatever was selected
+STATUS_FIELDS = ("partial", "partial_reason", "result_id")
+
+
+def _parse_list(value: str, allowed, name: str) -> FrozenSet[str]:
+    items = frozenset(item.strip() for item in value.split(",") if item.strip())
+    unknown = items - set(allowed)
+    if not items or unknown:
+        raise ValueError(f"{name} must be a comma-separated subset of: {', '.join(allowed)}")
+    return items
+
+
+class AnalysisSelection:
+    """Which pipeline stages to run and which response fields to return.
+
+    Built from the `stages` and `fields` query parameters. `fields` alone runs
+    only the stages those fields need; `stages` alone returns everything those
+    stages produce.
+    """
+
+    def __init__(self, stages: FrozenSet[str], fields: FrozenSet[str]):
+        self.stages = stages
+        self.fields = fields
+
+    @classmethod
+    def parse(cls, stages: Optional[str] = None, fields: Optional[str] = None) -> "AnalysisSelection":
+        """Raises ValueError for unknown names or fields the selected stages do not produce"""
+        selected_fields = _parse_list(fields, FIELD_GROUPS, "fields") if fields is not None else None
+        if stages is not None:
+            selected_stages = _parse_list(stages, ANALYSIS_STAGES, "stages")
+        elif selected_fields is not None:
+            selected_stages = frozenset(FIELD_STAGES[field] for field in selected_fields)
+        else:
+            selected_stages = frozenset(ANALYSIS_STAGES)
+
+        produced = frozenset(field for field, stage in FIELD_STAGES.items() if stage in selected_stages)
+        if selected_fields is None:
+            selected_fields = produced
+        elif not selected_fields <= produced:
+            missing = ", ".join(sorted(selected_fields - produced))
+            raise ValueError(f"fields {missing} need a stage that was not selected")
+        return cls(selected_stages, selected_fields)
+
+    @property
+    def is_full(self) -> bool:
+        return self.stages == frozenset(ANALYSIS_STAGES) and self.fields == frozenset(FIELD_GROUPS)
+
+    @property
+    def llm_calls(self) -> Tuple[str, ...]:
+        return tuple(STAGE_LLM_CALLS[stage] for stage in ANALYSIS_STAGES if stage in self.stages)
+
+    def apply(self, result: BiasAnalysisResult) -> Dict:
+        """The result as a dict holding only the selected fields (plus the status fields)"""
+        include = set(STATUS_FIELDS)
+        for field in self.fields:
+            include.update(FIELD_GROUPS[field])
+        return result.model_dump(mode="json", include=include)
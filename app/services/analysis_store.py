@@ -0,0 +1,52 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from app.models.schemas import BiasAnalysisResult, BiasIssue
+
+
+class StoredAnalysis:
+    """Detection output of a partial analysis, kept so the improvement can be retried alone"""
+
+    def __init__(self, text: str, llm_bias_result: Dict, issues: List[BiasIssue], result: BiasAnalysisResult,
+                 expires_at: float):
+        self.text = text
+        self.llm_bias_result = llm_bias_result
+        self.issues = issues
+        self.result = result
+        self.expires_at = expires_at
+        # Serializes retries so concurrent ones reuse the first's improvement
+        self.lock = asyncio.Lock()
+
+
+class AnalysisStore:
+    """In-memory, size- and TTL-bounded store of partial analyses keyed by result ID"""
+
+    def __init__(self, ttl_seconds: float = 3600, max_entries: int = 1000, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[str, StoredAnalysis]" = OrderedDict()
+
+    def save(self, text: str, llm_bias_result: Dict, issues: List[BiasIssue], result: BiasAnalysisResult) -> str:
+        result_id = uuid.uuid4().hex
+        self._entries[result_id] = StoredAnalysis(
+            text, llm_bias_result, issues, result, self.clock() + self.ttl_seconds
+        )
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return result_id
+
+    def get(self, result_id: str) -> Optional[StoredAnalysis]:
+        entry = self._entries.get(result_id)
+        if entry is None:
+            return None
+        if self.clock() >= entry.expires_at:
+            del self._entries[result_id]
+            return None
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,132 @@
+import asyncio
+import json
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Optional, Tuple
+import anyio
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+# A batch job is the client's item ID plus a factory for the coroutine that analyzes it
+BatchJob = Tuple[str, Callable[[], Awaitable]]
+
+
+class BatchOutcome:
+    """Result (or error) of one batch job, tagged with the client's item ID"""
+
+    def __init__(self, item_id: str, result=None, error: Optional[Exception] = None):
+        self.item_id = item_id
+        self.result = result
+        self.error = error
+
+
+class BatchProcessor:
+    """Runs many analyses with a bounded number in flight, yielding outcomes in completion order"""
+
+    def __init__(self, max_concurrency: int = 4):
+        self.max_concurrency = max(1, max_concurrency)
+
+    def resolve_concurrency(self, requested: Optional[int] = None) -> int:
+        """Clamp a client-requested concurrency to the configured limit"""
+        if not requested:
+            return self.max_concurrency
+        return max(1, min(requested, self.max_concurrency))
+
+    async def run(self, jobs: AsyncIterable[BatchJob], concurrency: Optional[int] = None) -> AsyncIterator[BatchOutcome]:
+        """Pull jobs lazily and keep at most `concurrency` of them running.
+
+        Jobs are only taken from the source when a slot frees up, so memory stays
+        proportional to the concurrency limit rather than the batch size.
+        """
+        limit = self.resolve_concurrency(concurrency)
+        source = jobs.__aiter__()
+        pending = set()
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and len(pending) < limit:
+                    try:
+                        item_id, factory = await source.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    pending.add(asyncio.create_task(self._run_job(item_id, factory)))
+
+                if not pending:
+                    break
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            # Client went away or the consumer stopped early - don't leave work running
+            for task in pending:
+                task.cancel()
+
+    @staticmethod
+    async def _run_job(item_id: str, factory: Callable[[], Awaitable]) -> BatchOutcome:
+        try:
+            return BatchOutcome(item_id, result=await factory())
+        except Exception as e:
+            return BatchOutcome(item_id, error=e)
+
+
+async def iter_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[Tuple[int, object]]:
+    """Parse an NDJSON byte stream line by line, yielding (line_number, parsed_value_or_error)"""
+    buffer = b""
+    line_number = 0
+
+    async for chunk in chunks:
+        buffer += chunk
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            if line.strip():
+                line_number += 1
+                yield line_number, _parse_line(line)
+
+    if buffer.strip():
+        line_number += 1
+        yield line_number, _parse_line(buffer)
+
+
+def _parse_line(line: bytes) -> object:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return e
+
+
+class RequestBodyStreamingResponse(StreamingResponse):
+    """StreamingResponse for endpoints that keep reading the request body while responding.
+
+    The stock StreamingResponse listens for disconnects by calling receive() as soon
+    as the response starts, which swallows the remaining request body chunks. This
+    variant only starts listening once `body_consumed` is set.
+    """
+
+    def __init__(self, content, body_consumed: anyio.Event, **kwargs):
+        super().__init__(content, **kwargs)
+        self.body_consumed = body_consumed
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        async with anyio.create_task_group() as task_group:
+
+            async def stream_then_stop() -> None:
+                await self.stream_response(send)
+                task_group.cancel_scope.cancel()
+
+            task_group.start_soon(stream_then_stop)
+            await self.body_consumed.wait()
+            await self.listen_for_disconnect(receive)
+            task_group.cancel_scope.cancel()
+
+        if self.background is not None:
+            await self.background()
+
+
+async def track_consumption(chunks: AsyncIterable[bytes], consumed: anyio.Event) -> AsyncIterator[bytes]:
+    """Pass chunks through, setting `consumed` once the source is exhausted or fails"""
+    try:
+        async for chunk in chunks:
+            yield chunk
+    finally:
+        consumed.set()
@@ -1,47 +1,499 @@
 
+import logging
+import os
 import re
-from typing import List, Dict, Tuple
+import time
+from typing import AsyncIterator, Collection, List, Dict, Optional, Tuple
 from app.models.schemas import BiasIssue, Suggestion, BiasType, SeverityLevel, CategoryType, BiasAnalysisResult
 from app.services.llm_service import LLMService
+from app.services.analysis_store import AnalysisStore
+from app.services.analysis_selection import ANALYSIS_STAGES
+from app.services.incremental import (
+    INCREMENTAL_SEGMENTS, Segment, SegmentCache, document_fingerprint, document_scores, is_job_description, locate,
+    split_segments
+)
+from app.services.near_duplicate import NearDuplicateIndex
+from app.services.boilerplate import BoilerplateLibrary, StrippedText
+from app.services.detection_batcher import DetectionBatcher
+from app.services.token_usage import estimate_tokens
+from app.utils.metrics import REGISTRY, STAGE_LATENCY
+from app.utils.logging_config import log_payload
+from app.utils.tracing import traced
+from app.utils.deadline import Deadline, DeadlineExceeded
+from app.utils.helpers import BiasKeywords
+from app.utils.offset_map import OffsetMap
+from app.utils.text_normalizer import normalize_text
 import textstat
 
+logger = logging.getLogger(__name__)
+
+NORMALIZATION_TOKENS_SAVED = REGISTRY.counter(
+    "normalization_tokens_saved_total", "Estimated prompt tokens removed by text normalization"
+)
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+# Near-duplicate entries keep these detection fields, and these of each issue
+NEAR_DUPLICATE_FIELDS = ('role', 'industry', 'overall_assessment', 'bias_score', 'inclusivity_score', 'clarity_score')
+NEAR_DUPLICATE_ISSUE_FIELDS = ('type', 'text', 'severity', 'explanation')
+# Leading bytes of a paragraph fingerprint kept to recognise it in a near-duplicate
+PARAGRAPH_KEY_BYTES = 8
+
+# Detection result used when detect_bias fails
+DETECTION_FALLBACK = {
+    'role': 'Unknown',
+    'industry': 'Unknown',
+    'issues': [],
+    'bias_score': 0.0,
+    'inclusivity_score': 0.0,
+    'clarity_score': 0.0,
+    'overall_assessment': 'Analysis could not be completed due to service error'
+}
+
+
+def _paragraph_key(segment: Segment) -> bytes:
+    return bytes.fromhex(segment.fingerprint)[:PARAGRAPH_KEY_BYTES]
+
+
+def _keyword_pattern(words: List[str]) -> "re.Pattern":
+    alternatives = "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternatives})\b", re.IGNORECASE)
+
+
+# Word lists checked by detect_rule_based_bias, with the issue each hit becomes
+KEYWORD_RULES = [
+    (_keyword_pattern(BiasKeywords.GENDER_MASCULINE), BiasType.GENDER, SeverityLevel.LOW,
+     "Masculine-coded word that can discourage some applicants"),
+    (_keyword_pattern(BiasKeywords.GENDER_FEMININE), BiasType.GENDER, SeverityLevel.LOW,
+     "Feminine-coded word that can discourage some applicants"),
+    (_keyword_pattern(BiasKeywords.AGE_BIAS), BiasType.AGE, SeverityLevel.MEDIUM,
+     "Age-coded wording"),
+    (_keyword_pattern(BiasKeywords.CULTURAL_BIAS), BiasType.RACE_NATIONAL_ORIGIN, SeverityLevel.MEDIUM,
+     "Wording that can exclude applicants by background"),
+    (_keyword_pattern(BiasKeywords.EXCLUSIONARY_TERMS), BiasType.GENDER, SeverityLevel.MEDIUM,
+     "Gendered term"),
+]
+
+
+class ImprovementFailed(Exception):
+    """improve_language returned no usable rewrite"""
+
+    def __init__(self):
+        super().__init__("Language improvement service failed - cannot complete analysis")
+
+
 class BiasDetector:
     def __init__(self):
         self.llm_service = LLMService()
+        # Under a deadline, improve_language is skipped (partial result) with less than this left
+        self.improve_min_seconds = float(os.getenv("IMPROVE_MIN_BUDGET_SECONDS", "10"))
+        # Detection output of partial results, so only improve_language has to be retried
+        self.analysis_store = AnalysisStore(
+            ttl_seconds=float(os.getenv("ANALYSIS_STORE_TTL_SECONDS", "3600")),
+            max_entries=int(os.getenv("ANALYSIS_STORE_MAX_ENTRIES", "1000"))
+        )
+        # Per-paragraph detection and suggestions for analyze_incremental
+        self.segment_cache = SegmentCache(int(os.getenv("SEGMENT_CACHE_MAX_ENTRIES", "5000")))
+        # Detection results of past texts, reused for reposts that differ by a few lines
+        self.near_duplicates = NearDuplicateIndex.from_env()
+        # Recurring clean paragraphs (EEO statements, benefits) left out of prompts
+        self.boilerplate = BoilerplateLibrary.from_env()
+        # Extracted text is tidied (whitespace, hyphenation, page furniture) before prompting
+        self.normalize = os.getenv("TEXT_NORMALIZATION", "true").lower() == "true"
+        self.repeated_line_min = int(os.getenv("NORMALIZE_REPEATED_LINE_MIN", "3"))
+        # Short texts analyzed concurrently (bulk jobs) share detect_bias calls (BATCH_DETECTION=true)
+        self.detection_batcher = DetectionBatcher.from_env(self.llm_service)
         
        
     
-    async def analyze_comprehensive(self, text: str) -> BiasAnalysisResult:
-        print(f"Analyzing text: {text[:100]}...")  # Debug log
-        """Comprehensive bias analysis using both LLM and rule-based detection"""
+    async def analyze_comprehensive(self, text: str, deadline: Optional[Deadline] = None,
+                                    allow_partial: bool = False,
+                                    stages: Collection[str] = ANALYSIS_STAGES) -> BiasAnalysisResult:
+        """Comprehensive bias analysis using both LLM and rule-based detection.
+
+        With a `deadline`, DeadlineExceeded is raised if detection cannot finish in
+        time; if the budget runs out before or during improvement, a partial
+        result with only issues and scores is returned. With `allow_partial`, an
+        improvement failure also returns a partial result instead of raising
+        ImprovementFailed. Partial results carry a `result_id` for complete_improvement().
+        `stages` limits the run to "detect" and/or "improve"; skipped stages leave
+        their fields empty, and improvement alone gets no detected issues as context.
+        """
+        log_payload(logger, "Analyzing text", text)
+
+        if "detect" in stages:
+            llm_bias_result, all_issues = await self._detect_stage(text, deadline)
+        else:
+            llm_bias_result, all_issues = {}, []
+        if "improve" not in stages:
+            return self._build_result(llm_bias_result, all_issues, {})
+        if deadline is not None and deadline.remaining() < self.improve_min_seconds:
+            logger.info("Skipping improve_language: %.1fs of the deadline left", deadline.remaining())
+            return self._partial_result(text, llm_bias_result, all_issues, "deadline")
+        try:
+            llm_improvement_result = await self._improve_stage(text, all_issues, deadline)
+        except DeadlineExceeded:
+            logger.info("Deadline passed during improve_language; returning detection only")
+            return self._partial_result(text, llm_bias_result, all_issues, "deadline")
+        except ImprovementFailed:
+            if not allow_partial:
+                raise
+            return self._partial_result(text, llm_bias_result, all_issues, "improve_failed")
+
+        result = self._build_result(llm_bias_result, all_issues, llm_improvement_result)
+
+        log_payload(logger, "Final analysis result", result)
+        return result
+
+    def _partial_result(self, text: str, llm_bias_result: Dict, all_issues: List[BiasIssue],
+                        reason: str) -> BiasAnalysisResult:
+        result = self._build_result(llm_bias_result, all_issues, {}, partial_reason=reason)
+        result.result_id = self.analysis_store.save(text, llm_bias_result, all_issues, result)
+        return result
+
+    def get_analysis(self, result_id: str) -> Optional[BiasAnalysisResult]:
+        """The latest result for a partial analysis' ID, or None once it has expired"""
+        entry = self.analysis_store.get(result_id)
+        return entry.result if entry is not None else None
+
+    async def complete_improvement(self, result_id: str, deadline: Optional[Deadline] = None) -> BiasAnalysisResult:
+        """Run only improve_language for a stored partial analysis, reusing its detection.
+
+        Raises KeyError for an unknown or expired ID, and ImprovementFailed or
+        DeadlineExceeded like analyze_comprehensive. Completing an already
+        complete analysis returns it without another Gemini call.
+        """
+        entry = self.analysis_store.get(result_id)
+        if entry is None:
+            raise KeyError(result_id)
+        async with entry.lock:
+            if entry.result.partial:
+                llm_improvement_result = await self._improve_stage(entry.text, entry.issues, deadline)
+                result = self._build_result(entry.llm_bias_result, entry.issues, llm_improvement_result)
+                result.result_id = result_id
+                entry.result = result
+        return entry.result
+
+    async def analyze_incremental(self, text: str, deadline: Optional[Deadline] = None,
+                                  stages: Collection[str] = ANALYSIS_STAGES) -> BiasAnalysisResult:
+        """Analysis that only sends paragraphs not seen before to Gemini.
+
+        The text is split on blank lines and each paragraph is fingerprinted;
+        issues and suggestions are cached per paragraph. Detection sends the
+        whole text with the uncached paragraphs marked, so the model still sees
+        a complete job description but only reports issues for those; role,
+        industry and assessment are cached per document. Scores are computed
+        from the merged issues with the prompt's formulas, and issue offsets are
+        recomputed against the full text.
+
+        The full rewrite is not produced: improve_language returns a whole
+        formatted posting, which cannot be split back into paragraphs, so
+        `improved_text` is None. Raises ImprovementFailed or DeadlineExceeded
+        like analyze_comprehensive.
+        """
+        log_payload(logger, "Analyzing text incrementally", text)
+        segments = split_segments(text)
+        # Suggestions are made with the paragraph's issues as context, so detection always runs
+        llm_bias_result = await self._incremental_detect(segments, deadline)
+        if llm_bias_result is None:
+            llm_bias_result, all_issues = dict(DETECTION_FALLBACK), []
+        else:
+            all_issues = self._parse_llm_issues(llm_bias_result['issues'])
+        if "detect" not in stages:
+            llm_bias_result, all_issues = {}, []
+        if "improve" not in stages:
+            return self._build_result(llm_bias_result, all_issues, {})
+
+        improvements = await self._incremental_improve(segments, deadline)
+        suggestions, seo_keywords = [], []
+        for segment in segments:
+            entry = improvements[segment.fingerprint]
+            suggestions.extend(entry['suggestions'])
+            seo_keywords.extend(k for k in entry['seo_keywords'] if k not in seo_keywords)
+        result = self._build_result(llm_bias_result, all_issues,
+                                    {'suggestions': suggestions, 'seo_keywords': seo_keywords})
+        log_payload(logger, "Final incremental analysis result", result)
+        return result
+
+    def _changed(self, stage: str, segments: List[Segment]) -> Tuple[Dict[str, Dict], List[Segment]]:
+        """Cached entries for `stage` by fingerprint, and the distinct segments with none"""
+        cached, changed, seen = {}, [], set()
+        for segment in segments:
+            if segment.fingerprint in seen:
+                continue
+            seen.add(segment.fingerprint)
+            entry = self.segment_cache.get(stage, segment.fingerprint)
+            if entry is None:
+                changed.append(segment)
+            else:
+                cached[segment.fingerprint] = entry
+        INCREMENTAL_SEGMENTS.inc(len(cached), stage=stage, outcome="reused")
+        INCREMENTAL_SEGMENTS.inc(len(changed), stage=stage, outcome="analyzed")
+        logger.info("Incremental %s: %d paragraphs reused, %d sent to Gemini", stage, len(cached), len(changed))
+        return cached, changed
+
+    async def _incremental_detect(self, segments: List[Segment], deadline: Optional[Deadline]) -> Optional[Dict]:
+        """Document-level detection result, sending Gemini only what the cache lacks; None if detection failed"""
+        detections, changed = self._changed("detect", segments)
+        document_key = document_fingerprint(segments)
+        document = self.segment_cache.get("document", document_key)
+        if changed or document is None:
+            changed_fingerprints = {s.fingerprint for s in changed}
+            try:
+                llm_bias_result = await self.llm_service.detect_bias_changes(
+                    [s.text for s in segments],
+                    {index for index, s in enumerate(segments) if s.fingerprint in changed_fingerprints},
+                    deadline=deadline
+                )
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                logger.error("Error in LLM bias detection: %s", e)
+                return None
+            if not is_job_description(llm_bias_result):
+                # N/A describes the whole text, not any one paragraph, so nothing is cached
+                return {**llm_bias_result, 'issues': []}
+
+            # Issues are attributed to the changed paragraph that contains their phrase
+            issues_by_segment: Dict[str, List[Dict]] = {s.fingerprint: [] for s in changed}
+            for issue in llm_bias_result.get('issues', []):
+                found = locate(changed, issue.get('text') or '')
+                if found is not None:
+                    issues_by_segment[found[0].fingerprint].append(issue)
+            for segment in changed:
+                entry = {'issues': issues_by_segment[segment.fingerprint]}
+                self.segment_cache.put("detect", segment.fingerprint, entry)
+                detections[segment.fingerprint] = entry
+            document = {field: llm_bias_result.get(field) for field in ('role', 'industry', 'overall_assessment')}
+            self.segment_cache.put("document", document_key, document)
+        return self._merge_detections(segments, detections, document)
+
+    def _merge_detections(self, segments: List[Segment], detections: Dict[str, Dict], document: Dict) -> Dict:
+        """Document-level detection result from per-paragraph issues and the document's role and industry"""
+        llm_issues = []
+        for segment in segments:
+            # Issues whose phrase is no longer in their paragraph are dropped
+            llm_issues.extend(self._relocate_issues(detections[segment.fingerprint]['issues'], [segment]))
+        return {
+            **document,
+            **document_scores(llm_issues, sum(len(s.text) for s in segments)),
+            'issues': llm_issues
+        }
+
+    async def _incremental_improve(self, segments: List[Segment], deadline: Optional[Deadline]) -> Dict[str, Dict]:
+        """Suggestions and SEO keywords per fingerprint, improving only uncached paragraphs"""
+        improvements, changed = self._changed("improve", segments)
+        if not changed:
+            return improvements
+        issues = []
+        for segment in changed:
+            entry = self.segment_cache.get("detect", segment.fingerprint)
+            issues.extend(entry['issues'] if entry else [])
+        llm_improvement_result = await self._improve_stage(
+            "\n\n".join(s.text for s in changed), self._parse_llm_issues(issues), deadline
+        )
+
+        suggestions_by_segment: Dict[str, List[Dict]] = {s.fingerprint: [] for s in changed}
+        for suggestion in llm_improvement_result.get('suggestions', []):
+            found = locate(changed, suggestion.get('original') or '')
+            # Rephrasings of text that is not quoted verbatim stay with the first changed paragraph
+            owner = found[0] if found is not None else changed[0]
+            suggestions_by_segment[owner.fingerprint].append(suggestion)
+        seo_keywords = llm_improvement_result.get('seo_keywords', [])
+        for segment in changed:
+            entry = {'suggestions': suggestions_by_segment[segment.fingerprint], 'seo_keywords': seo_keywords}
+            self.segment_cache.put("improve", segment.fingerprint, entry)
+            improvements[segment.fingerprint] = entry
+        return improvements
+
+    def detect_rule_based_bias(self, text: str) -> List[BiasIssue]:
+        """Keyword-list hits in `text`, in order. Instant, but blind to context"""
+        issues = []
+        for pattern, bias_type, severity, explanation in KEYWORD_RULES:
+            for match in pattern.finditer(text):
+                alternative = BiasKeywords.INCLUSIVE_ALTERNATIVES.get(match.group().lower())
+                issues.append(BiasIssue(
+                    type=bias_type,
+                    text=match.group(),
+                    start_index=match.start(),
+                    end_index=match.end(),
+                    severity=severity,
+                    explanation=f"{explanation}; consider: {alternative}" if alternative else explanation
+                ))
+        issues.sort(key=lambda issue: issue.start_index)
+        return issues
+
+    async def analyze_stages(self, text: str) -> AsyncIterator[Tuple[str, Dict]]:
+        """Run the analysis stage by stage, yielding (event, payload) as each one finishes.
+
+        Every payload carries `stage_ms`, the time spent in the stage that produced it.
+        The last event is ("complete", {"analysis": BiasAnalysisResult, ...}).
+        """
+        started = time.perf_counter()
+        llm_bias_result, all_issues = await self._detect_stage(text)
+        yield "issues", {"issues": all_issues, "stage_ms": _elapsed_ms(started)}
 
+        started = time.perf_counter()
+        scores = self._parse_scores(llm_bias_result)
+        yield "scores", {**scores, "stage_ms": _elapsed_ms(started)}
+
+        started = time.perf_counter()
+        llm_improvement_result = await self._improve_stage(text, all_issues)
+        suggestions = self._parse_llm_suggestions(llm_improvement_result.get('suggestions', []))
+        yield "suggestions", {
+            "suggestions": suggestions,
+            "seo_keywords": llm_improvement_result.get('seo_keywords', []),
+            "stage_ms": _elapsed_ms(started)
+        }
+
+        started = time.perf_counter()
+        result = self._build_result(llm_bias_result, all_issues, llm_improvement_result)
+        yield "improved_text", {"improved_text": result.improved_text, "stage_ms": _elapsed_ms(started)}
+        yield "complete", {"analysis": result, "stage_ms": 0.0}
+
+    async def _detect_stage(self, text: str, deadline: Optional[Deadline] = None) -> Tuple[Dict, List[BiasIssue]]:
+        """First LLM call: bias detection. Falls back to an empty result on service errors"""
         all_issues = []  # Initialize empty list to avoid UnboundLocalError
+        llm_text, offset_maps, stripped = self._prompt_text(text)
         
         try:
-            # Get LLM analysis for bias detection
-            llm_bias_result = await self.llm_service.detect_bias(text)
+            llm_bias_result = await self._reuse_near_duplicate(llm_text, deadline)
+            if llm_bias_result is None:
+                # Get LLM analysis for bias detection
+                llm_bias_result = await self._detect(llm_text, deadline)
+                if self.near_duplicates is not None and is_job_description(llm_bias_result):
+                    self.near_duplicates.add(llm_text, self._near_duplicate_value(llm_text, llm_bias_result))
+            if offset_maps:
+                issues = llm_bias_result.get('issues', [])
+                for offsets in offset_maps:
+                    issues = self._map_offsets(issues, offsets)
+                llm_bias_result = {**llm_bias_result, 'issues': issues}
             
-            print(f"LLM bias result: {llm_bias_result}")  # Debug log
+            log_payload(logger, "LLM bias result", llm_bias_result)
 
              # Combine rule-based and LLM results
-            all_issues = self._parse_llm_issues(llm_bias_result.get('issues', []))
-            print(f"Parsed all_issues: {len(all_issues)} issues")  # Debug log
+            with STAGE_LATENCY.time(stage="validation"):
+                all_issues = self._parse_llm_issues(llm_bias_result.get('issues', []))
+            logger.debug("Parsed %d issues", len(all_issues))
+            if self.boilerplate is not None:
+                self.boilerplate.observe(stripped.original, [issue.text for issue in all_issues])
 
             
+        except DeadlineExceeded:
+            raise
         except Exception as e:
-            print(f"Error in LLM bias detection: {e}")
-            llm_bias_result = {
-        'role': 'Unknown',
-        'industry': 'Unknown', 
-        'issues': [],
-        'bias_score': 0.0,
-        'inclusivity_score': 0.0,
-        'clarity_score': 0.0,
-        'overall_assessment': 'Analysis could not be completed due to service error'
-    }
-            
-        # all_issues = []  # Ensure all_issues is defined even when bias detection fails
-        
+            logger.error("Error in LLM bias detection: %s", e)
+            llm_bias_result = dict(DETECTION_FALLBACK)
+        return llm_bias_result, all_issues
+
+    @staticmethod
+    def _near_duplicate_value(text: str, llm_bias_result: Dict) -> Tuple[bytes, Dict]:
+        """What reuse needs of a detection: paragraph keys, document fields and issues without offsets"""
+        keys = b"".join(_paragraph_key(segment) for segment in split_segments(text))
+        fields = {field: llm_bias_result.get(field) for field in NEAR_DUPLICATE_FIELDS}
+        fields['issues'] = tuple(
+            tuple(issue.get(field) for field in NEAR_DUPLICATE_ISSUE_FIELDS)
+            for issue in llm_bias_result.get('issues', []) if isinstance(issue, dict)
+        )
+        return keys, fields
+
+    async def _reuse_near_duplicate(self, text: str, deadline: Optional[Deadline] = None) -> Optional[Dict]:
+        """Detection result of a near-duplicate earlier text, or None without one.
+
+        Issues of the earlier result are moved to where their phrase is in
+        `text` (or dropped if it is gone). Paragraphs that are not in the
+        earlier text are checked by detect_bias_changes, with the rest as
+        context; when any issue was added or dropped, the scores are
+        recomputed from the new issue list.
+        """
+        if self.near_duplicates is None:
+            return None
+        match = self.near_duplicates.query(text)
+        if match is None:
+            return None
+        similarity, (prior_keys, prior) = match
+        segments = split_segments(text)
+        prior_keys = {prior_keys[i:i + PARAGRAPH_KEY_BYTES] for i in range(0, len(prior_keys), PARAGRAPH_KEY_BYTES)}
+        changed = {index for index, segment in enumerate(segments) if _paragraph_key(segment) not in prior_keys}
+        logger.info("Reusing detection of a near-duplicate text (similarity %.2f); %d new paragraphs",
+                    similarity, len(changed))
+
+        prior_issues = [dict(zip(NEAR_DUPLICATE_ISSUE_FIELDS, issue)) for issue in prior['issues']]
+        result = {**prior, 'issues': self._relocate_issues(prior_issues, segments)}
+        if changed:
+            changed_result = await self.llm_service.detect_bias_changes(
+                [segment.text for segment in segments], changed, deadline=deadline
+            )
+            if not is_job_description(changed_result):
+                return changed_result
+            result.update({field: changed_result.get(field) for field in ('role', 'industry', 'overall_assessment')})
+            result['issues'].extend(self._relocate_issues(
+                changed_result.get('issues', []), [segments[index] for index in sorted(changed)]
+            ))
+        if changed or len(result['issues']) != len(prior_issues):
+            result.update(document_scores(result['issues'], len(text)))
+        return result
+
+    async def _detect(self, text: str, deadline: Optional[Deadline] = None) -> Dict:
+        """detect_bias, through the batcher when batching is on"""
+        if self.detection_batcher is not None:
+            return await self.detection_batcher.detect(text, deadline)
+        return await self.llm_service.detect_bias(text, deadline=deadline)
+
+    @staticmethod
+    def _relocate_issues(issues: List[Dict], segments: List[Segment]) -> List[Dict]:
+        """Issues whose phrase is in one of `segments`, with offsets of its first occurrence"""
+        relocated = []
+        for issue in issues:
+            found = locate(segments, issue.get('text') or '')
+            if found is not None:
+                segment, index = found
+                start = segment.start + index
+                relocated.append({**issue, 'start_index': start, 'end_index': start + len(issue['text'].strip())})
+        return relocated
+
+    def _prompt_text(self, text: str) -> Tuple[str, List[OffsetMap], Optional[StrippedText]]:
+        """The text to send to Gemini: normalized, then without known-clean boilerplate.
+
+        Also returns the offset maps leading back to `text`, to apply in order,
+        and the boilerplate stripping (None when the library is off).
+        """
+        offset_maps = []
+        if self.normalize:
+            normalized = normalize_text(text, self.repeated_line_min)
+            if normalized.text and normalized.text != text:
+                NORMALIZATION_TOKENS_SAVED.inc(max(0, estimate_tokens(text) - estimate_tokens(normalized.text)))
+                text = normalized.text
+                offset_maps.append(normalized.offsets)
+        stripped = None
+        if self.boilerplate is not None:
+            stripped = self.boilerplate.strip(text)
+            if stripped.elided:
+                offset_maps.insert(0, stripped.offsets)
+            text = stripped.text
+        return text, offset_maps, stripped
+
+    @staticmethod
+    def _map_offsets(issues: List[Dict], offsets: OffsetMap) -> List[Dict]:
+        """Issues with offsets into a derived text moved to the original text"""
+        mapped = []
+        for issue in issues:
+            start, end = issue.get('start_index'), issue.get('end_index')
+            if isinstance(start, int) and isinstance(end, int):
+                start, end = offsets.span_to_original(start, end)
+                issue = {**issue, 'start_index': start, 'end_index': end}
+            mapped.append(issue)
+        return mapped
+
+    async def _improve_stage(self, text: str, all_issues: List[BiasIssue], deadline: Optional[Deadline] = None) -> Dict:
+        """Second LLM call: language improvement with the detected issues as context.
+
+        Known-clean boilerplate is left out of the prompt and appended to the rewrite unchanged.
+        """
+        llm_text, _, stripped = self._prompt_text(text)
         try:
             # Get LLM analysis for language improvement
             # Convert BiasIssue objects to dictionaries for the LLM prompt
@@ -54,10 +506,12 @@ class BiasDetector:
                     "explanation": issue.explanation
                 })
             
-            llm_improvement_result = await self.llm_service.improve_language(text, issues_for_llm)
+            llm_improvement_result = await self.llm_service.improve_language(llm_text, issues_for_llm, deadline=deadline)
             # print(f"LLM improve result: {llm_improvement_result}")  # Debug log
+        except DeadlineExceeded:
+            raise
         except Exception as e:
-            print(f"Error in LLM improvement: {e}")
+            logger.error("Error in LLM improvement: %s", e)
             llm_improvement_result = {
                 'suggestions': [], 
                 
@@ -67,68 +521,56 @@ class BiasDetector:
         
        # Check for error and raise an exception to stop processing
         if llm_improvement_result.get('improved_text') == 'Error generating improved text':
-            print("Improved text generation failed, aborting analysis")
-            raise Exception("Language improvement service failed - cannot complete analysis")
-        
-       
-        # rule_based_issues = self._detect_rule_based_bias(text)
-        # all_issues.extend(rule_based_issues)
-        
-        # Parse suggestions
-        suggestions = self._parse_llm_suggestions(llm_improvement_result.get('suggestions', []))
-        
-        # Calculate scores
-        # bias_score = llm_bias_result.get('bias_score')
-           # Calculate scores - HANDLE STRING TO FLOAT CONVERSION
-        bias_score = llm_bias_result.get('bias_score')
-        if isinstance(bias_score, str):
-            try:
-                bias_score = float(bias_score)
-            except (ValueError, TypeError):
-                bias_score = 0.0
+            logger.error("Improved text generation failed, aborting analysis")
+            raise ImprovementFailed()
+        if stripped is not None and stripped.elided:
+            llm_improvement_result = {
+                **llm_improvement_result,
+                'improved_text': stripped.reattach(llm_improvement_result.get('improved_text'))
+            }
+        return llm_improvement_result
 
-        # clarity_score = llm_improvement_result.get( self._calculate_clarity_score(text))
-        clarity_score = llm_bias_result.get('clarity_score')
-        if isinstance(clarity_score, str):
-            try:
-                clarity_score = float(clarity_score)
-            except (ValueError, TypeError):
-                clarity_score = 0.0
+    def _parse_scores(self, llm_bias_result: Dict) -> Dict:
+        """Pull role, industry, assessment and the three scores out of the detection result"""
+           # Calculate scores - HANDLE STRING TO FLOAT CONVERSION
+        return {
+            "role": llm_bias_result.get('role'),
+            "industry": llm_bias_result.get('industry'),
+            "bias_score": self._to_score(llm_bias_result.get('bias_score')),
+            "inclusivity_score": self._to_score(llm_bias_result.get('inclusivity_score')),
+            "clarity_score": self._to_score(llm_bias_result.get('clarity_score')),
+            "overall_assessment": llm_bias_result.get('overall_assessment')
+        }
 
-        
-        # inclusivity_score = llm_improvement_result.get( self._calculate_inclusivity_score(text))
-        inclusivity_score = llm_bias_result.get('inclusivity_score')
-        if isinstance(inclusivity_score, str):
+    @staticmethod
+    def _to_score(score):
+        """Convert string scores from the LLM to float, defaulting to 0.0 when unparseable"""
+        if isinstance(score, str):
             try:
-                inclusivity_score = float(inclusivity_score)
+                score = float(score)
             except (ValueError, TypeError):
-                inclusivity_score = 0.0
-
-        #Get the role 
-        role = llm_bias_result.get('role')
+                score = 0.0
+        return score
 
-        #Get he Industry
-        industry = llm_bias_result.get('industry')
-        # Get overall assessment
-        overall_assessment = llm_bias_result.get('overall_assessment')
-        # print(f"overall_assessment: {overall_assessment}")
-      
+    @traced("detector.build_result")
+    def _build_result(self, llm_bias_result: Dict, all_issues: List[BiasIssue], llm_improvement_result: Dict,
+                      partial_reason: Optional[str] = None) -> BiasAnalysisResult:
+        # rule_based_issues = self._detect_rule_based_bias(text)
+        # all_issues.extend(rule_based_issues)
         
-        result=BiasAnalysisResult(
-            role=role,
-            industry=industry,
-            bias_score=bias_score,
-            inclusivity_score=inclusivity_score,
-            clarity_score=clarity_score,
-            issues=all_issues,
-            suggestions=suggestions,
-            seo_keywords=llm_improvement_result.get('seo_keywords', []),
-            improved_text=llm_improvement_result.get('improved_text'),
-            overall_assessment=llm_bias_result.get('overall_assessment')
-        )
-
-        print(f"Final result before return: {result}")  # Debug log
-        return result
+        with STAGE_LATENCY.time(stage="validation"):
+            # Parse suggestions
+            suggestions = self._parse_llm_suggestions(llm_improvement_result.get('suggestions', []))
+            
+            return BiasAnalysisResult(
+                **self._parse_scores(llm_bias_result),
+                issues=all_issues,
+                suggestions=suggestions,
+                seo_keywords=llm_improvement_result.get('seo_keywords', []),
+                improved_text=llm_improvement_result.get('improved_text'),
+                partial=partial_reason is not None,
+                partial_reason=partial_reason
+            )
     
     # def _parse_llm_issues(self, llm_issues: List[Dict]) -> List[BiasIssue]:
     #     """Parse LLM bias issues into BiasIssue objects"""
@@ -182,6 +624,7 @@ class BiasDetector:
     #             continue
     #     return issues
 
+    @traced("detector.parse_issues")
     def _parse_llm_issues(self, llm_issues: List[Dict]) -> List[BiasIssue]:
         """Parse LLM bias issues into BiasIssue objects with duplicate prevention"""
         issues = []
@@ -191,7 +634,7 @@ class BiasDetector:
             try:
                 # Validate required fields
                 if not issue.get('type') or not issue.get('text'):
-                    print(f"Skipping incomplete issue: {issue}")
+                    logger.debug("Skipping incomplete issue: %s", issue)
                     continue
                 
                 # Get the biased text and normalize it for comparison
@@ -199,7 +642,7 @@ class BiasDetector:
                 
                 # Skip if we've already processed this exact phrase
                 if biased_text in seen_phrases:
-                    print(f"Skipping duplicate phrase: '{biased_text}'")
+                    logger.debug("Skipping duplicate phrase: '%s'", biased_text)
                     continue
                 
                 # Add to seen phrases set
@@ -213,7 +656,7 @@ class BiasDetector:
                 try:
                     bias_type = BiasType(bias_type_str)
                 except ValueError:
-                    print(f"Unknown bias type '{bias_type_str}', defaulting to clarity")
+                    logger.debug("Unknown bias type '%s', defaulting to clarity", bias_type_str)
                     bias_type = BiasType.CLARITY  # Changed default to clarity
                 
                 # Handle SeverityLevel validation
@@ -221,7 +664,7 @@ class BiasDetector:
                 try:
                     severity = SeverityLevel(severity_str)
                 except ValueError:
-                    print(f"Unknown severity '{severity_str}', defaulting to medium")
+                    logger.debug("Unknown severity '%s', defaulting to medium", severity_str)
                     severity = SeverityLevel.MEDIUM
                 
                 bias_issue = BiasIssue(
@@ -235,13 +678,14 @@ class BiasDetector:
                 issues.append(bias_issue)
                 
             except Exception as e:
-                print(f"Error parsing LLM issue: {e}")
-                print(f"Problematic issue: {issue}")
+                logger.warning("Error parsing LLM issue: %s", e)
+                log_payload(logger, "Problematic issue", issue)
                 continue
         
         # print(f"Processed {len(llm_issues)} LLM issues, returned {len(issues)} unique issues")
         return issues
     
+    @traced("detector.parse_suggestions")
     def _parse_llm_suggestions(self, llm_suggestions: List[Dict]) -> List[Suggestion]:
         """Parse LLM suggestions into Suggestion objects"""
         suggestions = []
@@ -264,8 +708,8 @@ class BiasDetector:
                 )
                 suggestions.append(suggestion_obj)
             except Exception as e:
-                print(f"Error parsing LLM suggestion: {e}")
-                print(f"Problematic suggestion: {suggestion}")
+                logger.warning("Error parsing LLM suggestion: %s", e)
+                log_payload(logger, "Problematic suggestion", suggestion)
                 continue
         return suggestions
     
@@ -284,7 +728,7 @@ class BiasDetector:
                 continue
         
         # If none match, default to clarity
-        print(f"No valid category found in '{category_str}', defaulting to clarity")
+        logger.debug("No valid category found in '%s', defaulting to clarity", category_str)
         return CategoryType.CLARITY
     
     
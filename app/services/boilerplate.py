@@ -0,0 +1,191 @@
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.services.incremental import Segment, split_segments
+from app.services.token_usage import estimate_tokens
+from app.utils.metrics import REGISTRY
+from app.utils.offset_map import MappedTextBuilder, OffsetMap
+
+BOILERPLATE_ELIDED_TOKENS = REGISTRY.counter(
+    "boilerplate_elided_tokens_total", "Estimated tokens of known-clean boilerplate left out of analyzed texts"
+)
+
+
+def _words(text: str) -> Set[str]:
+    return set(re.findall(r"\w+", text.lower()))
+
+
+class StrippedText:
+    """A text with its known-clean boilerplate paragraphs taken out.
+
+    `anchors` holds, for each elided paragraph, the kept paragraph it followed
+    (None if it came before all of them).
+    """
+
+    # Share of an anchor's words a rewritten paragraph must contain to count as its rewrite
+    ANCHOR_MIN_OVERLAP = 0.5
+
+    def __init__(self, original: str, text: str, offsets: OffsetMap, elided: List[Segment],
+                 anchors: Optional[List[Optional[Segment]]] = None):
+        self.original = original
+        self.text = text
+        self.offsets = offsets
+        self.elided = elided
+        self.anchors = anchors if anchors is not None else [None] * len(elided)
+
+    def reattach(self, improved_text: Optional[str]) -> Optional[str]:
+        """`improved_text` with the elided paragraphs put back, unchanged.
+
+        Each goes after the rewritten paragraph that best matches the kept
+        paragraph it followed, or first if it came before every kept one.
+        When no rewritten paragraph has ANCHOR_MIN_OVERLAP of the anchor's
+        words, it goes at the end. The original order is always kept.
+        """
+        if not self.elided or not improved_text or improved_text.startswith("N/A"):
+            return improved_text
+        paragraphs = split_segments(improved_text)
+        if not paragraphs:
+            return improved_text
+
+        # Slot k is before rewritten paragraph k; the last slot is the end of the text
+        slots: Dict[int, List[str]] = {}
+        floor = 0
+        for segment, anchor in zip(self.elided, self.anchors):
+            slot = 0 if anchor is None else self._slot_after(anchor, paragraphs, floor)
+            floor = max(floor, slot)
+            slots.setdefault(floor, []).append(segment.text)
+
+        result = improved_text
+        for slot in sorted(slots, reverse=True):
+            block = "\n\n".join(slots[slot])
+            if slot == 0:
+                offset, block = paragraphs[0].start, block + "\n\n"
+            else:
+                offset, block = paragraphs[slot - 1].end, "\n\n" + block
+            result = result[:offset] + block + result[offset:]
+        return result
+
+    def _slot_after(self, anchor: Segment, paragraphs: List[Segment], floor: int) -> int:
+        anchor_words = _words(anchor.text)
+        best, best_overlap = len(paragraphs), 0.0
+        for index in range(max(floor - 1, 0), len(paragraphs)):
+            overlap = len(anchor_words & _words(paragraphs[index].text)) / max(len(anchor_words), 1)
+            if overlap > best_overlap:
+                best, best_overlap = index + 1, overlap
+        return best if best_overlap >= self.ANCHOR_MIN_OVERLAP else len(paragraphs)
+
+
+class _ParagraphStats:
+    __slots__ = ("documents", "flagged")
+
+    def __init__(self):
+        self.documents = 0
+        self.flagged = False
+
+
+class BoilerplateLibrary:
+    """Paragraph fingerprints learned from how often they recur across analyzed texts.
+
+    A paragraph of at least `min_chars` that has appeared in `min_documents`
+    analyzed texts, and never contained a detected issue, is known-clean
+    boilerplate (an EEO statement, a benefits block) and is left out of Gemini
+    prompts. Only texts whose detection ran are learned from, so a paragraph
+    is checked every time until it qualifies. At most `max_tracked`
+    fingerprints are kept, least recently seen evicted first.
+    """
+
+    def __init__(self, min_documents: int = 3, min_chars: int = 200, max_tracked: int = 20000):
+        self.min_documents = min_documents
+        self.min_chars = min_chars
+        self.max_tracked = max_tracked
+        self._paragraphs: "OrderedDict[str, _ParagraphStats]" = OrderedDict()
+        self.stripped_requests = 0
+        self.elided_paragraphs = 0
+        self.elided_chars = 0
+        self.elided_tokens = 0
+        self.sent_chars = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["BoilerplateLibrary"]:
+        """BOILERPLATE_ELISION=true enables the library (off by default)"""
+        if os.getenv("BOILERPLATE_ELISION", "false").lower() != "true":
+            return None
+        return cls(
+            min_documents=int(os.getenv("BOILERPLATE_MIN_DOCUMENTS", "3")),
+            min_chars=int(os.getenv("BOILERPLATE_MIN_CHARS", "200")),
+            max_tracked=int(os.getenv("BOILERPLATE_MAX_TRACKED", "20000"))
+        )
+
+    def is_known_clean(self, segment: Segment) -> bool:
+        stats = self._paragraphs.get(segment.fingerprint)
+        return (stats is not None and not stats.flagged and stats.documents >= self.min_documents
+                and len(segment.text) >= self.min_chars)
+
+    def observe(self, text: str, issue_phrases: Iterable[str]) -> None:
+        """Learn from a text whose detection ran; paragraphs containing an issue are never elided"""
+        phrases = [phrase.strip().lower() for phrase in issue_phrases if phrase and phrase.strip()]
+        seen = set()
+        for segment in split_segments(text):
+            if segment.fingerprint in seen or len(segment.text) < self.min_chars:
+                continue
+            seen.add(segment.fingerprint)
+            stats = self._paragraphs.get(segment.fingerprint)
+            if stats is None:
+                stats = self._paragraphs[segment.fingerprint] = _ParagraphStats()
+            self._paragraphs.move_to_end(segment.fingerprint)
+            stats.documents += 1
+            lowered = segment.text.lower()
+            if any(phrase in lowered for phrase in phrases):
+                stats.flagged = True
+        while len(self._paragraphs) > self.max_tracked:
+            self._paragraphs.popitem(last=False)
+
+    def strip(self, text: str) -> StrippedText:
+        """`text` without its known-clean paragraphs (unchanged if nothing else would be left)"""
+        segments = split_segments(text)
+        kept = [segment for segment in segments if not self.is_known_clean(segment)]
+        if len(kept) == len(segments) or not kept:
+            builder = MappedTextBuilder(text)
+            builder.copy(0, len(text))
+            stripped, offsets = builder.build()
+            self.sent_chars += len(text)
+            return StrippedText(text, stripped, offsets, [])
+
+        builder = MappedTextBuilder(text)
+        for segment in kept:
+            if len(builder):
+                builder.insert("\n\n", segment.start)
+            builder.copy(segment.start, segment.end)
+        stripped, offsets = builder.build()
+        elided, anchors, anchor = [], [], None
+        for segment in segments:
+            if segment in kept:
+                anchor = segment
+            else:
+                elided.append(segment)
+                anchors.append(anchor)
+        elided_tokens = sum(estimate_tokens(segment.text) for segment in elided)
+        self.stripped_requests += 1
+        self.elided_paragraphs += len(elided)
+        self.elided_chars += sum(len(segment.text) for segment in elided)
+        self.elided_tokens += elided_tokens
+        self.sent_chars += len(stripped)
+        BOILERPLATE_ELIDED_TOKENS.inc(elided_tokens)
+        return StrippedText(text, stripped, offsets, elided, anchors)
+
+    def snapshot(self) -> Dict:
+        total = self.elided_chars + self.sent_chars
+        return {
+            "tracked_paragraphs": len(self._paragraphs),
+            "known_clean": sum(
+                1 for stats in self._paragraphs.values()
+                if not stats.flagged and stats.documents >= self.min_documents
+            ),
+            "stripped_requests": self.stripped_requests,
+            "elided_paragraphs": self.elided_paragraphs,
+            # Saved on each Gemini call that receives the text
+            "estimated_tokens_elided": self.elided_tokens,
+            "elided_fraction": round(self.elided_chars / total, 3) if total else 0.0
+        }
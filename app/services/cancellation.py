@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Sequence
+from app.services.llm_service import LLMService, LLMCallLog, track_llm_calls, untrack_llm_calls
+
+
+# Gemini calls one /analyze request makes, in order
+ANALYSIS_LLM_CALLS = ("detect_bias", "improve_language")
+
+logger = logging.getLogger(__name__)
+
+
+class ClientDisconnected(Exception):
+    """The client went away before the request's work finished"""
+
+
+async def wait_for_disconnect(receive) -> None:
+    """Return once the ASGI server reports `http.disconnect`.
+
+    Only safe after the request body has been read, since any remaining body
+    messages are consumed and dropped.
+    """
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+class CancellationTracker:
+    """Cancels a request's work when its client disconnects and tallies what that saved.
+
+    Gemini calls that had not been issued yet are counted as saved, using the
+    running averages of completed calls for their latency and token estimates.
+    A call already in flight finishes in its worker thread (the SDK call is
+    blocking), but its result is dropped and nothing queued behind it runs.
+    """
+
+    def __init__(self, llm_service: LLMService):
+        self.llm_service = llm_service
+        self.cancelled_requests = 0
+        self.llm_calls_saved = 0
+        self.llm_ms_saved = 0.0
+        self.tokens_saved = 0
+        self.llm_calls_abandoned = 0
+
+    async def run(self, receive, work: Callable[[], Awaitable], planned_calls: Sequence[str] = ANALYSIS_LLM_CALLS):
+        """Await `work()`, cancelling it and raising ClientDisconnected if the client disconnects first"""
+        log = LLMCallLog()
+        token = track_llm_calls(log)
+        try:
+            task = asyncio.ensure_future(work())
+        finally:
+            untrack_llm_calls(token)
+        watcher = asyncio.ensure_future(wait_for_disconnect(receive))
+
+        try:
+            await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            watcher.cancel()
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                self._record(log, planned_calls)
+
+        if task.cancelled():
+            raise ClientDisconnected()
+        return task.result()
+
+    def _record(self, log: LLMCallLog, planned_calls: Sequence[str]) -> None:
+        self.cancelled_requests += 1
+        self.llm_calls_abandoned += len(log.started) - len(log.finished)
+        remaining = list(planned_calls)
+        for call_name in log.started:
+            if call_name in remaining:
+                remaining.remove(call_name)
+        for call_name in remaining:
+            average = self.llm_service.average_call(call_name)
+            self.llm_calls_saved += 1
+            self.llm_ms_saved += average["ms"]
+            self.tokens_saved += average["tokens"]
+        logger.info("Client disconnected", extra={"fields": {"llm_calls_cancelled": len(remaining)}})
+
+    def snapshot(self) -> Dict:
+        return {
+            "cancelled_requests": self.cancelled_requests,
+            "llm_calls_saved": self.llm_calls_saved,
+            "llm_ms_saved": round(self.llm_ms_saved, 2),
+            "estimated_tokens_saved": self.tokens_saved,
+            "llm_calls_abandoned": self.llm_calls_abandoned
+        }
@@ -0,0 +1,144 @@
+import asyncio
+import contextvars
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+from app.services.llm_service import DETECT_BIAS_PROMPT
+from app.services.token_usage import estimate_tokens
+from app.utils.deadline import Deadline
+from app.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+BATCHED_DETECTIONS = REGISTRY.counter(
+    "batched_detections_total",
+    "Detections through the batcher by outcome (batched, retried, direct)",
+    ("outcome",)
+)
+DETECTION_BATCH_SIZE = REGISTRY.histogram(
+    "detection_batch_size", "Texts per batched detect_bias call", buckets=(1, 2, 4, 8, 16, 32)
+)
+
+# A text waiting for its batch, and where its detection goes
+_Pending = Tuple[str, "asyncio.Future[Dict]"]
+
+
+class DetectionBatcher:
+    """Packs concurrent detect_bias calls for short texts into shared Gemini requests.
+
+    Texts of up to `max_chars` wait up to `linger_seconds` for company; a batch
+    is sent once it holds `max_items` texts or `max_tokens` estimated tokens of
+    them. The instructions are then paid for once per batch instead of once per
+    text. Texts missing from a batched response are re-run with detect_bias on
+    their own. Longer texts, and calls with a deadline, are never held back.
+    """
+
+    def __init__(self, llm_service, max_items: int = 8, max_tokens: int = 6000, max_chars: int = 4000,
+                 linger_seconds: float = 0.05):
+        self.llm_service = llm_service
+        self.max_items = max(1, max_items)
+        self.max_tokens = max_tokens
+        self.max_chars = max_chars
+        self.linger_seconds = linger_seconds
+        self._pending: List[_Pending] = []
+        self._pending_tokens = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self.batches = 0
+        self.batched_texts = 0
+        self.retried_texts = 0
+        self.direct_texts = 0
+
+    @classmethod
+    def from_env(cls, llm_service) -> Optional["DetectionBatcher"]:
+        """BATCH_DETECTION=true enables batching (off by default)"""
+        if os.getenv("BATCH_DETECTION", "false").lower() != "true":
+            return None
+        return cls(
+            llm_service,
+            max_items=int(os.getenv("BATCH_DETECT_MAX_ITEMS", "8")),
+            max_tokens=int(os.getenv("BATCH_DETECT_MAX_TOKENS", "6000")),
+            max_chars=int(os.getenv("BATCH_DETECT_MAX_CHARS", "4000")),
+            linger_seconds=float(os.getenv("BATCH_DETECT_LINGER_MS", "50")) / 1000
+        )
+
+    async def detect(self, text: str, deadline: Optional[Deadline] = None) -> Dict:
+        """detect_bias(text), answered from a shared request when `text` is short"""
+        if deadline is not None or len(text) > self.max_chars or self.max_items == 1:
+            self.direct_texts += 1
+            BATCHED_DETECTIONS.inc(outcome="direct")
+            return await self.llm_service.detect_bias(text, deadline=deadline)
+
+        tokens = estimate_tokens(text)
+        if self._pending and self._pending_tokens + tokens > self.max_tokens:
+            self._flush()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((text, future))
+        self._pending_tokens += tokens
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.linger_seconds, self._flush)
+        # Cancelling the caller cancels only its future; the batch goes on for the others
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_tokens = self._pending, [], 0
+        if not batch:
+            return
+        # A fresh context keeps the shared call out of any one request's token usage and call log
+        task = asyncio.get_running_loop().create_task(self._run(batch), context=contextvars.Context())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[_Pending]) -> None:
+        texts = [text for text, _ in batch]
+        try:
+            if len(batch) == 1:
+                detections = [await self.llm_service.detect_bias(texts[0])]
+            else:
+                detections = await self.llm_service.detect_bias_batch(texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        missing = [i for i, detection in enumerate(detections) if detection is None]
+        self.batches += 1
+        self.batched_texts += len(batch) - len(missing)
+        self.retried_texts += len(missing)
+        DETECTION_BATCH_SIZE.observe(len(batch))
+        BATCHED_DETECTIONS.inc(len(batch) - len(missing), outcome="batched")
+        if missing:
+            logger.info("Re-running %d of %d batched texts individually", len(missing), len(batch))
+            BATCHED_DETECTIONS.inc(len(missing), outcome="retried")
+            retries = await asyncio.gather(
+                *(self.llm_service.detect_bias(texts[i]) for i in missing), return_exceptions=True
+            )
+            for i, retry in zip(missing, retries):
+                detections[i] = retry
+
+        for (_, future), detection in zip(batch, detections):
+            if future.done():
+                continue
+            if isinstance(detection, BaseException):
+                future.set_exception(detection)
+            else:
+                future.set_result(detection)
+
+    def snapshot(self) -> Dict:
+        # A batch pays for the instructions once instead of once per text it answers
+        instructions_tokens = estimate_tokens(DETECT_BIAS_PROMPT.instructions)
+        return {
+            "batches": self.batches,
+            "batched_texts": self.batched_texts,
+            "retried_texts": self.retried_texts,
+            "direct_texts": self.direct_texts,
+            "avg_batch_size": round((self.batched_texts + self.retried_texts) / self.batches, 2) if self.batches else 0.0,
+            "estimated_instruction_tokens_saved": max(0, self.batched_texts - self.batches) * instructions_tokens
+        }
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+from app.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+LLM_HEDGES = REGISTRY.counter(
+    "llm_hedges_total", "Hedged Gemini calls by outcome (hedge_won, primary_won, skipped)", ("call", "outcome")
+)
+
+
+class _CallHistory:
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.hedged: Deque[bool] = deque(maxlen=window)
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.skipped = 0
+
+
+class Hedger:
+    """Fires a second identical call when the first is slower than usual.
+
+    Once `min_samples` latencies are known for a call, an attempt still running
+    at the `percentile` of the recent latencies gets a duplicate; whichever
+    succeeds first is used and the other is cancelled. Hedges are limited to
+    `max_rate` of the last `window` calls so they cannot multiply quota use.
+
+    Cancelling a blocking SDK call only drops its result; the request already
+    sent to Gemini still completes and is billed.
+    """
+
+    def __init__(self, percentile: float = 95.0, max_rate: float = 0.05, min_samples: int = 20, window: int = 200):
+        self.percentile = percentile
+        self.max_rate = max_rate
+        self.min_samples = min_samples
+        self.window = window
+        self._history: Dict[str, _CallHistory] = {}
+
+    @classmethod
+    def from_env(cls) -> Optional["Hedger"]:
+        """HEDGE_REQUESTS=true enables hedging (off by default)"""
+        if os.getenv("HEDGE_REQUESTS", "false").lower() != "true":
+            return None
+        return cls(
+            percentile=float(os.getenv("HEDGE_PERCENTILE", "95")),
+            max_rate=float(os.getenv("HEDGE_MAX_RATE", "0.05")),
+            min_samples=int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+        )
+
+    def _calls(self, call: str) -> _CallHistory:
+        history = self._history.get(call)
+        if history is None:
+            history = self._history[call] = _CallHistory(self.window)
+        return history
+
+    def delay(self, call: str) -> Optional[float]:
+        """Seconds to wait before hedging `call`, or None while there is too little history"""
+        latencies = self._calls(call).latencies
+        if len(latencies) < self.min_samples:
+            return None
+        ordered = sorted(latencies)
+        rank = max(0, math.ceil(self.percentile / 100 * len(ordered)) - 1)
+        return ordered[rank]
+
+    def _hedge_allowed(self, history: _CallHistory) -> bool:
+        return (sum(history.hedged) + 1) / (len(history.hedged) + 1) <= self.max_rate
+
+    async def run(self, call: str, attempt: Callable[[], Awaitable]):
+        """Await `attempt()`, starting a second one if the first is slow"""
+        history = self._calls(call)
+        history.calls += 1
+        started = time.perf_counter()
+        delay = self.delay(call)
+        primary = asyncio.ensure_future(attempt())
+        hedge = None
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait({primary}, timeout=delay)
+                if not done:
+                    if self._hedge_allowed(history):
+                        hedge = asyncio.ensure_future(attempt())
+                        history.hedges += 1
+                    else:
+                        history.skipped += 1
+                        LLM_HEDGES.inc(call=call, outcome="skipped")
+            history.hedged.append(hedge is not None)
+
+            if hedge is None:
+                result = await primary
+            else:
+                winner = await self._first_success(primary, hedge)
+                won = "hedge_won" if winner is hedge else "primary_won"
+                if winner is hedge:
+                    history.hedge_wins += 1
+                LLM_HEDGES.inc(call=call, outcome=won)
+                logger.debug("Hedged %s after %.0f ms: %s", call, delay * 1000, won)
+                result = winner.result()
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+        history.latencies.append(time.perf_counter() - started)
+        return result
+
+    @staticmethod
+    async def _first_success(primary: asyncio.Future, hedge: asyncio.Future) -> asyncio.Future:
+        """The first attempt to succeed, or the primary (with its error) if both fail"""
+        pending = {primary, hedge}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception() is None:
+                    return task
+        return primary
+
+    def snapshot(self) -> Dict[str, Dict]:
+        report = {}
+        for call, history in self._history.items():
+            delay = self.delay(call)
+            report[call] = {
+                "calls": history.calls,
+                "hedges": history.hedges,
+                "hedge_wins": history.hedge_wins,
+                "hedge_win_rate": round(history.hedge_wins / history.hedges, 3) if history.hedges else 0.0,
+                "skipped_over_rate_cap": history.skipped,
+                "hedge_after_ms": round(delay * 1000, 2) if delay is not None else None
+            }
+        return report
@@ -0,0 +1,131 @@
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.utils.metrics import REGISTRY
+
+INCREMENTAL_SEGMENTS = REGISTRY.counter(
+    "incremental_segments_total", "Paragraphs seen by incremental analysis, reused from cache or sent to Gemini",
+    ("stage", "outcome")
+)
+
+# Paragraphs are separated by blank lines
+_SEGMENT_BREAK = re.compile(r"\n[ \t]*\n\s*")
+
+
+class Segment:
+    """One paragraph of a document and where it starts in the full text"""
+
+    __slots__ = ("text", "start", "fingerprint")
+
+    def __init__(self, text: str, start: int):
+        self.text = text
+        self.start = start
+        # Whitespace-insensitive, so re-wrapping a paragraph does not count as an edit
+        self.fingerprint = hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.text)
+
+
+def split_segments(text: str) -> List[Segment]:
+    """Split text into non-empty paragraphs, keeping their offsets into `text`"""
+    segments = []
+    position = 0
+    for match in _SEGMENT_BREAK.finditer(text):
+        _append_segment(segments, text, position, match.start())
+        position = match.end()
+    _append_segment(segments, text, position, len(text))
+    return segments
+
+
+def _append_segment(segments: List[Segment], text: str, start: int, end: int) -> None:
+    chunk = text[start:end]
+    stripped = chunk.strip()
+    if stripped:
+        segments.append(Segment(stripped, start + chunk.index(stripped)))
+
+
+def locate(segments: Sequence[Segment], phrase: str) -> Optional[Tuple[Segment, int]]:
+    """First segment containing `phrase` (case-insensitive) and the phrase's offset within it"""
+    needle = phrase.strip().lower()
+    if not needle:
+        return None
+    for segment in segments:
+        index = segment.text.lower().find(needle)
+        if index >= 0:
+            return segment, index
+    return None
+
+
+# Severity weights and normalization of the detection prompt's scoring step
+SEVERITY_WEIGHTS = {"high": 0.8, "medium": 0.4, "low": 0.1}
+# Roughly one page of text, for the prompt's 1-2 / 2-3 / 3+ page tiers
+PAGE_CHARS = 3000
+
+
+def document_fingerprint(segments: Sequence[Segment]) -> str:
+    """Fingerprint of a whole document, from its paragraph fingerprints in order"""
+    return hashlib.sha256(" ".join(s.fingerprint for s in segments).encode("ascii")).hexdigest()
+
+
+def is_job_description(detection: Dict) -> bool:
+    """False for the detection prompt's N/A answer, whose scores are not numbers"""
+    try:
+        float(detection.get("bias_score"))
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def document_scores(issues: Iterable[Dict], text_length: int) -> Dict[str, float]:
+    """The three scores of a document with `issues`, by the detection prompt's formulas.
+
+    Lets paragraph-level issue lists be combined into document-level scores
+    without another Gemini call.
+    """
+    pages = text_length / PAGE_CHARS
+    max_possible = 2.0 if pages <= 2 else 3.0 if pages <= 3 else 4.0
+    bias = clarity = 0.0
+    for issue in issues:
+        weight = SEVERITY_WEIGHTS.get(str(issue.get("severity", "")).lower(), 0.0)
+        if str(issue.get("type", "")).lower() == "clarity":
+            clarity += weight
+        else:
+            bias += weight
+    bias_score = min(1.0, bias / max_possible)
+    return {
+        "bias_score": round(bias_score, 2),
+        "inclusivity_score": round(max(0.0, 1.0 - bias_score), 2),
+        "clarity_score": round(max(0.0, 1.0 - clarity / max_possible), 2),
+    }
+
+
+class SegmentCache:
+    """LRU of per-paragraph stage results keyed by (stage, fingerprint).
+
+    Content-addressed, so identical paragraphs share entries across documents
+    and clients.
+    """
+
+    def __init__(self, max_entries: int = 5000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+
+    def get(self, stage: str, fingerprint: str) -> Optional[Dict]:
+        key = (stage, fingerprint)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, stage: str, fingerprint: str, entry: Dict) -> None:
+        self._entries[(stage, fingerprint)] = entry
+        self._entries.move_to_end((stage, fingerprint))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,248 @@
+import asyncio
+import ipaddress
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Collection, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+class JobQueue:
+    """Durable job queue backed by a local SQLite database.
+
+    Jobs survive process restarts: anything left `running` by a worker that died
+    is put back to `queued` by `recover()` when the worker pool starts again.
+    """
+
+    def __init__(self, db_path: str = "jobs.db", max_attempts: int = 3):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    text TEXT,
+                    filename TEXT,
+                    content BLOB,
+                    callback_url TEXT,
+                    result TEXT,
+                    error_message TEXT,
+                    error_status INTEGER,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+
+    def submit(self, text: Optional[str] = None, filename: Optional[str] = None,
+               content: Optional[bytes] = None, callback_url: Optional[str] = None) -> Dict:
+        """Queue a text (or an uploaded file to extract first) for analysis"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, text, filename, content, callback_url, created_at, updated_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?, ?)",
+                (job_id, text, filename, content, callback_url, now, now)
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def claim_next(self) -> Optional[Dict]:
+        """Atomically move the oldest queued job to `running` and return it"""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (time.time(), row["id"])
+            )
+        job = dict(row)
+        job["attempts"] += 1
+        job["status"] = "running"
+        return job
+
+    def complete(self, job_id: str, result_json: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'completed', result = ?, content = NULL, updated_at = ? WHERE id = ?",
+                (result_json, time.time(), job_id)
+            )
+
+    def fail(self, job_id: str, message: str, status_code: int = 500) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error_message = ?, error_status = ?, content = NULL, "
+                "updated_at = ? WHERE id = ?",
+                (message, status_code, time.time(), job_id)
+            )
+
+    def recover(self) -> int:
+        """Requeue jobs left running by a dead worker; give up on ones that keep crashing it"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error_message = ?, error_status = 500, content = NULL, "
+                "updated_at = ? WHERE status = 'running' AND attempts >= ?",
+                (f"Job abandoned after {self.max_attempts} attempts", now, self.max_attempts)
+            )
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', updated_at = ? WHERE status = 'running'", (now,)
+            )
+        return cursor.rowcount
+
+    def depth(self) -> int:
+        """Number of jobs waiting for a worker"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def allowed_webhook_hosts() -> Optional[List[str]]:
+    """WEBHOOK_ALLOWED_HOSTS as a list of host names, or None when it is not set"""
+    hosts = [host.strip().lower() for host in os.getenv("WEBHOOK_ALLOWED_HOSTS", "").split(",") if host.strip()]
+    return hosts or None
+
+
+def validate_callback_url(url: str, allowed_hosts: Optional[Collection[str]] = None) -> None:
+    """Raise ValueError unless `url` is a webhook target the server may call.
+
+    Only http(s) URLs are accepted. With `allowed_hosts`, the host must be one
+    of them; otherwise every address it resolves to must be public, so that
+    callbacks cannot reach loopback, private or link-local (cloud metadata)
+    services. Resolves the host name, so this blocks.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("callback_url must be an http or https URL")
+    host = parts.hostname.lower()
+    if allowed_hosts is not None:
+        if host not in allowed_hosts:
+            raise ValueError(f"callback_url host {host} is not allowed")
+        return
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, parts.port or 80, proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, UnicodeError):
+        raise ValueError(f"callback_url host {host} cannot be resolved") from None
+    for address in addresses:
+        if not ipaddress.ip_address(address.split("%", 1)[0]).is_global:
+            raise ValueError(f"callback_url host {host} is not a public address")
+
+
+class WebhookNotifier:
+    """Posts job completion payloads to client callback URLs.
+
+    The URL is checked again before each delivery, since its host may resolve
+    differently by then, and redirects are not followed.
+    """
+
+    def __init__(self, timeout: float = 10.0, allowed_hosts: Optional[Collection[str]] = None):
+        self.timeout = timeout
+        self.allowed_hosts = allowed_hosts
+
+    async def send(self, url: str, payload: Dict) -> None:
+        try:
+            await asyncio.to_thread(validate_callback_url, url, self.allowed_hosts)
+            await asyncio.to_thread(requests.post, url, json=payload, timeout=self.timeout, allow_redirects=False)
+        except Exception as e:
+            logger.warning("Webhook delivery to %s failed: %s", url, e)
+
+
+class RecordingWebhookNotifier(WebhookNotifier):
+    """Local stand-in for WebhookNotifier that records deliveries instead of sending them"""
+
+    def __init__(self):
+        super().__init__()
+        self.deliveries: List[Dict] = []
+
+    async def send(self, url: str, payload: Dict) -> None:
+        self.deliveries.append({"url": url, "payload": payload})
+
+
+class JobWorkerPool:
+    """In-process background workers that drain a JobQueue.
+
+    `handler` receives the job row and returns the BiasAnalysisResult; HTTPExceptions
+    it raises are stored as the job's error with their status code.
+    """
+
+    def __init__(self, queue: JobQueue, handler: Callable[[Dict], Awaitable], workers: int = 2,
+                 notifier: Optional[WebhookNotifier] = None, poll_interval: float = 1.0):
+        self.queue = queue
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.notifier = notifier or WebhookNotifier()
+        self.poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        recovered = self.queue.recover()
+        if recovered:
+            logger.info("Requeued %d interrupted jobs", recovered)
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify_new_job(self) -> None:
+        self._wakeup.set()
+
+    async def _worker(self) -> None:
+        while True:
+            job = self.queue.claim_next()
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._process(job)
+
+    async def _process(self, job: Dict) -> None:
+        try:
+            result = await self.handler(job)
+            self.queue.complete(job["id"], result.model_dump_json())
+            payload = {"job_id": job["id"], "status": "completed", "result": json.loads(result.model_dump_json())}
+        except asyncio.CancelledError:
+            # Shutdown mid-job: leave it `running` so recover() requeues it on restart
+            raise
+        except Exception as e:
+            status_code = getattr(e, "status_code", 500)
+            message = getattr(e, "detail", None) or "Bias analysis failed due to an internal error"
+            self.queue.fail(job["id"], message, status_code)
+            payload = {"job_id": job["id"], "status": "failed", "error": {"message": message, "status_code": status_code}}
+
+        if job.get("callback_url"):
+            await self.notifier.send(job["callback_url"], payload)
@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+from app.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+KEY_IN_FLIGHT = REGISTRY.gauge("llm_key_in_flight", "Gemini calls in flight per API key", ("key",))
+KEY_CALLS = REGISTRY.counter(
+    "llm_key_calls_total", "Gemini calls per API key by outcome (ok, quota, auth, error)", ("key", "outcome")
+)
+KEY_HEALTHY = REGISTRY.gauge("llm_key_healthy", "1 while an API key is in rotation, 0 while ejected", ("key",))
+
+
+class KeyPoolExhausted(Exception):
+    """Every key is ejected or at its rate limit"""
+
+    def __init__(self):
+        # Worded so LLMService maps it to 429 like a provider quota error
+        super().__init__("All Gemini API keys are ejected or over their request quota")
+
+
+def _keyed_model(model_name: str, api_key: str):
+    """A GenerativeModel bound to its own API key.
+
+    genai.configure() is process-wide and GenerativeModel takes no client, so
+    each key's client is set on the model's private `_client`, which
+    generate_content uses instead of the default one. google-generativeai is
+    pinned in requirements.txt for this; test_key_pool checks that the
+    pinned SDK still honours the attribute.
+    """
+    import google.generativeai as genai
+    from google.ai import generativelanguage as glm
+    model = genai.GenerativeModel(model_name)
+    if not hasattr(model, "_client"):
+        raise RuntimeError(
+            f"google-generativeai {genai.__version__} has no GenerativeModel._client; "
+            "per-key clients need updating for this SDK version"
+        )
+    model._client = glm.GenerativeServiceClient(client_options={"api_key": api_key})
+    return model
+
+
+class ApiKey:
+    """One project's API key and its rate-limit state"""
+
+    def __init__(self, label: str, key: str, requests_per_minute: Optional[int] = None):
+        self.label = label
+        self.key = key
+        self.requests_per_minute = requests_per_minute
+        self.in_flight = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+        self.calls = 0
+        self.recent: Deque[float] = deque()  # start times of calls within the last minute
+        self.models: Dict[str, object] = {}
+
+    def requests_last_minute(self, now: float) -> int:
+        while self.recent and now - self.recent[0] >= 60:
+            self.recent.popleft()
+        return len(self.recent)
+
+    def available(self, now: float) -> bool:
+        if now < self.ejected_until:
+            return False
+        return self.requests_per_minute is None or self.requests_last_minute(now) < self.requests_per_minute
+
+
+class ApiKeyPool:
+    """Spreads Gemini calls over several API keys or projects.
+
+    Each call goes to the healthy key with the fewest calls in flight (ties go
+    to the one used least in the last minute). A key that answers with a
+    quota error is ejected for `eject_seconds`, one with an authentication
+    error for `auth_eject_seconds`, and the call is retried once on each
+    remaining key.
+    """
+
+    def __init__(self, keys: List[ApiKey], eject_seconds: float = 60.0, auth_eject_seconds: float = 600.0,
+                 model_factory: Callable[[str, str], object] = _keyed_model,
+                 clock: Callable[[], float] = time.monotonic):
+        self.keys = keys
+        self.eject_seconds = eject_seconds
+        self.auth_eject_seconds = auth_eject_seconds
+        self.model_factory = model_factory
+        self.clock = clock
+        for key in keys:
+            KEY_HEALTHY.set(1, key=key.label)
+
+    @classmethod
+    def from_env(cls) -> Optional["ApiKeyPool"]:
+        """GOOGLE_GEMINI_API_KEYS lists `key` or `label=key` entries, comma separated.
+
+        GEMINI_KEY_RPM caps requests per minute per key. Without the variable
+        the single GOOGLE_GEMINI_API_KEY is used directly.
+        """
+        entries = [entry.strip() for entry in os.getenv("GOOGLE_GEMINI_API_KEYS", "").split(",") if entry.strip()]
+        if not entries:
+            return None
+        rpm = os.getenv("GEMINI_KEY_RPM")
+        keys = []
+        for index, entry in enumerate(entries):
+            label, _, key = entry.rpartition("=")
+            keys.append(ApiKey(label or f"key{index}", key, int(rpm) if rpm else None))
+        return cls(
+            keys,
+            eject_seconds=float(os.getenv("GEMINI_KEY_EJECT_SECONDS", "60")),
+            auth_eject_seconds=float(os.getenv("GEMINI_KEY_AUTH_EJECT_SECONDS", "600"))
+        )
+
+    def acquire(self, exclude=()) -> ApiKey:
+        now = self.clock()
+        candidates = [key for key in self.keys if key not in exclude and key.available(now)]
+        if not candidates:
+            raise KeyPoolExhausted()
+        key = min(candidates, key=lambda k: (k.in_flight, k.requests_last_minute(now)))
+        key.in_flight += 1
+        key.calls += 1
+        key.recent.append(now)
+        KEY_IN_FLIGHT.inc(key=key.label)
+        KEY_HEALTHY.set(1, key=key.label)
+        return key
+
+    def release(self, key: ApiKey) -> None:
+        key.in_flight -= 1
+        KEY_IN_FLIGHT.dec(key=key.label)
+
+    def model(self, key: ApiKey, model_name: str):
+        model = key.models.get(model_name)
+        if model is None:
+            model = key.models[model_name] = self.model_factory(model_name, key.key)
+        return model
+
+    async def generate(self, model_name: str, contents, **kwargs):
+        """Run `generate_content` on the least-loaded healthy key, failing over on quota and auth errors"""
+        tried: List[ApiKey] = []
+        while True:
+            key = self.acquire(exclude=tried)
+            tried.append(key)
+            try:
+                response = await asyncio.to_thread(self.model(key, model_name).generate_content, contents, **kwargs)
+            except Exception as e:
+                outcome = self._classify(e)
+                KEY_CALLS.inc(key=key.label, outcome=outcome)
+                if outcome == "error":
+                    raise
+                self._eject(key, self.auth_eject_seconds if outcome == "auth" else self.eject_seconds, outcome)
+                if len(tried) == len(self.keys):
+                    raise
+                continue
+            finally:
+                self.release(key)
+            KEY_CALLS.inc(key=key.label, outcome="ok")
+            return response
+
+    @staticmethod
+    def _classify(error: Exception) -> str:
+        if isinstance(error, google_exceptions.ResourceExhausted):
+            return "quota"
+        if isinstance(error, (google_exceptions.PermissionDenied, google_exceptions.Unauthenticated)):
+            return "auth"
+        message = str(error).lower()
+        if "quota" in message or "429" in message:
+            return "quota"
+        if "api key" in message or "authentication" in message:
+            return "auth"
+        return "error"
+
+    def _eject(self, key: ApiKey, seconds: float, reason: str) -> None:
+        key.ejected_until = self.clock() + seconds
+        key.ejections += 1
+        KEY_HEALTHY.set(0, key=key.label)
+        logger.warning("Ejecting API key %s for %.0fs after a %s error", key.label, seconds, reason,
+                       extra={"fields": {"key": key.label, "reason": reason}})
+
+    def snapshot(self) -> Dict[str, Dict]:
+        now = self.clock()
+        report = {}
+        for key in self.keys:
+            healthy = now >= key.ejected_until
+            KEY_HEALTHY.set(1 if healthy else 0, key=key.label)
+            report[key.label] = {
+                "healthy": healthy,
+                "in_flight": key.in_flight,
+                "calls": key.calls,
+                "requests_last_minute": key.requests_last_minute(now),
+                "requests_per_minute_limit": key.requests_per_minute,
+                "ejections": key.ejections,
+                "ejected_for_seconds": max(0, round(key.ejected_until - now))
+            }
+        return report
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from app.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+LIVE_CONNECTIONS = REGISTRY.gauge("live_connections", "Open live-analysis WebSocket connections")
+LIVE_CONNECTIONS_REJECTED = REGISTRY.counter(
+    "live_connections_rejected_total", "Live-analysis connections refused at the connection limit"
+)
+LIVE_BUFFERED_BYTES = REGISTRY.gauge(
+    "live_buffered_bytes", "Document text held by live-analysis connections awaiting analysis"
+)
+LIVE_REVISIONS = REGISTRY.counter(
+    "live_revisions_total",
+    "Live-analysis revisions by outcome (analyzed, coalesced, superseded, rejected)",
+    ("outcome",)
+)
+
+Send = Callable[[Dict], Awaitable[None]]
+Analyze = Callable[[str], Awaitable[Dict]]
+Rules = Callable[[str], List]
+
+
+class LiveSession:
+    """One editor connection.
+
+    Every revision gets its rule-based hits straight away. The LLM analysis
+    waits for `debounce_seconds` without a newer revision; a newer one replaces
+    a waiting revision (coalesced) or cancels one already being analyzed
+    (superseded). Only the newest revision's text is held.
+    """
+
+    def __init__(self, hub: "LiveAnalysisHub", send: Send, analyze: Analyze, rules: Rules):
+        self.hub = hub
+        self._send = send
+        self.analyze = analyze
+        self.rules = rules
+        self.revision = 0
+        self.buffered_bytes = 0
+        self._task: Optional[asyncio.Task] = None
+        self._analyzing = False
+        self._send_lock = asyncio.Lock()
+
+    async def send(self, message: Dict) -> None:
+        # Rule hits and analyses are sent from different tasks
+        async with self._send_lock:
+            await self._send(message)
+
+    async def submit(self, text: str, revision: Optional[int] = None) -> None:
+        """Send `text`'s rule hits now and schedule its LLM analysis after the debounce.
+
+        Raises ValueError for a document over the hub's `max_document_chars`.
+        """
+        self.revision = self.revision + 1 if revision is None else revision
+        if len(text) > self.hub.max_document_chars:
+            self.hub.count("rejected")
+            raise ValueError(f"Documents are limited to {self.hub.max_document_chars} characters")
+        self._cancel_pending()
+        self._hold(text)
+        await self.send({"type": "rules", "revision": self.revision, "issues": self.rules(text)})
+        self._task = asyncio.create_task(self._analyze_later(self.revision, text))
+
+    def _cancel_pending(self) -> None:
+        task = self._task
+        if task is None or task.done():
+            return
+        outcome = "superseded" if self._analyzing else "coalesced"
+        task.cancel()
+        self._task = None
+        self._analyzing = False
+        self._hold(None)
+        self.hub.count(outcome)
+
+    async def _analyze_later(self, revision: int, text: str) -> None:
+        try:
+            await asyncio.sleep(self.hub.debounce_seconds)
+            self._analyzing = True
+            message = await self.analyze(text)
+            self.hub.count("analyzed")
+            await self.send({**message, "revision": revision})
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Live analysis of revision %s failed: %s", revision, e)
+        finally:
+            if self._task is asyncio.current_task():
+                self._analyzing = False
+                self._hold(None)
+
+    def _hold(self, text: Optional[str]) -> None:
+        size = len(text.encode("utf-8")) if text else 0
+        self.hub.adjust_buffered(size - self.buffered_bytes)
+        self.buffered_bytes = size
+
+    def close(self) -> None:
+        self._cancel_pending()
+        self.hub.close(self)
+
+
+class LiveAnalysisHub:
+    """Admits live-analysis connections up to `max_connections` and reports their footprint.
+
+    Per-connection memory is bounded by `max_document_chars`, since a session
+    only holds its newest revision.
+    """
+
+    def __init__(self, max_connections: int = 100, debounce_seconds: float = 0.75,
+                 max_document_chars: int = 50000):
+        self.max_connections = max_connections
+        self.debounce_seconds = debounce_seconds
+        self.max_document_chars = max_document_chars
+        self.sessions: Set[LiveSession] = set()
+        self.buffered_bytes = 0
+        self.rejected_connections = 0
+        self.revisions: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> "LiveAnalysisHub":
+        return cls(
+            max_connections=int(os.getenv("LIVE_MAX_CONNECTIONS", "100")),
+            debounce_seconds=float(os.getenv("LIVE_DEBOUNCE_SECONDS", "0.75")),
+            max_document_chars=int(os.getenv("LIVE_MAX_DOCUMENT_CHARS", "50000"))
+        )
+
+    def open(self, send: Send, analyze: Analyze, rules: Rules) -> Optional[LiveSession]:
+        """A new session, or None at the connection limit"""
+        if len(self.sessions) >= self.max_connections:
+            self.rejected_connections += 1
+            LIVE_CONNECTIONS_REJECTED.inc()
+            return None
+        session = LiveSession(self, send, analyze, rules)
+        self.sessions.add(session)
+        LIVE_CONNECTIONS.inc()
+        return session
+
+    def close(self, session: LiveSession) -> None:
+        if session in self.sessions:
+            self.sessions.discard(session)
+            LIVE_CONNECTIONS.dec()
+
+    def count(self, outcome: str) -> None:
+        self.revisions[outcome] = self.revisions.get(outcome, 0) + 1
+        LIVE_REVISIONS.inc(outcome=outcome)
+
+    def adjust_buffered(self, delta: int) -> None:
+        self.buffered_bytes += delta
+        LIVE_BUFFERED_BYTES.inc(delta)
+
+    def snapshot(self) -> Dict:
+        return {
+            "connections": len(self.sessions),
+            "max_connections": self.max_connections,
+            "rejected_connections": self.rejected_connections,
+            "buffered_bytes": self.buffered_bytes,
+            "max_connection_bytes": max((s.buffered_bytes for s in self.sessions), default=0),
+            "revisions": dict(self.revisions)
+        }
@@ -1,11 +1,377 @@
 import os
 import google.generativeai as genai
-from typing import List, Dict
+from typing import Collection, List, Dict, Optional
 import json
+import re
+import secrets
+import string
 from app.models.schemas import BiasIssue, Suggestion, BiasType, SeverityLevel, CategoryType
 from fastapi import HTTPException
 import time
+import asyncio
+from contextvars import ContextVar
 from dotenv import load_dotenv
+from app.utils.metrics import LLM_IN_FLIGHT, STAGE_LATENCY
+from app.utils.logging_config import log_payload
+from app.utils.tracing import span, traced
+from app.services.token_usage import TokenUsage, record_usage
+from app.services.prompt_cache import PromptCacheManager
+from app.services.model_router import ModelRouter, ModelTier
+from app.services.key_pool import ApiKeyPool
+from app.services.hedging import Hedger
+from app.utils.deadline import Deadline, DeadlineExceeded
+from google.api_core import exceptions as google_exceptions
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCallLog:
+    """Names of the Gemini calls started and finished for one request"""
+
+    def __init__(self):
+        self.started: List[str] = []
+        self.finished: List[str] = []
+
+
+# Set per request so callers can tell which calls a cancelled analysis had issued
+_call_log: ContextVar[Optional[LLMCallLog]] = ContextVar("llm_call_log", default=None)
+
+
+def track_llm_calls(log: LLMCallLog):
+    """Record the calls made in the current context (and tasks created from it) into `log`"""
+    return _call_log.set(log)
+
+
+def untrack_llm_calls(token) -> None:
+    _call_log.reset(token)
+
+
+def _escape_tags(text: str, tag: str) -> str:
+    """`text` with <tag> and </tag> lookalikes defused, so it cannot close or open the delimiter"""
+    return re.sub(rf"<(\s*/?\s*{tag})\b", r"&lt;\1", text, flags=re.IGNORECASE)
+
+
+class PromptTemplate:
+    """A prompt split into fixed instructions and a per-request input section.
+
+    The instructions come first so they form a stable prefix that the provider
+    can cache; `input_template` holds the {placeholders} and is appended last.
+    """
+
+    def __init__(self, name: str, instructions: str, input_template: str):
+        self.name = name
+        self.instructions = instructions
+        self.input_template = input_template
+        fields = [field for _, field, _, _ in string.Formatter().parse(input_template) if field]
+        self.static_chars = len(instructions) + len(input_template.format(**{field: "" for field in fields}))
+
+    def render_input(self, **fields) -> str:
+        return self.input_template.format(**fields)
+
+    def render(self, **fields) -> str:
+        return self.instructions + self.render_input(**fields)
+
+
+DETECT_BIAS_PROMPT = PromptTemplate(
+    "detect_bias",
+    instructions="""
+
+        **CRITICAL JSON FORMATTING RULES:**
+                - Return ONLY valid JSON - no extra text before or after
+                - Ensure all strings are properly quoted
+                - Ensure all JSON objects and arrays are properly closed
+                - Use proper comma separation between all properties
+                - Escape any quotes within string values using \"
+                - Use \\n for line breaks within strings, not actual newlines
+                - Escape backslashes as \\\\
+                - NO control characters (tabs, actual newlines, etc.) in JSON strings
+
+
+        Analyze the following text for job description bias under:
+        - NY Human Rights Law (NYHRL §296) 
+        - Colorado Anti-Discrimination Act (CADA, including 2024 Job Application Fairness Act)
+
+        ### Steps:
+        1. **Validation**: Confirm if input is a job description; else return N/A JSON.
+        2. **Context**: Identify role, industry, and core functions.
+        3. **Bias & Compliance Check**:
+        - Protected classes: age, race/color/national origin (including hairstyles), religion/creed, sex/gender, sexual orientation, gender identity/expression, disability, pregnancy, familial/marital status, military/veteran (NY), citizenship/immigration (NY), domestic violence victim (NY), genetic traits (NY).
+        - Colorado 2024 restrictions: employers may NOT ask for age, DOB, grad/attendance dates in initial apps (unless legally required BFOQ).
+        - Only flag explicit/coded bias:
+            - **Age**: "under 30", "young & energetic", "digital native".  
+                OK: "3–5 years exp.", "entry/senior level", timelines like "2025–2026 school year".
+            - **Race/National Origin**: "native English speaker", "cultural fit", hairstyle bans.  
+            - **Gender**: gendered job titles, physical assumptions.  
+            - **Sexual Orientation/GI**: heteronormative, binary-only pronouns.  
+            - **Disability**: unnecessary physical traits ("perfect vision" for office role).  
+            - **Pregnancy**: exclusions/lack of accommodation.  
+            - **Criminal History**: blanket bans unrelated to role.  
+            - **Religion**: required faith/holiday assumptions (unless religious org).  
+            - **Harassment/Retaliation**: hostile/discouraging language.  
+            - **Clarity**:Focus clarity assessment on genuinely confusing/complicated terms only, contradictory (e.g. entry-level w/10 yrs exp), missing essentials, jargon not standard.  
+        - **Do NOT flag**: legal certifications, true BFOQ (safety, law), professional skills, soft skills (teamwork, communication).
+        - Inclusivity indicators (reduce bias): "all levels welcome", "EOE", "diverse backgrounds encouraged", accommodations.
+        - Aggregate identical issues - report each unique phrase only once
+
+        4. **Severity Guidelines**:
+        Apply the following strictly:
+        - **High Severity (0.8 weight):**
+            - Direct exclusion/discrimination against a protected class  
+            (e.g., "Lady Guard", gender-based physical/height requirements,  
+            "under 35 only", "must be single", "native English speaker only").  
+            - Explicit age/sex restrictions not tied to clear BFOQ.  
+            - Blanket bans (e.g., "no disabilities", "must be Christian").  
+            - Language likely unlawful under NYHRL §296 or CADA.  
+
+        - **Medium Severity (0.4 weight):**
+            - Indirect discouraging language, but not outright exclusion  
+            (e.g., "young & energetic", "digital native", "recent graduate").  
+            - Requirements that may disadvantage groups without being explicit  
+            (e.g., "cultural fit", unnecessary degree inflation).  
+            - Ambiguity that creates potential bias but not categorical.  
+
+        - **Low Severity (0.1 weight):**
+            - Minor wording issues that may subtly impact inclusivity  
+            (e.g., "guys", "chairman", "he/she" instead of neutral pronouns).  
+            - Jargon or clarity problems not tied to protected class.  
+            - Easily correctable without strong legal risk.  
+
+        5. **Scoring (Normalized 0.0–1.0):**
+        Each issue has a base severity weight: High=0.8, Medium=0.4, Low=0.1.
+        
+        **Max Possible Values for Normalization:**
+        - Simple JD (1-2 pages): 2.0
+        - Standard JD (2-3 pages): 3.0  
+        - Complex JD (3+ pages): 4.0
+        
+        **Bias Score Calculation:**
+        - Only consider bias issues: age, race, gender, sexual_orientation, disability, pregnancy, criminal_history, religion, harassment, retaliation
+        - Formula: min(1.0, sum(bias issue weights) / max_possible)
+        - Normalize so score always lies between 0.0 and 1.0
+        
+        **Inclusivity Score Calculation:**
+        - Formula: max(0.0, 1.0 - Bias Score)
+        - Never below 0.0
+        
+        **Clarity Score Calculation:**
+        - Only consider clarity issues  
+        - Formula: max(0.0, 1.0 - sum(clarity issue weights) / max_possible_clarity)
+        - Deduct proportionally but keep within 0.0–1.0 range
+
+
+        ### Output JSON:
+        If job description:
+        {
+        "role": "...",
+        "industry": "...",
+        "issues": [
+            {
+            "type": "age|race|gender|sexual_orientation|disability|pregnancy|criminal_history|religion|harassment|retaliation|clarity",
+            "text": "...",
+            "start_index": 0,
+            "end_index": 10,
+            "severity": "low|medium|high",
+            "explanation": "Proper reason with (full form of law names Ex:NYHRL:New york human rights law) law reference (e.g. violates NYHRL §296(1)(a) or CADA )"
+            }
+        ],
+        "bias_score": 0.0,
+        "inclusivity_score": 1.0,
+        "clarity_score": 1.0,
+        "overall_assessment": "Concise compliance summary"
+        }
+
+        If NOT a job description:
+        {
+        "role": "N/A",
+        "industry": "N/A",
+        "issues": [],
+        "bias_score": "N/A",
+        "inclusivity_score": "N/A",
+        "clarity_score": "N/A",
+        "overall_assessment": "Not a job description"
+        }
+
+""",
+    input_template="""        Job Description:
+        {text}
+        """
+)
+
+DETECT_BIAS_BATCH_PROMPT = PromptTemplate(
+    "detect_bias_batch",
+    instructions=DETECT_BIAS_PROMPT.instructions + """
+        ### Several job descriptions:
+        The input holds several independent texts, each between <posting id="..."> and </posting>.
+        Apply every step above to each posting on its own. start_index and end_index count from the
+        first character of that posting's text. Return ONE JSON object with an entry per posting, in
+        input order, each being the Output JSON above plus the posting's "id":
+        {
+        "results": [
+            {"id": "3f9c2a71", "role": "...", "industry": "...", "issues": [], "bias_score": 0.0, "inclusivity_score": 1.0, "clarity_score": 1.0, "overall_assessment": "..."}
+        ]
+        }
+
+""",
+    input_template="""        Job Descriptions:
+        {postings}
+        """
+)
+DETECT_BIAS_CHANGES_PROMPT = PromptTemplate(
+    "detect_bias_changes",
+    instructions=DETECT_BIAS_PROMPT.instructions + """
+        ### Revised job description:
+        The input is a whole job description in which only the paragraphs between <changed> and
+        </changed> are new; the rest was reviewed before. Apply steps 1 and 2 to the whole text, but
+        report issues (step 3) ONLY for phrases inside the changed paragraphs. The scores are
+        recomputed by the caller, so return them for the issues you report.
+
+""",
+    input_template="""        Job Description:
+        {text}
+        """
+)
+
+# Upper bound on a batched detection's response; the model's own output limit
+BATCH_MAX_OUTPUT_TOKENS = 65536
+# Extra seconds the SDK request may run past the request deadline, so that
+# Deadline.wait gives up first and the caller sees DeadlineExceeded
+SDK_TIMEOUT_MARGIN_SECONDS = 5.0
+
+IMPROVE_LANGUAGE_PROMPT = PromptTemplate(
+    "improve_language",
+    instructions="""
+
+                **CRITICAL JSON FORMATTING RULES:**
+                - Return ONLY valid JSON - no extra text before or after
+                - Ensure all strings are properly quoted
+                - Ensure all JSON objects and arrays are properly closed
+                - Use proper comma separation between all properties
+                - Escape any quotes within string values using \"
+                - Use \\n for line breaks within strings, not actual newlines
+                - Escape backslashes as \\\\
+                - NO control characters (tabs, actual newlines, etc.) in JSON strings
+               
+                **At first check that the job description is related to the particular job role and industry and fulfill the requirements of the job description then do the following**
+                
+                Improve the following job description for:
+                **ONLY address the specific issues found in the issues_context below. DO NOT make any other improvements, suggestions, or changes to the job description.**
+                **STRICT RULE: If issues_context is empty or contains no issues, return an empty suggestions array
+                
+                1. SEO optimization with relevant keywords (Suggest ONLY keywords that are relevant to the job description and are STRICTLY NOT present anywhere in the original text - perform thorough analysis to ensure complete absence)
+                2. Brevity and conciseness
+
+                **CRITICAL IMPROVEMENT RULES:**
+                - (IMPORTANT) Only Provide the suggestions for the issues that are present in the issues_context only
+                - If it is mentioned that no education requirements are needed or no graduation is required then add this in the **OUR IDEAL CANDIDATE** section: "No formal education requirements are needed for this role"
+                - Mention the education requirements in the **OUR IDEAL CANDIDATE** section if it is mentioned in the original job description
+                - Add all the skills that are present in the original job description in the **REQUIRED SKILLS** section do not miss any skills that are present in the original job description
+                - If it is mentioned that no experience is needed then add this in the **OUR IDEAL CANDIDATE** section: "No prior experience is required for this role, but relevant skills and enthusiasm are essential."
+                - Add the required experience in the **OUR IDEAL CANDIDATE** section if it is mentioned in the original job description
+                - FLAG LANGUAGE THAT EXCLUDES QUALIFIED CANDIDATES WITHOUT JOB-RELATED JUSTIFICATION
+                - 
+                - FOR CLARITY ISSUES: Focus on ambiguous eligibility language that obscures pathways for internationally trained professionals
+                
+
+
+                **Analysis Instructions:**
+
+                1. Identify job role and industry context first
+                1a.**(Strict instruction)** Only Provide the suggestions for the issues that are present in the issues_context only (If issues_context is empty, return empty suggestions)
+                2. Do NOT identify or fix any additional issues not already detected
+                2a.If the issue type is marked as "clarity" in the issues_context then in suggestions catogory use "clarity" and if the issue type is marked other than clarity in the issues_context then in suggestions category use "inclusivity"
+                3. Do NOT make general improvements to style, tone, or formatting
+                4. Verify if requirements match industry standards (e.g., Colorado dental board for DDS/DMD)
+                5. Maintain professional tone while improving inclusivity( **DO NOT** make general improvements to tone, style, or formatting unless specifically flagged in issues_context)
+                6. Never flag licensure-mandated terms (e.g., "DDS/DMD", "RN license") as elitism
+                7. Suggest ONLY keywords that are relevant to the job description and are STRICTLY NOT present in the Original Job Description - analyze the original text thoroughly to ensure none of the suggested keywords appear anywhere in the original content
+                8. Frame the sentences using the seo_keywords that you have found in the previous step and use them in the improved text. CRITICAL: When incorporating these keywords into the text, write them as plain text without any ** or * formatting. For example, if the keyword is "Patient Care", write it as "Patient Care" NOT as "**Patient Care**". IMPORTANT: Only use keywords that are completely absent from the original job description.
+                9. DO NOT use any markdown formatting (**, *, etc.) within the content text - ONLY use ** for the section headers as specified in the format below. All keywords and content must be written in plain text without any bold or italic formatting.
+                
+                **IMPROVED TEXT FORMATTING REQUIREMENTS:**
+                The improved job description must follow this exact structure and format (keep the ** around section headers):
+                **Rewrite the sentences with (removing the bias and inclusivity issues) some diffrent writting style dont just copy the exact sentences in the KEY RESPONSIBILITIES and OUR IDEAL CANDIDATE sections**
+
+                **IMPORTANT: In the improved_text field, use \\n for line breaks, not actual newlines. Format like this:**
+                "**JOB TITLE:** [Clear, specific job title]\\n\\n**COMPANY:** [Company name]\\n\\n**INDUSTRY:** [Industry]\\n\\n..."
+                
+                **JOB TITLE:** [Clear, specific job title]
+                
+                **COMPANY:** [Company name if provided, otherwise "Company Name"]
+                
+                **INDUSTRY:** [Specific industry/sector]
+                
+                **LOCATION:** [Work location/type - Remote/On-site/Hybrid]
+                
+                **EMPLOYMENT TYPE:** [Full-time/Part-time/Contract/Internship]
+                
+                **JOB SUMMARY:**
+                [6-7 sentences providing an engaging overview of the role and its impact]
+                
+                **KEY RESPONSIBILITIES:**
+                • [Responsibility 1 - action-oriented, specific]
+                • [Responsibility 2 - action-oriented, specific]
+                • [Responsibility 3 - action-oriented, specific]
+                • [Additional responsibilities as needed]
+                
+                **OUR IDEAL CANDIDATE:**
+                • [Essential qualification 1]
+                • [Essential qualification 2]
+                • [Essential qualification 3]
+                • [Additional essential qualifications]
+                
+                **PREFERRED QUALIFICATIONS:**
+                • [Preferred qualification 1]
+                • [Preferred qualification 2]
+                • [Additional preferred qualifications]
+                
+                **REQUIRED SKILLS:**
+                • [Technical skill 1]
+                • [Technical skill 2]
+                • [Soft skill 1]
+                • [Soft skill 2]
+                • [Additional skills]
+                
+                **WHAT WE OFFER:**
+                • [Benefit 1]
+                • [Benefit 2]
+                • [Benefit 3]
+                • [Additional benefits]
+                
+                **APPLICATION PROCESS:**
+                [Brief, clear instructions on how to apply]
+                
+                Return ONLY a valid JSON response (no additional text and extra markdowns):
+                {
+                    "suggestions": [
+                        {
+                            "original": "original phrase",
+                            "improved": "improved phrase",
+                            "rationale": "The actual reason why this is better",
+                            "category": "clarity|inclusivity"
+                        }
+                    ],
+                    "seo_keywords": ["keyword1", "keyword2", "keyword3", "keyword4", "keyword5" - ENSURE these keywords are completely absent from the original job description],
+                    "improved_text": "[Complete rewritten job description using the SEO keywords and improved version in the suggestions identified above also following the EXACT structure outlined above. Maintain all original context while improving clarity, brevity, inclusivity, and SEO optimization. Use the specific headers with ** formatting and bullet point format as specified. Keep section headers with ** but write ALL CONTENT INCLUDING KEYWORDS in plain text without any markdown formatting. Example: write 'Patient Care' not '**Patient Care**'.]",
+                    
+                    
+                }
+                
+                **If the provided text is not related to a job description and does not fulfill the requirements of job descriptions then do the following**
+                Return ONLY a valid JSON response (no additional text):
+                {
+                    "suggestions": [],
+                    "improved_text": "N/A - The provided text does not appear to be a job description or does not contain sufficient job-related information to generate an improved version.",
+                    "seo_keywords": []
+                }
+            """,
+    input_template="""                Original Job Description:
+                {text}
+
+                {issues_context}
+"""
+)
+
 
 class LLMService:
     def __init__(self):
@@ -20,10 +386,212 @@ class LLMService:
 
         # Configure Google Gemini
         genai.configure(api_key=os.getenv("GOOGLE_GEMINI_API_KEY"))
+        # Several keys/projects (GOOGLE_GEMINI_API_KEYS) spread full-prompt calls over their quotas
+        self.key_pool: Optional[ApiKeyPool] = ApiKeyPool.from_env()
         # self.model = genai.GenerativeModel('gemini-2.5-flash')
-        self.model = genai.GenerativeModel("gemini-2.5-flash")
+        self.model_name = "gemini-2.5-flash"
+        self.model = genai.GenerativeModel(self.model_name)
+        # Per call name: completed calls, total latency and estimated tokens
+        self.call_stats: Dict[str, Dict[str, float]] = {}
+        # Provider-side caching of the prompts' static instructions (PROMPT_CACHE=true)
+        self.prompt_cache: Optional[PromptCacheManager] = PromptCacheManager.from_env(self.model_name)
+        # Fast model tier for small inputs (MODEL_ROUTING=true); models are keyed by model name
+        self.router: Optional[ModelRouter] = ModelRouter.from_env(self.model_name)
+        self.tier_models: Dict[str, object] = {}
+        if self.router is not None:
+            self.tier_models[self.router.fast.model_name] = genai.GenerativeModel(self.router.fast.model_name)
+        # Duplicate calls that outlive the recent latency percentile (HEDGE_REQUESTS=true)
+        self.hedger: Optional[Hedger] = Hedger.from_env()
+        # Under a request deadline, max_output_tokens shrinks to what can be generated in the time left
+        self.output_tokens_per_second = float(os.getenv("LLM_OUTPUT_TOKENS_PER_SECOND", "200"))
+        self.min_output_tokens = int(os.getenv("LLM_MIN_OUTPUT_TOKENS", "2048"))
+
+    async def _generate(self, template: PromptTemplate, prompt_input: str, generation_config,
+                        tier: Optional[ModelTier] = None, deadline: Optional[Deadline] = None) -> object:
+        """Run the blocking Gemini SDK call in a worker thread so concurrent analyses overlap.
+
+        With prompt caching on, only `prompt_input` is sent and the template's
+        instructions come from the provider cache; otherwise the full prompt is sent.
+        `tier` selects a routed model; the main model is used without one. With a
+        `deadline`, the call is abandoned when it passes. The SDK request is
+        timed out SDK_TIMEOUT_MARGIN_SECONDS later, so the deadline wins the
+        race and callers see DeadlineExceeded rather than a service error.
+        """
+        call_name = template.name
+        request_options = None
+        if deadline is not None:
+            deadline.check(call_name)
+            request_options = {"timeout": deadline.remaining() + SDK_TIMEOUT_MARGIN_SECONDS}
+        log = _call_log.get()
+        if log is not None:
+            log.started.append(call_name)
+        started = time.perf_counter()
+        LLM_IN_FLIGHT.inc()
+        tier_name = tier.name if tier is not None else "main"
+        with span("llm.generate", call=call_name, tier=tier_name) as generate_span:
+            try:
+                def attempt():
+                    return self._generate_with_cache(template, prompt_input, generation_config, tier, request_options)
+
+                call = self.hedger.run(f"{call_name}@{tier_name}", attempt) if self.hedger is not None else attempt()
+                response, cached = await (deadline.wait(call, call_name) if deadline is not None else call)
+            except google_exceptions.DeadlineExceeded:
+                # An SDK timeout after the request's deadline is that deadline, not a service failure
+                if deadline is not None and deadline.expired:
+                    raise DeadlineExceeded(call_name) from None
+                raise
+            finally:
+                LLM_IN_FLIGHT.dec()
+                STAGE_LATENCY.observe(time.perf_counter() - started, stage=call_name)
+            prompt = template.instructions + prompt_input
+            usage = TokenUsage.from_response(call_name, response, prompt, self._response_text(response), template.static_chars)
+            if generate_span is not None:
+                generate_span.set(
+                    prompt_tokens=usage.prompt_tokens,
+                    static_prompt_tokens=usage.static_prompt_tokens,
+                    cached_tokens=usage.cached_tokens,
+                    response_tokens=usage.response_tokens,
+                    tokens_estimated=usage.estimated,
+                    prompt_cache=cached
+                )
+        record_usage(usage)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._record_call(call_name, elapsed_ms, usage.prompt_tokens + usage.response_tokens)
+        if self.router is not None:
+            self.router.record(call_name, tier or self.router.main, elapsed_ms, usage)
+        if log is not None:
+            log.finished.append(call_name)
+        return response
+
+    async def _generate_with_cache(self, template: PromptTemplate, prompt_input: str, generation_config,
+                                   tier: Optional[ModelTier] = None, request_options: Optional[Dict] = None):
+        """Returns (response, whether the cached instructions were used)"""
+        options = {"request_options": request_options} if request_options is not None else {}
+        model, model_name, cache_name = self.model, self.model_name, template.name
+        if tier is not None and tier.model_name != self.model_name:
+            model, model_name = self.tier_models[tier.model_name], tier.model_name
+            cache_name = f"{template.name}@{tier.name}"
+        cached_model = None
+        if self.prompt_cache is not None:
+            cached_model = await self.prompt_cache.model_for(cache_name, template.instructions, model_name)
+        if cached_model is not None:
+            try:
+                response = await asyncio.to_thread(
+                    cached_model.generate_content, prompt_input, generation_config=generation_config, **options
+                )
+                return response, True
+            except google_exceptions.NotFound:
+                # Deleted or expired on the provider side - recreate next time, send everything now
+                await self.prompt_cache.invalidate(cache_name)
+        if self.key_pool is not None:
+            response = await self.key_pool.generate(
+                model_name, template.instructions + prompt_input, generation_config=generation_config, **options
+            )
+            return response, False
+        response = await asyncio.to_thread(
+            model.generate_content,
+            template.instructions + prompt_input,
+            generation_config=generation_config,
+            **options
+        )
+        return response, False
+
+    async def _generate_routed(self, template: PromptTemplate, prompt_input: str, generation_config,
+                               routing_text: str, issue_count: int = 0, deadline: Optional[Deadline] = None) -> Dict:
+        """Generate and parse JSON on the tier the router picks for `routing_text`.
+
+        A fast-tier result that is malformed or doubtful is discarded and the
+        call is repeated on the main model.
+        """
+        tier = self.router.choose(template.name, routing_text, issue_count) if self.router is not None else None
+        if tier is None or tier is self.router.main:
+            return await self._generate_json(template, prompt_input, generation_config, tier, deadline)
+
+        try:
+            result = await self._generate_json(template, prompt_input, generation_config, tier, deadline)
+        except ValueError:
+            reason = "malformed"
+        else:
+            reason = self.router.escalation_reason(template.name, result, issue_count)
+            if reason is None:
+                return result
+        logger.info("Escalating %s to the main model", template.name,
+                    extra={"fields": {"call": template.name, "reason": reason}})
+        self.router.record_escalation(template.name, reason)
+        return await self._generate_json(template, prompt_input, generation_config, self.router.main, deadline)
+
+    async def _generate_json(self, template: PromptTemplate, prompt_input: str, generation_config,
+                             tier: Optional[ModelTier] = None, deadline: Optional[Deadline] = None) -> Dict:
+        response = await self._generate(template, prompt_input, generation_config, tier, deadline)
+        return self._parse_response(template.name, response)
+
+    @staticmethod
+    def _parse_response(call_name: str, response) -> Dict:
+        """Extract the JSON object from a Gemini response; raises ValueError when there is none"""
+        log_payload(logger, f"Raw {call_name} response", response)
+
+        # ---- Safe text extraction ----
+        response_text = ""
+        if hasattr(response, "candidates") and response.candidates:
+            candidate = response.candidates[0]
+            if hasattr(candidate, "content") and hasattr(candidate.content, "parts"):
+                response_text = "".join(
+                    getattr(part, "text", "") for part in candidate.content.parts
+                ).strip()
+
+        if not response_text:
+            raise ValueError("No text content returned by Gemini")
+
+        # ---- Clean JSON output ----
+        if response_text.startswith("```json"):
+            response_text = response_text[7:]
+        if response_text.endswith("```"):
+            response_text = response_text[:-3]
+
+        log_payload(logger, f"Raw {call_name} JSON", response_text)
+
+        with STAGE_LATENCY.time(stage="json_parse"), span("llm.json_parse"):
+            try:
+                return json.loads(response_text)
+            except json.JSONDecodeError:
+                # fallback: extract JSON via regex
+                json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
+                if json_match:
+                    return json.loads(json_match.group())
+                raise
+
+    def _output_token_budget(self, max_tokens: int, deadline: Optional[Deadline]) -> int:
+        """`max_tokens`, reduced to what fits in the deadline's remaining time (never below min_output_tokens)"""
+        if deadline is None:
+            return max_tokens
+        affordable = int(deadline.remaining() * self.output_tokens_per_second)
+        return max(min(max_tokens, affordable), min(self.min_output_tokens, max_tokens))
+
+    def _record_call(self, call_name: str, elapsed_ms: float, tokens: int) -> None:
+        stats = self.call_stats.setdefault(call_name, {"calls": 0, "total_ms": 0.0, "total_tokens": 0})
+        stats["calls"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["total_tokens"] += tokens
+
+    def average_call(self, call_name: str) -> Dict[str, float]:
+        """Mean latency (ms) and estimated tokens of completed `call_name` calls, zero without history"""
+        stats = self.call_stats.get(call_name)
+        if not stats or not stats["calls"]:
+            return {"ms": 0.0, "tokens": 0}
+        return {"ms": stats["total_ms"] / stats["calls"], "tokens": stats["total_tokens"] // stats["calls"]}
+
+    @staticmethod
+    def _response_text(response) -> str:
+        try:
+            return "".join(
+                part.text for part in response.candidates[0].content.parts
+                if isinstance(getattr(part, "text", None), str)
+            )
+        except Exception:
+            return ""
     
-    async def detect_bias(self, text: str) -> Dict:
+    @traced("llm.detect_bias")
+    async def detect_bias(self, text: str, deadline: Optional[Deadline] = None) -> Dict:
         """Use Gemini to detect bias in job description"""
        
 
@@ -274,222 +842,75 @@ class LLMService:
         #             "end_index": 10,
         #             "severity": "low|medium|high",
         #             "explanation": "This violates [specific NY Human Rights Law section/CADA provision] which [specific protection/requirement]"
-        #         }}
-        #     ],
-        #     "bias_score": 0.0,
-        #     "inclusivity_score": 1.0,
-        #     "clarity_score": 1.0,
-        #     "overall_assessment": "Summary of findings with legal compliance context"
-        # }}
-
-        # **For non-job related text:**
-        # {{
-        #     "role": "N/A",
-        #     "industry": "N/A",
-        #     "issues": [],
-        #     "bias_score": "N/A",
-        #     "inclusivity_score": "N/A", 
-        #     "clarity_score": "N/A",
-        #     "overall_assessment": "The provided text does not appear to be a job description."
-        # }}
-
-
-        # 4. **Severity Guidelines**:
-        # Apply the following strictly:
-        # - **High Severity (0.8 weight):**
-        #     - Direct exclusion/discrimination against a protected class  
-        #     (e.g., “Lady Guard”, gender-based physical/height requirements,  
-        #     “under 35 only”, “must be single”, “native English speaker only”).  
-        #     - Explicit age/sex restrictions not tied to clear BFOQ.  
-        #     - Blanket bans (e.g., “no disabilities”, “must be Christian”).  
-        #     - Language likely unlawful under NYHRL §296 or CADA.  
-
-        # - **Medium Severity (0.4 weight):**
-        #     - Indirect discouraging language, but not outright exclusion  
-        #     (e.g., “young & energetic”, “digital native”, “recent graduate”).  
-        #     - Requirements that may disadvantage groups without being explicit  
-        #     (e.g., “cultural fit”, unnecessary degree inflation).  
-        #     - Ambiguity that creates potential bias but not categorical.  
-
-        # - **Low Severity (0.1 weight):**
-        #     - Minor wording issues that may subtly impact inclusivity  
-        #     (e.g., “guys”, “chairman”, “he/she” instead of neutral pronouns).  
-        #     - Jargon or clarity problems not tied to protected class.  
-        #     - Easily correctable without strong legal risk.  
-
-
-        # 5. **Scoring (Normalized 0.0–1.0):**
-        # - Each issue has a base severity weight: High=0.8, Medium=0.4, Low=0.1.
-        # - **Bias Score** = min(1.0, sum(weights) / max_possible).(**Only consider severity of Bias issues for calculation**) Normalize so the score always lies between 0.0 and 1.0.
-        # - **Inclusivity Score** = 1.0 - Bias Score (but never below 0.0).
-        # - **Clarity Score** = 1.0 if no genuine comprehension blockers; deduct proportionally but keep within 0.0–1.0.(**Only consider severity of Clarity issues for calculation**)
-        # """
-        bias_detection_prompt = f"""
-
-        **CRITICAL JSON FORMATTING RULES:**
-                - Return ONLY valid JSON - no extra text before or after
-                - Ensure all strings are properly quoted
-                - Ensure all JSON objects and arrays are properly closed
-                - Use proper comma separation between all properties
-                - Escape any quotes within string values using \"
-                - Use \\n for line breaks within strings, not actual newlines
-                - Escape backslashes as \\\\
-                - NO control characters (tabs, actual newlines, etc.) in JSON strings
-
-
-        Analyze the following text for job description bias under:
-        - NY Human Rights Law (NYHRL §296) 
-        - Colorado Anti-Discrimination Act (CADA, including 2024 Job Application Fairness Act)
-
-        ### Steps:
-        1. **Validation**: Confirm if input is a job description; else return N/A JSON.
-        2. **Context**: Identify role, industry, and core functions.
-        3. **Bias & Compliance Check**:
-        - Protected classes: age, race/color/national origin (including hairstyles), religion/creed, sex/gender, sexual orientation, gender identity/expression, disability, pregnancy, familial/marital status, military/veteran (NY), citizenship/immigration (NY), domestic violence victim (NY), genetic traits (NY).
-        - Colorado 2024 restrictions: employers may NOT ask for age, DOB, grad/attendance dates in initial apps (unless legally required BFOQ).
-        - Only flag explicit/coded bias:
-            - **Age**: "under 30", "young & energetic", "digital native".  
-                OK: "3–5 years exp.", "entry/senior level", timelines like "2025–2026 school year".
-            - **Race/National Origin**: "native English speaker", "cultural fit", hairstyle bans.  
-            - **Gender**: gendered job titles, physical assumptions.  
-            - **Sexual Orientation/GI**: heteronormative, binary-only pronouns.  
-            - **Disability**: unnecessary physical traits ("perfect vision" for office role).  
-            - **Pregnancy**: exclusions/lack of accommodation.  
-            - **Criminal History**: blanket bans unrelated to role.  
-            - **Religion**: required faith/holiday assumptions (unless religious org).  
-            - **Harassment/Retaliation**: hostile/discouraging language.  
-            - **Clarity**:Focus clarity assessment on genuinely confusing/complicated terms only, contradictory (e.g. entry-level w/10 yrs exp), missing essentials, jargon not standard.  
-        - **Do NOT flag**: legal certifications, true BFOQ (safety, law), professional skills, soft skills (teamwork, communication).
-        - Inclusivity indicators (reduce bias): "all levels welcome", "EOE", "diverse backgrounds encouraged", accommodations.
-        - Aggregate identical issues - report each unique phrase only once
-
-        4. **Severity Guidelines**:
-        Apply the following strictly:
-        - **High Severity (0.8 weight):**
-            - Direct exclusion/discrimination against a protected class  
-            (e.g., "Lady Guard", gender-based physical/height requirements,  
-            "under 35 only", "must be single", "native English speaker only").  
-            - Explicit age/sex restrictions not tied to clear BFOQ.  
-            - Blanket bans (e.g., "no disabilities", "must be Christian").  
-            - Language likely unlawful under NYHRL §296 or CADA.  
+        #         }}
+        #     ],
+        #     "bias_score": 0.0,
+        #     "inclusivity_score": 1.0,
+        #     "clarity_score": 1.0,
+        #     "overall_assessment": "Summary of findings with legal compliance context"
+        # }}
 
-        - **Medium Severity (0.4 weight):**
-            - Indirect discouraging language, but not outright exclusion  
-            (e.g., "young & energetic", "digital native", "recent graduate").  
-            - Requirements that may disadvantage groups without being explicit  
-            (e.g., "cultural fit", unnecessary degree inflation).  
-            - Ambiguity that creates potential bias but not categorical.  
+        # **For non-job related text:**
+        # {{
+        #     "role": "N/A",
+        #     "industry": "N/A",
+        #     "issues": [],
+        #     "bias_score": "N/A",
+        #     "inclusivity_score": "N/A", 
+        #     "clarity_score": "N/A",
+        #     "overall_assessment": "The provided text does not appear to be a job description."
+        # }}
 
-        - **Low Severity (0.1 weight):**
-            - Minor wording issues that may subtly impact inclusivity  
-            (e.g., "guys", "chairman", "he/she" instead of neutral pronouns).  
-            - Jargon or clarity problems not tied to protected class.  
-            - Easily correctable without strong legal risk.  
 
-        5. **Scoring (Normalized 0.0–1.0):**
-        Each issue has a base severity weight: High=0.8, Medium=0.4, Low=0.1.
-        
-        **Max Possible Values for Normalization:**
-        - Simple JD (1-2 pages): 2.0
-        - Standard JD (2-3 pages): 3.0  
-        - Complex JD (3+ pages): 4.0
-        
-        **Bias Score Calculation:**
-        - Only consider bias issues: age, race, gender, sexual_orientation, disability, pregnancy, criminal_history, religion, harassment, retaliation
-        - Formula: min(1.0, sum(bias issue weights) / max_possible)
-        - Normalize so score always lies between 0.0 and 1.0
-        
-        **Inclusivity Score Calculation:**
-        - Formula: max(0.0, 1.0 - Bias Score)
-        - Never below 0.0
-        
-        **Clarity Score Calculation:**
-        - Only consider clarity issues  
-        - Formula: max(0.0, 1.0 - sum(clarity issue weights) / max_possible_clarity)
-        - Deduct proportionally but keep within 0.0–1.0 range
+        # 4. **Severity Guidelines**:
+        # Apply the following strictly:
+        # - **High Severity (0.8 weight):**
+        #     - Direct exclusion/discrimination against a protected class  
+        #     (e.g., “Lady Guard”, gender-based physical/height requirements,  
+        #     “under 35 only”, “must be single”, “native English speaker only”).  
+        #     - Explicit age/sex restrictions not tied to clear BFOQ.  
+        #     - Blanket bans (e.g., “no disabilities”, “must be Christian”).  
+        #     - Language likely unlawful under NYHRL §296 or CADA.  
 
+        # - **Medium Severity (0.4 weight):**
+        #     - Indirect discouraging language, but not outright exclusion  
+        #     (e.g., “young & energetic”, “digital native”, “recent graduate”).  
+        #     - Requirements that may disadvantage groups without being explicit  
+        #     (e.g., “cultural fit”, unnecessary degree inflation).  
+        #     - Ambiguity that creates potential bias but not categorical.  
 
-        ### Output JSON:
-        If job description:
-        {{
-        "role": "...",
-        "industry": "...",
-        "issues": [
-            {{
-            "type": "age|race|gender|sexual_orientation|disability|pregnancy|criminal_history|religion|harassment|retaliation|clarity",
-            "text": "...",
-            "start_index": 0,
-            "end_index": 10,
-            "severity": "low|medium|high",
-            "explanation": "Proper reason with (full form of law names Ex:NYHRL:New york human rights law) law reference (e.g. violates NYHRL §296(1)(a) or CADA )"
-            }}
-        ],
-        "bias_score": 0.0,
-        "inclusivity_score": 1.0,
-        "clarity_score": 1.0,
-        "overall_assessment": "Concise compliance summary"
-        }}
+        # - **Low Severity (0.1 weight):**
+        #     - Minor wording issues that may subtly impact inclusivity  
+        #     (e.g., “guys”, “chairman”, “he/she” instead of neutral pronouns).  
+        #     - Jargon or clarity problems not tied to protected class.  
+        #     - Easily correctable without strong legal risk.  
 
-        If NOT a job description:
-        {{
-        "role": "N/A",
-        "industry": "N/A",
-        "issues": [],
-        "bias_score": "N/A",
-        "inclusivity_score": "N/A",
-        "clarity_score": "N/A",
-        "overall_assessment": "Not a job description"
-        }}
 
-        Job Description:
-        {text}
-        """
+        # 5. **Scoring (Normalized 0.0–1.0):**
+        # - Each issue has a base severity weight: High=0.8, Medium=0.4, Low=0.1.
+        # - **Bias Score** = min(1.0, sum(weights) / max_possible).(**Only consider severity of Bias issues for calculation**) Normalize so the score always lies between 0.0 and 1.0.
+        # - **Inclusivity Score** = 1.0 - Bias Score (but never below 0.0).
+        # - **Clarity Score** = 1.0 if no genuine comprehension blockers; deduct proportionally but keep within 0.0–1.0.(**Only consider severity of Clarity issues for calculation**)
+        # """
+        bias_detection_input = DETECT_BIAS_PROMPT.render_input(text=text)
 
         
         
         try:
-            response = self.model.generate_content(
-                bias_detection_prompt,
+            result = await self._generate_routed(
+                DETECT_BIAS_PROMPT,
+                bias_detection_input,
                 generation_config=genai.types.GenerationConfig(
                     temperature=0.1,
                     top_p=0.8,
                     top_k=40,
-                    max_output_tokens=8000,  
-                )
+                    max_output_tokens=self._output_token_budget(8000, deadline),
+                ),
+                routing_text=text,
+                deadline=deadline
             )
 
-            print(f"Raw response: {response}")
-
-            # ---- Safe text extraction ----
-            response_text = ""
-            if hasattr(response, "candidates") and response.candidates:
-                candidate = response.candidates[0]
-                if hasattr(candidate, "content") and hasattr(candidate.content, "parts"):
-                    response_text = "".join(
-                        getattr(part, "text", "") for part in candidate.content.parts
-                    ).strip()
-
-            if not response_text:
-                raise ValueError("No text content returned by Gemini")
-
-            # ---- Clean JSON output ----
-            if response_text.startswith("```json"):
-                response_text = response_text[7:]
-            if response_text.endswith("```"):
-                response_text = response_text[:-3]
-
-            try:
-                result = json.loads(response_text)
-            except json.JSONDecodeError:
-                # fallback: extract JSON via regex
-                import re
-                json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
-                if json_match:
-                    result = json.loads(json_match.group())
-                else:
-                    raise
-
-            print(f"Cleaned result: {result}")
+            log_payload(logger, "Cleaned detect_bias result", result)
             return result
 
 
@@ -497,9 +918,11 @@ class LLMService:
             
      
 
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             error_msg = str(e)
-            print(f"Error in bias detection: {error_msg}")
+            logger.error("Error in bias detection: %s", error_msg)
             
             # Check for specific Gemini API errors
             if "503" in error_msg or "overloaded" in error_msg.lower():
@@ -532,7 +955,88 @@ class LLMService:
 
        
     
-    async def improve_language(self, text: str, detected_issues: List[Dict] = None) -> Dict:
+    @traced("llm.detect_bias_changes")
+    async def detect_bias_changes(self, paragraphs: List[str], changed: Collection[int],
+                                  deadline: Optional[Deadline] = None) -> Dict:
+        """Detect bias in the `changed` paragraphs (by index), with the others as context.
+
+        The whole document is sent, so the model sees a complete job
+        description, but issues are only reported for the changed paragraphs.
+        Errors are raised as they come from Gemini.
+        """
+        text = "\n\n".join(
+            f"<changed>\n{_escape_tags(paragraph, 'changed')}\n</changed>" if index in changed
+            else _escape_tags(paragraph, 'changed')
+            for index, paragraph in enumerate(paragraphs)
+        )
+        result = await self._generate_json(
+            DETECT_BIAS_CHANGES_PROMPT,
+            DETECT_BIAS_CHANGES_PROMPT.render_input(text=text),
+            generation_config=genai.types.GenerationConfig(
+                temperature=0.1,
+                top_p=0.8,
+                top_k=40,
+                max_output_tokens=self._output_token_budget(8000, deadline),
+            ),
+            deadline=deadline
+        )
+        log_payload(logger, "Cleaned detect_bias_changes result", result)
+        return result
+
+    @traced("llm.detect_bias_batch")
+    async def detect_bias_batch(self, texts: List[str], deadline: Optional[Deadline] = None) -> List[Optional[Dict]]:
+        """Detect bias in several short texts with one Gemini call.
+
+        The shared instructions are sent once and each text is wrapped with a
+        random ID, fresh for every batch, so one text cannot pose as another's
+        result; posting tags inside a text are defused for the same reason.
+        Returns one detection per text, in order; an entry is None when the
+        response had no usable result for that text, or several, and every
+        entry is None when the response is not JSON. Service errors are raised.
+        """
+        ids = [secrets.token_hex(4) for _ in texts]
+        while len(set(ids)) < len(ids):
+            ids = [secrets.token_hex(4) for _ in texts]
+        postings = "\n".join(
+            f'<posting id="{posting_id}">\n{_escape_tags(text, "posting")}\n</posting>'
+            for posting_id, text in zip(ids, texts)
+        )
+        try:
+            result = await self._generate_json(
+                DETECT_BIAS_BATCH_PROMPT,
+                DETECT_BIAS_BATCH_PROMPT.render_input(postings=postings),
+                generation_config=genai.types.GenerationConfig(
+                    temperature=0.1,
+                    top_p=0.8,
+                    top_k=40,
+                    max_output_tokens=self._output_token_budget(
+                        min(8000 * len(texts), BATCH_MAX_OUTPUT_TOKENS), deadline
+                    ),
+                ),
+                deadline=deadline
+            )
+        except ValueError as e:
+            logger.warning("Unparseable batched detection of %d texts: %s", len(texts), e)
+            return [None] * len(texts)
+
+        detections: Dict[str, List[Dict]] = {posting_id: [] for posting_id in ids}
+        unknown = 0
+        entries = result.get("results") if isinstance(result, dict) else None
+        for entry in entries if isinstance(entries, list) else []:
+            if isinstance(entry, dict) and isinstance(entry.get("issues"), list) and "bias_score" in entry:
+                matches = detections.get(str(entry.get("id")))
+                if matches is None:
+                    unknown += 1
+                else:
+                    matches.append({k: v for k, v in entry.items() if k != "id"})
+        if unknown:
+            logger.warning("Ignored %d batched detection results for IDs that were not sent", unknown)
+        # A posting answered more than once is ambiguous, so it is left unanswered too
+        return [matches[0] if len(matches) == 1 else None for matches in detections.values()]
+
+    @traced("llm.improve_language")
+    async def improve_language(self, text: str, detected_issues: List[Dict] = None,
+                               deadline: Optional[Deadline] = None) -> Dict:
         """Use Gemini to suggest language improvements with context from detected issues"""
         
         # Format detected issues for the prompt
@@ -548,195 +1052,38 @@ class LLMService:
                 )
             issues_context = "\nDetected Issues:\n" + "".join(formatted_issues)
 
-        print(f"Detected issues context for improve language: {issues_context or 'NONE'}")
+        log_payload(logger, "Detected issues context for improve_language", issues_context or "NONE")
 
        
         
-        improvement_prompt = f"""
-
-                **CRITICAL JSON FORMATTING RULES:**
-                - Return ONLY valid JSON - no extra text before or after
-                - Ensure all strings are properly quoted
-                - Ensure all JSON objects and arrays are properly closed
-                - Use proper comma separation between all properties
-                - Escape any quotes within string values using \"
-                - Use \\n for line breaks within strings, not actual newlines
-                - Escape backslashes as \\\\
-                - NO control characters (tabs, actual newlines, etc.) in JSON strings
-               
-                **At first check that the job description is related to the particular job role and industry and fulfill the requirements of the job description then do the following**
-                
-                Improve the following job description for:
-                **ONLY address the specific issues found in the issues_context below. DO NOT make any other improvements, suggestions, or changes to the job description.**
-                **STRICT RULE: If issues_context is empty or contains no issues, return an empty suggestions array
-                
-                1. SEO optimization with relevant keywords (Suggest ONLY keywords that are relevant to the job description and are STRICTLY NOT present anywhere in the original text - perform thorough analysis to ensure complete absence)
-                2. Brevity and conciseness
-
-                **CRITICAL IMPROVEMENT RULES:**
-                - (IMPORTANT) Only Provide the suggestions for the issues that are present in the issues_context only
-                - If it is mentioned that no education requirements are needed or no graduation is required then add this in the **OUR IDEAL CANDIDATE** section: "No formal education requirements are needed for this role"
-                - Mention the education requirements in the **OUR IDEAL CANDIDATE** section if it is mentioned in the original job description
-                - Add all the skills that are present in the original job description in the **REQUIRED SKILLS** section do not miss any skills that are present in the original job description
-                - If it is mentioned that no experience is needed then add this in the **OUR IDEAL CANDIDATE** section: "No prior experience is required for this role, but relevant skills and enthusiasm are essential."
-                - Add the required experience in the **OUR IDEAL CANDIDATE** section if it is mentioned in the original job description
-                - FLAG LANGUAGE THAT EXCLUDES QUALIFIED CANDIDATES WITHOUT JOB-RELATED JUSTIFICATION
-                - 
-                - FOR CLARITY ISSUES: Focus on ambiguous eligibility language that obscures pathways for internationally trained professionals
-                
-
-                Original Job Description:
-                {text}
-
-                {issues_context}
-
-                **Analysis Instructions:**
-
-                1. Identify job role and industry context first
-                1a.**(Strict instruction)** Only Provide the suggestions for the issues that are present in the issues_context only (If issues_context is empty, return empty suggestions)
-                2. Do NOT identify or fix any additional issues not already detected
-                2a.If the issue type is marked as "clarity" in the issues_context then in suggestions catogory use "clarity" and if the issue type is marked other than clarity in the issues_context then in suggestions category use "inclusivity"
-                3. Do NOT make general improvements to style, tone, or formatting
-                4. Verify if requirements match industry standards (e.g., Colorado dental board for DDS/DMD)
-                5. Maintain professional tone while improving inclusivity( **DO NOT** make general improvements to tone, style, or formatting unless specifically flagged in issues_context)
-                6. Never flag licensure-mandated terms (e.g., "DDS/DMD", "RN license") as elitism
-                7. Suggest ONLY keywords that are relevant to the job description and are STRICTLY NOT present in the Original Job Description - analyze the original text thoroughly to ensure none of the suggested keywords appear anywhere in the original content
-                8. Frame the sentences using the seo_keywords that you have found in the previous step and use them in the improved text. CRITICAL: When incorporating these keywords into the text, write them as plain text without any ** or * formatting. For example, if the keyword is "Patient Care", write it as "Patient Care" NOT as "**Patient Care**". IMPORTANT: Only use keywords that are completely absent from the original job description.
-                9. DO NOT use any markdown formatting (**, *, etc.) within the content text - ONLY use ** for the section headers as specified in the format below. All keywords and content must be written in plain text without any bold or italic formatting.
-                
-                **IMPROVED TEXT FORMATTING REQUIREMENTS:**
-                The improved job description must follow this exact structure and format (keep the ** around section headers):
-                **Rewrite the sentences with (removing the bias and inclusivity issues) some diffrent writting style dont just copy the exact sentences in the KEY RESPONSIBILITIES and OUR IDEAL CANDIDATE sections**
-
-                **IMPORTANT: In the improved_text field, use \\n for line breaks, not actual newlines. Format like this:**
-                "**JOB TITLE:** [Clear, specific job title]\\n\\n**COMPANY:** [Company name]\\n\\n**INDUSTRY:** [Industry]\\n\\n..."
-                
-                **JOB TITLE:** [Clear, specific job title]
-                
-                **COMPANY:** [Company name if provided, otherwise "Company Name"]
-                
-                **INDUSTRY:** [Specific industry/sector]
-                
-                **LOCATION:** [Work location/type - Remote/On-site/Hybrid]
-                
-                **EMPLOYMENT TYPE:** [Full-time/Part-time/Contract/Internship]
-                
-                **JOB SUMMARY:**
-                [6-7 sentences providing an engaging overview of the role and its impact]
-                
-                **KEY RESPONSIBILITIES:**
-                • [Responsibility 1 - action-oriented, specific]
-                • [Responsibility 2 - action-oriented, specific]
-                • [Responsibility 3 - action-oriented, specific]
-                • [Additional responsibilities as needed]
-                
-                **OUR IDEAL CANDIDATE:**
-                • [Essential qualification 1]
-                • [Essential qualification 2]
-                • [Essential qualification 3]
-                • [Additional essential qualifications]
-                
-                **PREFERRED QUALIFICATIONS:**
-                • [Preferred qualification 1]
-                • [Preferred qualification 2]
-                • [Additional preferred qualifications]
-                
-                **REQUIRED SKILLS:**
-                • [Technical skill 1]
-                • [Technical skill 2]
-                • [Soft skill 1]
-                • [Soft skill 2]
-                • [Additional skills]
-                
-                **WHAT WE OFFER:**
-                • [Benefit 1]
-                • [Benefit 2]
-                • [Benefit 3]
-                • [Additional benefits]
-                
-                **APPLICATION PROCESS:**
-                [Brief, clear instructions on how to apply]
-                
-                Return ONLY a valid JSON response (no additional text and extra markdowns):
-                {{
-                    "suggestions": [
-                        {{
-                            "original": "original phrase",
-                            "improved": "improved phrase",
-                            "rationale": "The actual reason why this is better",
-                            "category": "clarity|inclusivity"
-                        }}
-                    ],
-                    "seo_keywords": ["keyword1", "keyword2", "keyword3", "keyword4", "keyword5" - ENSURE these keywords are completely absent from the original job description],
-                    "improved_text": "[Complete rewritten job description using the SEO keywords and improved version in the suggestions identified above also following the EXACT structure outlined above. Maintain all original context while improving clarity, brevity, inclusivity, and SEO optimization. Use the specific headers with ** formatting and bullet point format as specified. Keep section headers with ** but write ALL CONTENT INCLUDING KEYWORDS in plain text without any markdown formatting. Example: write 'Patient Care' not '**Patient Care**'.]",
-                    
-                    
-                }}
-                
-                **If the provided text is not related to a job description and does not fulfill the requirements of job descriptions then do the following**
-                Return ONLY a valid JSON response (no additional text):
-                {{
-                    "suggestions": [],
-                    "improved_text": "N/A - The provided text does not appear to be a job description or does not contain sufficient job-related information to generate an improved version.",
-                    "seo_keywords": []
-                }}
-            """
+        improvement_input = IMPROVE_LANGUAGE_PROMPT.render_input(text=text, issues_context=issues_context)
         
         
         
         try:
-            response = self.model.generate_content(
-                improvement_prompt,
+            result = await self._generate_routed(
+                IMPROVE_LANGUAGE_PROMPT,
+                improvement_input,
                 generation_config=genai.types.GenerationConfig(
                     temperature=0.3,
                     top_p=0.8,
                     top_k=40,
-                    max_output_tokens=9000,  # increase if you still see cutoff
-                )
+                    max_output_tokens=self._output_token_budget(9000, deadline),  # increase if you still see cutoff
+                ),
+                routing_text=text,
+                issue_count=len(detected_issues or []),
+                deadline=deadline
             )
 
-            print(f"Raw response from improve language function: {response}")
-
-            # ---- Safe text extraction ----
-            response_text = ""
-            if hasattr(response, "candidates") and response.candidates:
-                candidate = response.candidates[0]
-                if hasattr(candidate, "content") and hasattr(candidate.content, "parts"):
-                    response_text = "".join(
-                        getattr(part, "text", "") for part in candidate.content.parts
-                    ).strip()
-            
-
-            if not response_text:
-                raise ValueError("No text content returned by Gemini")
-
-            # ---- Clean JSON formatting ----
-            if response_text.startswith("```json"):
-                response_text = response_text[7:]
-            if response_text.endswith("```"):
-                response_text = response_text[:-3]
-
-            print("==== Raw JSON response ====")
-            print(response_text)
-
-            # ---- Try parsing JSON ----
-            try:
-                result = json.loads(response_text)
-            except json.JSONDecodeError:
-                import re
-                json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
-                if json_match:
-                    result = json.loads(json_match.group())
-                else:
-                    raise
-
-            print(f"Cleaned result from improve language: {result}")
-            return result    
+            log_payload(logger, "Cleaned improve_language result", result)
+            return result
        
 
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             error_msg = str(e)
-            print(f"Error in language improvement: {error_msg}")
+            logger.error("Error in language improvement: %s", error_msg)
             
             # Check for specific Gemini API errors
             if "503" in error_msg or "overloaded" in error_msg.lower():
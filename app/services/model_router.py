@@ -0,0 +1,178 @@
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from app.services.token_usage import TokenUsage
+from app.utils.metrics import REGISTRY
+
+LLM_ROUTED_CALLS = REGISTRY.counter(
+    "llm_routed_calls_total", "Gemini calls per model tier", ("call", "tier")
+)
+LLM_ESCALATIONS = REGISTRY.counter(
+    "llm_escalations_total", "Fast-tier results re-run on the main model, by reason (malformed, incomplete, ambiguous)",
+    ("call", "reason")
+)
+LLM_COST = REGISTRY.counter(
+    "llm_cost_usd_total", "Estimated Gemini spend in USD from token counts and configured per-tier prices", ("call", "tier")
+)
+LLM_TIER_LATENCY = REGISTRY.histogram(
+    "llm_call_duration_seconds", "Gemini call latency per model tier", ("call", "tier")
+)
+
+
+class ModelTier:
+    """A Gemini model and its price per million input and output tokens"""
+
+    __slots__ = ("name", "model_name", "input_cost_per_mtok", "output_cost_per_mtok")
+
+    def __init__(self, name: str, model_name: str, input_cost_per_mtok: float, output_cost_per_mtok: float):
+        self.name = name
+        self.model_name = model_name
+        self.input_cost_per_mtok = input_cost_per_mtok
+        self.output_cost_per_mtok = output_cost_per_mtok
+
+    def cost(self, usage: TokenUsage) -> float:
+        return (usage.prompt_tokens * self.input_cost_per_mtok
+                + usage.response_tokens * self.output_cost_per_mtok) / 1_000_000
+
+
+class StagePolicy:
+    """When a stage's input is small enough for the fast tier.
+
+    `max_chars` of 0 keeps the stage on the main model. `max_issues` bounds
+    how many detected issues the improve_language stage may have to rewrite.
+    """
+
+    __slots__ = ("max_chars", "max_issues")
+
+    def __init__(self, max_chars: int, max_issues: Optional[int] = None):
+        self.max_chars = max_chars
+        self.max_issues = max_issues
+
+    def allows(self, text: str, issue_count: int = 0) -> bool:
+        if len(text) > self.max_chars:
+            return False
+        return self.max_issues is None or issue_count <= self.max_issues
+
+
+DEFAULT_POLICIES = {
+    "detect_bias": StagePolicy(max_chars=1500),
+    "improve_language": StagePolicy(max_chars=1500, max_issues=2)
+}
+
+
+def _prices(variable: str, default: str) -> Tuple[float, float]:
+    input_cost, output_cost = os.getenv(variable, default).split(",")
+    return float(input_cost), float(output_cost)
+
+
+class ModelRouter:
+    """Sends small inputs to a fast model tier and re-runs doubtful results on the main model.
+
+    A fast-tier result is escalated when its JSON cannot be parsed (`malformed`),
+    required fields are missing (`incomplete`), or it is a borderline call:
+    a bias score inside `ambiguous_band`, or no suggestions despite detected
+    issues (`ambiguous`). Latency, tokens and estimated cost are tallied per
+    stage and tier.
+    """
+
+    def __init__(self, main: ModelTier, fast: ModelTier, policies: Optional[Dict[str, StagePolicy]] = None,
+                 ambiguous_band: Tuple[float, float] = (0.4, 0.6)):
+        self.main = main
+        self.fast = fast
+        self.policies = policies if policies is not None else dict(DEFAULT_POLICIES)
+        self.ambiguous_band = ambiguous_band
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._escalations: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_env(cls, main_model_name: str) -> Optional["ModelRouter"]:
+        """MODEL_ROUTING=true enables the fast tier (off by default)"""
+        if os.getenv("MODEL_ROUTING", "false").lower() != "true":
+            return None
+        policies = {}
+        for call, default in DEFAULT_POLICIES.items():
+            prefix = f"ROUTE_{call.upper()}"
+            max_issues = os.getenv(f"{prefix}_MAX_ISSUES")
+            policies[call] = StagePolicy(
+                max_chars=int(os.getenv(f"{prefix}_MAX_CHARS", str(default.max_chars))),
+                max_issues=int(max_issues) if max_issues is not None else default.max_issues
+            )
+        low, high = os.getenv("MODEL_ROUTING_AMBIGUOUS_BAND", "0.4-0.6").split("-")
+        return cls(
+            ModelTier("main", main_model_name, *_prices("MAIN_MODEL_COST_PER_MTOK", "0.30,2.50")),
+            ModelTier("fast", os.getenv("FAST_MODEL", "gemini-2.5-flash-lite"),
+                      *_prices("FAST_MODEL_COST_PER_MTOK", "0.10,0.40")),
+            policies,
+            ambiguous_band=(float(low), float(high))
+        )
+
+    def choose(self, call: str, text: str, issue_count: int = 0) -> ModelTier:
+        policy = self.policies.get(call)
+        if policy is not None and policy.allows(text, issue_count):
+            return self.fast
+        return self.main
+
+    def escalation_reason(self, call: str, result, issue_count: int = 0) -> Optional[str]:
+        """Why a fast-tier result should be re-run on the main model, or None to accept it"""
+        if not isinstance(result, dict):
+            return "malformed"
+        if call == "detect_bias":
+            if not isinstance(result.get("issues"), list) or "bias_score" not in result:
+                return "incomplete"
+            if result.get("role") == "N/A":
+                return None
+            if any(not isinstance(issue, dict) or not issue.get("text") or not issue.get("type")
+                   for issue in result["issues"]):
+                return "incomplete"
+            score = result["bias_score"]
+            if isinstance(score, bool) or not isinstance(score, (int, float)):
+                return "incomplete"
+            low, high = self.ambiguous_band
+            if low <= score <= high:
+                return "ambiguous"
+        elif call == "improve_language":
+            if not isinstance(result.get("improved_text"), str) or not isinstance(result.get("suggestions"), list):
+                return "incomplete"
+            if issue_count and not result["suggestions"] and not result["improved_text"].startswith("N/A"):
+                return "ambiguous"
+        return None
+
+    def record(self, call: str, tier: ModelTier, elapsed_ms: float, usage: TokenUsage) -> None:
+        cost = tier.cost(usage)
+        LLM_ROUTED_CALLS.inc(call=call, tier=tier.name)
+        LLM_COST.inc(cost, call=call, tier=tier.name)
+        LLM_TIER_LATENCY.observe(elapsed_ms / 1000, call=call, tier=tier.name)
+        with self._lock:
+            stats = self._stats.setdefault(call, {}).setdefault(tier.name, {
+                "calls": 0, "total_ms": 0.0, "prompt_tokens": 0, "response_tokens": 0, "cost_usd": 0.0
+            })
+            stats["calls"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["prompt_tokens"] += usage.prompt_tokens
+            stats["response_tokens"] += usage.response_tokens
+            stats["cost_usd"] += cost
+
+    def record_escalation(self, call: str, reason: str) -> None:
+        LLM_ESCALATIONS.inc(call=call, reason=reason)
+        with self._lock:
+            reasons = self._escalations.setdefault(call, {})
+            reasons[reason] = reasons.get(reason, 0) + 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            report = {"tiers": {tier.name: tier.model_name for tier in (self.main, self.fast)}, "calls": {}}
+            for call, tiers in self._stats.items():
+                report["calls"][call] = {
+                    tier: {
+                        "calls": stats["calls"],
+                        "avg_ms": round(stats["total_ms"] / stats["calls"], 2),
+                        "prompt_tokens": stats["prompt_tokens"],
+                        "response_tokens": stats["response_tokens"],
+                        "cost_usd": round(stats["cost_usd"], 6)
+                    }
+                    for tier, stats in tiers.items()
+                }
+                report["calls"][call]["escalations"] = dict(self._escalations.get(call, {}))
+            return report
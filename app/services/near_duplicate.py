@@ -0,0 +1,199 @@
+import os
+import sys
+import time
+import zlib
+from typing import Any, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.utils.helpers import TextProcessor
+from app.utils.metrics import REGISTRY
+
+NEAR_DUPLICATE_LOOKUPS = REGISTRY.counter(
+    "near_duplicate_lookups_total", "Near-duplicate index lookups by outcome (hit, miss)", ("outcome",)
+)
+
+
+class MinHasher:
+    """MinHash signatures over word shingles of TextProcessor.clean_text output.
+
+    Each of the `num_perm` hash functions is a multiply-shift hash of the
+    shingle's CRC32, so a signature is `num_perm` uint32 values and the share of
+    equal positions between two signatures estimates the texts' Jaccard similarity.
+    """
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 64 - 1, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 64 - 1, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> Set[str]:
+        words = TextProcessor.clean_text(text).lower().split()
+        if len(words) <= self.shingle_size:
+            return {" ".join(words)} if words else set()
+        return {" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> np.ndarray:
+        shingles = self.shingles(text)
+        if not shingles:
+            return np.full(self.num_perm, 0xFFFFFFFF, dtype=np.uint32)
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+        # uint64 arithmetic wraps, which is what multiply-shift hashing relies on
+        values = (np.outer(self._a, hashes) + self._b[:, None]) >> np.uint64(32)
+        return values.min(axis=1).astype(np.uint32)
+
+
+def value_nbytes(value: Any) -> int:
+    """Approximate memory held by `value`, following tuples, lists, dicts and sets"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(value_nbytes(k) + value_nbytes(v) for k, v in value.items())
+    elif isinstance(value, (tuple, list, set, frozenset)):
+        size += sum(value_nbytes(item) for item in value)
+    return size
+
+
+class NearDuplicateIndex:
+    """Fixed-capacity MinHash/LSH index mapping texts to values stored with them.
+
+    Signatures are split into `bands`; texts sharing any band are candidates
+    and the best candidate with estimated Jaccard similarity of at least
+    `threshold` is returned. All arrays are allocated up front (about 0.5 KB
+    per entry with the defaults) and the stored values may take up to
+    `max_value_bytes`, so memory is bounded by both. Entries are evicted oldest
+    first, when the arrays are full or the values exceed their budget.
+
+    Each band has a hash table of chains linked newest to oldest. Because
+    entries are overwritten oldest first, a chain is cut where it reaches an
+    entry newer than the one before it, or one older than the oldest live entry.
+    """
+
+    def __init__(self, capacity: int = 100000, threshold: float = 0.85, num_perm: int = 64, bands: int = 16,
+                 shingle_size: int = 5, seed: int = 1, max_value_bytes: int = 64 * 1024 * 1024):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.capacity = capacity
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm, shingle_size, seed)
+        self._table_bits = max(1, (2 * capacity - 1).bit_length())
+        self._signatures = np.zeros((capacity, num_perm), dtype=np.uint32)
+        self._sequence = np.full(capacity, -1, dtype=np.int64)
+        self._heads = np.full((bands, 1 << self._table_bits), -1, dtype=np.int32)
+        self._next = np.full((bands, capacity), -1, dtype=np.int32)
+        self._values: List[Any] = [None] * capacity
+        self._value_sizes = np.zeros(capacity, dtype=np.int64)
+        self.max_value_bytes = max_value_bytes
+        self.value_bytes = 0
+        # Sequence number of the oldest entry still in the index
+        self._oldest = 0
+        band_rng = np.random.default_rng(seed + 1)
+        self._band_mix = band_rng.integers(1, 2 ** 64 - 1, size=self.rows, dtype=np.uint64) | np.uint64(1)
+        self._added = 0
+        self.hits = 0
+        self.misses = 0
+        self._lookup_seconds = 0.0
+
+    @classmethod
+    def from_env(cls) -> Optional["NearDuplicateIndex"]:
+        """NEAR_DUPLICATE_REUSE=true enables the index (off by default)"""
+        if os.getenv("NEAR_DUPLICATE_REUSE", "false").lower() != "true":
+            return None
+        return cls(
+            capacity=int(os.getenv("NEAR_DUPLICATE_MAX_ENTRIES", "100000")),
+            threshold=float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.85")),
+            max_value_bytes=int(float(os.getenv("NEAR_DUPLICATE_MAX_VALUE_MB", "64")) * 1024 * 1024)
+        )
+
+    def _slots(self, signature: np.ndarray) -> np.ndarray:
+        keys = (signature.reshape(self.bands, self.rows).astype(np.uint64) * self._band_mix).sum(axis=1)
+        return (keys >> np.uint64(64 - self._table_bits)).astype(np.int64)
+
+    def add(self, text: str, value: Any) -> bool:
+        """Index `text` with `value`; False, and nothing stored, if the value alone exceeds the budget"""
+        nbytes = value_nbytes(value)
+        if nbytes > self.max_value_bytes:
+            return False
+        if self._added - self._oldest == self.capacity:
+            self._evict_oldest()
+        while self.value_bytes + nbytes > self.max_value_bytes:
+            self._evict_oldest()
+        signature = self.hasher.signature(text)
+        entry = self._added % self.capacity
+        self._signatures[entry] = signature
+        self._sequence[entry] = self._added
+        self._values[entry] = value
+        self._value_sizes[entry] = nbytes
+        self.value_bytes += nbytes
+        for band, slot in enumerate(self._slots(signature)):
+            self._next[band, entry] = self._heads[band, slot]
+            self._heads[band, slot] = entry
+        self._added += 1
+        return True
+
+    def _evict_oldest(self) -> None:
+        entry = self._oldest % self.capacity
+        self.value_bytes -= int(self._value_sizes[entry])
+        self._value_sizes[entry] = 0
+        self._values[entry] = None
+        self._oldest += 1
+
+    def _candidates(self, signature: np.ndarray) -> Set[int]:
+        candidates = set()
+        for band, slot in enumerate(self._slots(signature)):
+            rows = slice(band * self.rows, (band + 1) * self.rows)
+            entry = int(self._heads[band, slot])
+            newer = self._added
+            while entry >= 0:
+                sequence = int(self._sequence[entry])
+                if sequence >= newer or sequence < self._oldest:
+                    break
+                if np.array_equal(self._signatures[entry, rows], signature[rows]):
+                    candidates.add(entry)
+                newer = sequence
+                entry = int(self._next[band, entry])
+        return candidates
+
+    def query(self, text: str) -> Optional[Tuple[float, Any]]:
+        """(estimated Jaccard similarity, value) of the closest entry at or above the threshold"""
+        started = time.perf_counter()
+        signature = self.hasher.signature(text)
+        candidates = list(self._candidates(signature))
+        match = None
+        if candidates:
+            similarities = (self._signatures[candidates] == signature).mean(axis=1)
+            best = int(similarities.argmax())
+            if similarities[best] >= self.threshold:
+                match = (float(similarities[best]), self._values[candidates[best]])
+        self._lookup_seconds += time.perf_counter() - started
+        if match is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        NEAR_DUPLICATE_LOOKUPS.inc(outcome="hit" if match else "miss")
+        return match
+
+    def __len__(self) -> int:
+        return self._added - self._oldest
+
+    @property
+    def nbytes(self) -> int:
+        return (self._signatures.nbytes + self._sequence.nbytes + self._heads.nbytes + self._next.nbytes
+                + self._value_sizes.nbytes)
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "capacity": self.capacity,
+            "threshold": self.threshold,
+            "index_bytes": self.nbytes,
+            "value_bytes": self.value_bytes,
+            "max_value_bytes": self.max_value_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "avg_lookup_ms": round(self._lookup_seconds / lookups * 1000, 3) if lookups else 0.0
+        }
@@ -0,0 +1,186 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CacheHandle:
+    """A provider-side cache entry holding one prompt's static instructions"""
+
+    def __init__(self, name: str, digest: str, expires_at: float, model, resource=None):
+        self.name = name
+        self.digest = digest
+        self.expires_at = expires_at
+        self.model = model          # model object whose generate_content() runs on top of the cache
+        self.resource = resource    # backend-specific object used to refresh/delete
+
+
+class GeminiContextCacheBackend:
+    """Gemini explicit context caching via google.generativeai.caching"""
+
+    def create(self, model_name: str, display_name: str, instructions: str, ttl_seconds: int, digest: str) -> CacheHandle:
+        import google.generativeai as genai
+        from google.generativeai import caching
+        cached = caching.CachedContent.create(
+            model=model_name,
+            display_name=display_name,
+            contents=[instructions],
+            ttl=timedelta(seconds=ttl_seconds)
+        )
+        return CacheHandle(cached.name, digest, time.time() + ttl_seconds,
+                           genai.GenerativeModel.from_cached_content(cached), cached)
+
+    def refresh(self, handle: CacheHandle, ttl_seconds: int) -> None:
+        handle.resource.update(ttl=timedelta(seconds=ttl_seconds))
+        handle.expires_at = time.time() + ttl_seconds
+
+    def delete(self, handle: CacheHandle) -> None:
+        handle.resource.delete()
+
+
+class LocalContextCacheBackend:
+    """In-process stand-in for provider caching, for tests and local runs.
+
+    Records every lifecycle operation. Its models prepend the cached
+    instructions and forward to `base_model`, so callers see the same prompt
+    the provider would assemble.
+    """
+
+    def __init__(self, base_model, clock: Callable[[], float] = time.time):
+        self.base_model = base_model
+        self.clock = clock
+        self.operations: List[tuple] = []
+        self._counter = 0
+
+    def create(self, model_name: str, display_name: str, instructions: str, ttl_seconds: int, digest: str) -> CacheHandle:
+        self._counter += 1
+        name = f"cachedContents/local-{self._counter}"
+        self.operations.append(("create", display_name, name))
+        return CacheHandle(name, digest, self.clock() + ttl_seconds, _LocalCachedModel(self.base_model, instructions))
+
+    def refresh(self, handle: CacheHandle, ttl_seconds: int) -> None:
+        self.operations.append(("refresh", handle.name))
+        handle.expires_at = self.clock() + ttl_seconds
+
+    def delete(self, handle: CacheHandle) -> None:
+        self.operations.append(("delete", handle.name))
+
+
+class _LocalCachedModel:
+    def __init__(self, base_model, instructions: str):
+        self.base_model = base_model
+        self.instructions = instructions
+
+    def generate_content(self, contents, **kwargs):
+        return self.base_model.generate_content(self.instructions + contents, **kwargs)
+
+
+class PromptCacheManager:
+    """Keeps one provider cache entry per prompt template's static instructions.
+
+    - Created lazily on the template's first call.
+    - Its TTL is extended once less than `refresh_margin_seconds` remain.
+    - It is recreated when the instructions or the model change, and after it expires.
+    - If creation fails, callers fall back to sending the full prompt, and
+      creation is not retried for `retry_seconds`.
+    """
+
+    def __init__(self, backend, model_name: str, ttl_seconds: int = 3600,
+                 refresh_margin_seconds: int = 300, retry_seconds: int = 60,
+                 clock: Callable[[], float] = time.time):
+        self.backend = backend
+        self.model_name = model_name
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.retry_seconds = retry_seconds
+        self.clock = clock
+        self._entries: Dict[str, CacheHandle] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._retry_at: Dict[str, float] = {}
+
+    @classmethod
+    def from_env(cls, model_name: str) -> Optional["PromptCacheManager"]:
+        """PROMPT_CACHE=true enables Gemini context caching (off by default)"""
+        if os.getenv("PROMPT_CACHE", "false").lower() != "true":
+            return None
+        return cls(
+            GeminiContextCacheBackend(),
+            model_name,
+            ttl_seconds=int(os.getenv("PROMPT_CACHE_TTL_SECONDS", "3600")),
+            refresh_margin_seconds=int(os.getenv("PROMPT_CACHE_REFRESH_MARGIN_SECONDS", "300"))
+        )
+
+    def _digest(self, model_name: str, instructions: str) -> str:
+        return hashlib.sha256(f"{model_name}\n{instructions}".encode("utf-8")).hexdigest()
+
+    async def model_for(self, name: str, instructions: str, model_name: Optional[str] = None):
+        """Model to send only the dynamic input to, or None to send the full prompt.
+
+        `model_name` overrides the default model; caches are per model, so use a
+        distinct `name` for each model a prompt runs on.
+        """
+        model_name = model_name or self.model_name
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            digest = self._digest(model_name, instructions)
+            now = self.clock()
+            entry = self._entries.get(name)
+
+            if entry is not None and entry.digest != digest:
+                logger.info("Prompt %s changed; recreating its context cache", name)
+                await self._drop(name, entry)
+                entry = None
+            if entry is not None and now >= entry.expires_at:
+                self._entries.pop(name, None)
+                entry = None
+
+            if entry is not None and entry.expires_at - now < self.refresh_margin_seconds:
+                try:
+                    await asyncio.to_thread(self.backend.refresh, entry, self.ttl_seconds)
+                except Exception as e:
+                    logger.warning("Refreshing context cache for %s failed: %s", name, e)
+
+            if entry is None:
+                if now < self._retry_at.get(name, 0.0):
+                    return None
+                try:
+                    entry = await asyncio.to_thread(
+                        self.backend.create, model_name, f"bias-detector-{name}",
+                        instructions, self.ttl_seconds, digest
+                    )
+                except Exception as e:
+                    logger.warning("Creating context cache for %s failed, sending full prompts: %s", name, e)
+                    self._retry_at[name] = now + self.retry_seconds
+                    return None
+                self._entries[name] = entry
+            return entry.model
+
+    async def invalidate(self, name: str) -> None:
+        """Forget an entry the provider no longer recognizes"""
+        entry = self._entries.pop(name, None)
+        if entry is not None:
+            logger.info("Context cache %s for %s was rejected; it will be recreated", entry.name, name)
+
+    async def _drop(self, name: str, entry: CacheHandle) -> None:
+        self._entries.pop(name, None)
+        try:
+            await asyncio.to_thread(self.backend.delete, entry)
+        except Exception as e:
+            logger.warning("Deleting context cache %s failed: %s", entry.name, e)
+
+    async def close(self) -> None:
+        """Delete all entries; provider caches are billed for storage until their TTL ends"""
+        for name, entry in list(self._entries.items()):
+            await self._drop(name, entry)
+
+    def snapshot(self) -> Dict:
+        now = self.clock()
+        return {
+            name: {"cache": entry.name, "expires_in_seconds": max(0, round(entry.expires_at - now))}
+            for name, entry in self._entries.items()
+        }
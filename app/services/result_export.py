@@ -0,0 +1,229 @@
+import os
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.models.schemas import BatchResultLine, BiasAnalysisResult
+
+# One Parquet file per table in the export directory
+ANALYSES_FILE = "analyses.parquet"
+ISSUES_FILE = "issues.parquet"
+SUGGESTIONS_FILE = "suggestions.parquet"
+
+
+def require_pyarrow():
+    """pyarrow and pyarrow.parquet, imported on first use so the API does not need them"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)") from e
+    return pyarrow, pyarrow.parquet
+
+
+def _schemas() -> Dict[str, object]:
+    pa, _ = require_pyarrow()
+    return {
+        ANALYSES_FILE: pa.schema([
+            ("analysis_id", pa.string()),
+            ("role", pa.string()),
+            ("industry", pa.string()),
+            # "N/A" scores (not a job description) are null, with is_job_description false
+            ("bias_score", pa.float64()),
+            ("inclusivity_score", pa.float64()),
+            ("clarity_score", pa.float64()),
+            ("is_job_description", pa.bool_()),
+            ("overall_assessment", pa.string()),
+            ("improved_text", pa.string()),
+            ("seo_keywords", pa.list_(pa.string())),
+            ("issue_count", pa.int32()),
+            ("suggestion_count", pa.int32()),
+            ("partial", pa.bool_()),
+            ("partial_reason", pa.string()),
+            ("result_id", pa.string()),
+        ]),
+        ISSUES_FILE: pa.schema([
+            ("analysis_id", pa.string()),
+            ("issue_index", pa.int32()),
+            ("type", pa.string()),
+            ("text", pa.string()),
+            ("start_index", pa.int64()),
+            ("end_index", pa.int64()),
+            ("severity", pa.string()),
+            ("explanation", pa.string()),
+        ]),
+        SUGGESTIONS_FILE: pa.schema([
+            ("analysis_id", pa.string()),
+            ("suggestion_index", pa.int32()),
+            ("original", pa.string()),
+            ("improved", pa.string()),
+            ("rationale", pa.string()),
+            ("category", pa.string()),
+        ]),
+    }
+
+
+def _score(value) -> Optional[float]:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+class ParquetResultWriter:
+    """Writes analysis results as three flat Parquet tables keyed by analysis ID.
+
+    `analyses.parquet` has one row per result, `issues.parquet` and
+    `suggestions.parquet` one row per issue or suggestion. Rows are buffered
+    and written as a row group every `row_group_size` analyses, so memory is
+    bounded by the row group, not the number of results. Use as a context
+    manager, or call close() to write the last row group.
+    """
+
+    def __init__(self, directory: str, row_group_size: int = 1000):
+        _, pq = require_pyarrow()
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.row_group_size = max(1, row_group_size)
+        self.schemas = _schemas()
+        self._writers = {
+            name: pq.ParquetWriter(os.path.join(directory, name), schema, compression="zstd")
+            for name, schema in self.schemas.items()
+        }
+        self._buffers = {name: self._empty(name) for name in self.schemas}
+        self._buffered_analyses = 0
+        self.analyses_written = 0
+
+    def _empty(self, name: str) -> Dict[str, List]:
+        return {field.name: [] for field in self.schemas[name]}
+
+    def __enter__(self) -> "ParquetResultWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, analysis_id: str, result: BiasAnalysisResult) -> None:
+        row = {
+            "analysis_id": analysis_id,
+            "role": result.role,
+            "industry": result.industry,
+            "bias_score": _score(result.bias_score),
+            "inclusivity_score": _score(result.inclusivity_score),
+            "clarity_score": _score(result.clarity_score),
+            "is_job_description": result.bias_score != "N/A",
+            "overall_assessment": result.overall_assessment,
+            "improved_text": result.improved_text,
+            "seo_keywords": list(result.seo_keywords),
+            "issue_count": len(result.issues),
+            "suggestion_count": len(result.suggestions),
+            "partial": result.partial,
+            "partial_reason": result.partial_reason,
+            "result_id": result.result_id,
+        }
+        self._append(ANALYSES_FILE, row)
+        for index, issue in enumerate(result.issues):
+            self._append(ISSUES_FILE, {
+                "analysis_id": analysis_id,
+                "issue_index": index,
+                "type": issue.type.value,
+                "text": issue.text,
+                "start_index": issue.start_index,
+                "end_index": issue.end_index,
+                "severity": issue.severity.value,
+                "explanation": issue.explanation,
+            })
+        for index, suggestion in enumerate(result.suggestions):
+            self._append(SUGGESTIONS_FILE, {
+                "analysis_id": analysis_id,
+                "suggestion_index": index,
+                "original": suggestion.original,
+                "improved": suggestion.improved,
+                "rationale": suggestion.rationale,
+                "category": suggestion.category.value,
+            })
+        self._buffered_analyses += 1
+        self.analyses_written += 1
+        if self._buffered_analyses >= self.row_group_size:
+            self.flush()
+
+    def _append(self, name: str, row: Dict) -> None:
+        buffer = self._buffers[name]
+        for column, values in buffer.items():
+            values.append(row[column])
+
+    def flush(self) -> None:
+        """Write the buffered rows as one row group per table"""
+        pa, _ = require_pyarrow()
+        for name, buffer in self._buffers.items():
+            if buffer["analysis_id"]:
+                self._writers[name].write_table(pa.Table.from_pydict(buffer, schema=self.schemas[name]))
+                self._buffers[name] = self._empty(name)
+        self._buffered_analyses = 0
+
+    def close(self) -> None:
+        if self._writers:
+            self.flush()
+            for writer in self._writers.values():
+                writer.close()
+            self._writers = {}
+
+
+def export_results(lines: Iterable[str], directory: str, row_group_size: int = 1000) -> Tuple[int, int]:
+    """Export the successful results of /analyze-batch style JSONL lines; returns (exported, skipped)"""
+    exported = skipped = 0
+    with ParquetResultWriter(directory, row_group_size) as writer:
+        for line in lines:
+            if not line.strip():
+                continue
+            record = BatchResultLine.model_validate_json(line)
+            if not record.success or record.result is None:
+                skipped += 1
+                continue
+            writer.write(record.id, record.result)
+            exported += 1
+    return exported, skipped
+
+
+def _rows(parquet_file, batch_size: int) -> Iterator[Dict]:
+    for batch in parquet_file.iter_batches(batch_size=batch_size):
+        yield from batch.to_pylist()
+
+
+def read_results(directory: str, batch_size: int = 1024) -> Iterator[Tuple[str, BiasAnalysisResult]]:
+    """(analysis_id, result) pairs of an export, in the order they were written.
+
+    Issue and suggestion rows are in write order too, so each analysis takes
+    the next `issue_count` and `suggestion_count` of them. The three tables
+    are read in step a batch at a time, so memory is bounded by `batch_size`
+    rather than the size of the export.
+    """
+    _, pq = require_pyarrow()
+    issues = _rows(pq.ParquetFile(os.path.join(directory, ISSUES_FILE)), batch_size)
+    suggestions = _rows(pq.ParquetFile(os.path.join(directory, SUGGESTIONS_FILE)), batch_size)
+    for row in _rows(pq.ParquetFile(os.path.join(directory, ANALYSES_FILE)), batch_size):
+        yield row["analysis_id"], _to_result(
+            row, list(islice(issues, row["issue_count"])), list(islice(suggestions, row["suggestion_count"]))
+        )
+
+
+def _to_result(row: Dict, issues: List[Dict], suggestions: List[Dict]) -> BiasAnalysisResult:
+    scores = {
+        field: row[field] if row["is_job_description"] else "N/A"
+        for field in ("bias_score", "inclusivity_score", "clarity_score")
+    }
+    return BiasAnalysisResult(
+        role=row["role"],
+        industry=row["industry"],
+        **scores,
+        issues=[
+            {key: issue[key] for key in ("type", "text", "start_index", "end_index", "severity", "explanation")}
+            for issue in issues
+        ],
+        suggestions=[
+            {key: suggestion[key] for key in ("original", "improved", "rationale", "category")}
+            for suggestion in suggestions
+        ],
+        seo_keywords=row["seo_keywords"] or [],
+        improved_text=row["improved_text"],
+        overall_assessment=row["overall_assessment"],
+        partial=row["partial"],
+        partial_reason=row["partial_reason"],
+        result_id=row["result_id"],
+    )
@@ -1,20 +1,33 @@
 import os
 import io
-from typing import Optional
+import asyncio
+import logging
+from typing import Optional, List, Tuple
 import easyocr
 # import PyPDF2
 from pypdf import PdfReader
 from docx import Document
-from PIL import Image
+from PIL import Image, ImageSequence
 import numpy as np
 from fastapi import UploadFile
 from app.models.schemas import TextExtractionResponse
+from app.utils.metrics import EXTRACTION_LATENCY, STAGE_LATENCY
+from app.utils.logging_config import log_payload
+from app.utils.tracing import traced
+from app.utils.deadline import Deadline, DeadlineExceeded
+
+logger = logging.getLogger(__name__)
 
 class TextExtractor:
 
     def __init__(self):
         # Initialize EasyOCR reader (this will download models on first use)
         self.reader = easyocr.Reader(['en'])  # Add more languages as needed: ['en', 'hi', 'mr']
+
+        # Multi-page TIFF/GIF uploads: only the first OCR_MAX_FRAMES frames are OCRed
+        self.max_frames = int(os.getenv("OCR_MAX_FRAMES", "20"))
+        # Number of text crops EasyOCR's recognizer processes per forward pass
+        self.ocr_batch_size = int(os.getenv("OCR_BATCH_SIZE", "8"))
     
     # @staticmethod
     # async def extract_from_file(file: UploadFile) -> TextExtractionResponse:
@@ -50,33 +63,43 @@ class TextExtractor:
     #             success=False,
     #             error_message=str(e)
     #         )
-    async def extract_from_content(self, content: bytes, filename: str) -> TextExtractionResponse:
-        """Extract text from file content"""
+    @traced("extract")
+    async def extract_from_content(self, content: bytes, filename: str,
+                                   deadline: Optional[Deadline] = None) -> TextExtractionResponse:
+        """Extract text from file content; OCR is abandoned with DeadlineExceeded once `deadline` passes"""
         try:
             # Determine file type from extension
             file_ext = filename.lower().split('.')[-1] if '.' in filename else ''
+            warning = None
             
-            if file_ext in ['jpg', 'jpeg', 'png', 'bmp', 'tiff', 'gif']:
-                extracted_text = self._extract_from_image(content)
-            elif file_ext == 'pdf':
-                extracted_text = self._extract_from_pdf(content)
-            elif file_ext == 'txt':  # Add this line
-                extracted_text = self._extract_from_txt(content)
-            elif file_ext in ['docx', 'doc']:
-                extracted_text = self._extract_from_docx(content)
-                print(f"Extracted text from DOCX: {extracted_text[:100]}...")  # Debug log here is allright
-            else:
+            if file_ext not in ['jpg', 'jpeg', 'png', 'bmp', 'tiff', 'tif', 'gif', 'pdf', 'txt', 'docx', 'doc']:
                 return TextExtractionResponse(
                     success=False,
                     error_message=f"Unsupported file type: {file_ext}"
                 )
+
+            with EXTRACTION_LATENCY.time(file_type=file_ext):
+                if file_ext in ['jpg', 'jpeg', 'png', 'bmp', 'tiff', 'tif', 'gif']:
+                    # OCR is CPU heavy - keep it off the event loop so uploads can run in parallel
+                    ocr = asyncio.to_thread(self._ocr_image, content)
+                    extracted_text, warning = await (deadline.wait(ocr, "ocr") if deadline else ocr)
+                elif file_ext == 'pdf':
+                    extracted_text = self._extract_from_pdf(content)
+                elif file_ext == 'txt':  # Add this line
+                    extracted_text = self._extract_from_txt(content)
+                else:
+                    extracted_text = self._extract_from_docx(content)
+                    log_payload(logger, "Extracted text from DOCX", extracted_text)
             
             return TextExtractionResponse(
                 success=True,
                 extracted_text=extracted_text,
-                file_type=file_ext
+                file_type=file_ext,
+                warning=warning
             )
             
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             return TextExtractionResponse(
                 success=False,
@@ -84,6 +107,7 @@ class TextExtractor:
             )
         
     @staticmethod
+    @traced("extract.pdf")
     def _extract_from_pdf(content: bytes) -> str:
         """Extract text from PDF content"""
         pdf_reader = PdfReader(io.BytesIO(content))
@@ -93,6 +117,7 @@ class TextExtractor:
         return text.strip()
     
     @staticmethod
+    @traced("extract.docx")
     def _extract_from_docx(content: bytes) -> str:
         """Extract text from DOCX content"""
         doc = Document(io.BytesIO(content))
@@ -102,6 +127,7 @@ class TextExtractor:
         return text.strip()
     
     @staticmethod
+    @traced("extract.txt")
     def _extract_from_txt(content: bytes) -> str:
         """Extract text from TXT content"""
         try:
@@ -119,10 +145,23 @@ class TextExtractor:
 
     def _extract_from_image(self, content: bytes) -> str:
         """Extract text from image using OCR"""
+        return self._ocr_image(content)[0]
+
+    @traced("extract.ocr")
+    def _ocr_image(self, content: bytes) -> Tuple[str, Optional[str]]:
+        """OCR an image (every frame of multi-page TIFF/GIF files), returning the text and an optional warning"""
+        with STAGE_LATENCY.time(stage="ocr"):
+            return self._run_ocr(content)
+
+    def _run_ocr(self, content: bytes) -> Tuple[str, Optional[str]]:
         try:
             # Convert bytes to PIL Image
             image = Image.open(io.BytesIO(content))
 
+            n_frames = getattr(image, "n_frames", 1)
+            if isinstance(n_frames, int) and n_frames > 1:
+                return self._extract_from_frames(image, n_frames)
+
             # Convert PIL Image to numpy array
             image_np = np.array(image)
             
@@ -131,10 +170,57 @@ class TextExtractor:
 
             # Extract text from results
             extracted_text = " ".join([result[1] for result in results])
-            print(f"Extracted text from image: {extracted_text[:100]}...")
-            return extracted_text.strip()
+            log_payload(logger, "Extracted text from image", extracted_text)
+            return extracted_text.strip(), None
             
 
         except Exception as e:
-            print(f"Error in OCR extraction: {str(e)}")
-            raise
\ No newline at end of file
+            logger.error("Error in OCR extraction: %s", e)
+            raise
+
+    def _extract_from_frames(self, image: Image.Image, n_frames: int) -> Tuple[str, Optional[str]]:
+        """OCR the frames of a multi-page image in one batched EasyOCR call"""
+        warning = None
+        if n_frames > self.max_frames:
+            warning = (
+                f"Image has {n_frames} pages/frames; only the first {self.max_frames} were processed "
+                f"and the extracted text is truncated"
+            )
+            logger.warning(warning)
+
+        frames = self._load_frames(image, self.max_frames)
+
+        # Detection runs once over the stacked pages and recognition batches text crops,
+        # instead of one full readtext call per page
+        batched_results = self.reader.readtext_batched(frames, batch_size=self.ocr_batch_size)
+
+        page_texts = []
+        for frame_results in batched_results:
+            page_text = " ".join([result[1] for result in frame_results]).strip()
+            if page_text:
+                page_texts.append(page_text)
+
+        extracted_text = "\n\n".join(page_texts)
+        log_payload(logger, f"Extracted text from {len(frames)} image frames", extracted_text)
+        return extracted_text, warning
+
+    @staticmethod
+    def _load_frames(image: Image.Image, max_frames: int) -> List[np.ndarray]:
+        """Convert up to max_frames frames to RGB, padded to a common size as the batched OCR path requires"""
+        frames = []
+        for frame in ImageSequence.Iterator(image):
+            if len(frames) >= max_frames:
+                break
+            frames.append(frame.convert("RGB"))
+
+        width = max(frame.width for frame in frames)
+        height = max(frame.height for frame in frames)
+
+        padded = []
+        for frame in frames:
+            if frame.size != (width, height):
+                canvas = Image.new("RGB", (width, height), "white")
+                canvas.paste(frame, (0, 0))
+                frame = canvas
+            padded.append(np.array(frame))
+        return padded
@@ -0,0 +1,165 @@
+import os
+import threading
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from app.utils.metrics import REGISTRY
+
+TOKEN_USAGE_HEADER = "X-Token-Usage"
+
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total",
+    "Gemini tokens per call; kind is prompt_static, prompt_user, response or prompt_cached "
+    "(the part of prompt_static served from the context cache), source is reported (usage_metadata) or estimated",
+    ("call", "kind", "source")
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough Gemini token count (about four characters per token)"""
+    return (len(text) + 3) // 4
+
+
+def _reported_count(usage, field: str) -> Optional[int]:
+    value = getattr(usage, field, None)
+    # Fakes and mocks return non-int placeholders; only trust real counts
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+class TokenUsage:
+    """Token counts of one Gemini call, split into static prompt text and user-supplied text"""
+
+    __slots__ = ("call", "prompt_tokens", "response_tokens", "static_prompt_tokens", "cached_tokens", "estimated")
+
+    def __init__(self, call: str, prompt_tokens: int, response_tokens: int,
+                 static_prompt_tokens: int, cached_tokens: int = 0, estimated: bool = False):
+        self.call = call
+        self.prompt_tokens = prompt_tokens
+        self.response_tokens = response_tokens
+        self.static_prompt_tokens = static_prompt_tokens
+        self.cached_tokens = cached_tokens
+        self.estimated = estimated
+
+    @property
+    def user_prompt_tokens(self) -> int:
+        return self.prompt_tokens - self.static_prompt_tokens
+
+    @classmethod
+    def from_response(cls, call: str, response, prompt: str, response_text: str, static_chars: int) -> "TokenUsage":
+        """Read counts from `response.usage_metadata`, estimating locally when it is missing.
+
+        The provider reports one prompt total; the static share is apportioned by
+        character count.
+        """
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = _reported_count(usage, "prompt_token_count")
+        response_tokens = _reported_count(usage, "candidates_token_count")
+        estimated = prompt_tokens is None
+        if prompt_tokens is None:
+            prompt_tokens = estimate_tokens(prompt)
+        if response_tokens is None:
+            response_tokens = estimate_tokens(response_text)
+        static_share = static_chars / len(prompt) if prompt else 0.0
+        return cls(
+            call=call,
+            prompt_tokens=prompt_tokens,
+            response_tokens=response_tokens,
+            static_prompt_tokens=round(prompt_tokens * static_share),
+            cached_tokens=_reported_count(usage, "cached_content_token_count") or 0,
+            estimated=estimated
+        )
+
+
+class UsageReport:
+    """Process-wide token totals per call, for the static-vs-user prompt breakdown"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, int]] = {}
+
+    def record(self, usage: TokenUsage) -> None:
+        source = "estimated" if usage.estimated else "reported"
+        LLM_TOKENS.inc(usage.static_prompt_tokens, call=usage.call, kind="prompt_static", source=source)
+        LLM_TOKENS.inc(usage.user_prompt_tokens, call=usage.call, kind="prompt_user", source=source)
+        LLM_TOKENS.inc(usage.response_tokens, call=usage.call, kind="response", source=source)
+        if usage.cached_tokens:
+            LLM_TOKENS.inc(usage.cached_tokens, call=usage.call, kind="prompt_cached", source=source)
+        with self._lock:
+            totals = self._totals.setdefault(usage.call, {
+                "calls": 0, "prompt_tokens": 0, "static_prompt_tokens": 0,
+                "response_tokens": 0, "cached_tokens": 0, "estimated_calls": 0
+            })
+            totals["calls"] += 1
+            totals["prompt_tokens"] += usage.prompt_tokens
+            totals["static_prompt_tokens"] += usage.static_prompt_tokens
+            totals["response_tokens"] += usage.response_tokens
+            totals["cached_tokens"] += usage.cached_tokens
+            totals["estimated_calls"] += usage.estimated
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            report = {}
+            for call, totals in self._totals.items():
+                prompt = totals["prompt_tokens"]
+                report[call] = {
+                    **totals,
+                    "user_prompt_tokens": prompt - totals["static_prompt_tokens"],
+                    "static_fraction": round(totals["static_prompt_tokens"] / prompt, 3) if prompt else 0.0
+                }
+            return report
+
+
+usage_report = UsageReport()
+
+# Calls made while serving the current request, when a TokenUsageMiddleware is tracking it
+_request_usage: ContextVar[Optional[List[TokenUsage]]] = ContextVar("request_token_usage", default=None)
+
+
+def record_usage(usage: TokenUsage) -> None:
+    usage_report.record(usage)
+    calls = _request_usage.get()
+    if calls is not None:
+        calls.append(usage)
+
+
+def format_usage_header(calls: List[TokenUsage]) -> str:
+    """`detect_bias;prompt=..;static=..;response=.., improve_language;...` (estimated counts are marked)"""
+    parts = []
+    for usage in calls:
+        part = f"{usage.call};prompt={usage.prompt_tokens};static={usage.static_prompt_tokens};response={usage.response_tokens}"
+        if usage.estimated:
+            part += ";estimated"
+        parts.append(part)
+    return ", ".join(parts)
+
+
+class TokenUsageMiddleware:
+    """Adds an X-Token-Usage header listing the Gemini calls a request made.
+
+    Only calls finished before the response starts are included, so streaming
+    responses report what had completed by their first byte. Enabled with
+    TOKEN_USAGE_HEADER=true.
+    """
+
+    def __init__(self, app, enabled: Optional[bool] = None):
+        self.app = app
+        self.enabled = enabled if enabled is not None else os.getenv("TOKEN_USAGE_HEADER", "false").lower() == "true"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        calls: List[TokenUsage] = []
+        token = _request_usage.set(calls)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and calls:
+                header = (TOKEN_USAGE_HEADER.lower().encode(), format_usage_header(calls).encode("latin-1"))
+                message["headers"] = list(message.get("headers", [])) + [header]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_usage.reset(token)
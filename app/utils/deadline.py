@@ -0,0 +1,67 @@
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+REQUEST_TIMEOUT_HEADER = "X-Request-Timeout"
+
+
+class DeadlineExceeded(Exception):
+    """The request's time budget ran out before `stage` could finish"""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        super().__init__(f"Request deadline exceeded during {stage}")
+
+
+class Deadline:
+    """A request's absolute time budget, passed down to every stage that can wait"""
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.seconds = seconds
+        self.clock = clock
+        self.expires_at = clock() + seconds
+
+    @classmethod
+    def for_request(cls, header_value: Optional[str]) -> Optional["Deadline"]:
+        """Budget from an X-Request-Timeout header (seconds), else REQUEST_DEADLINE_SECONDS.
+
+        The configured value also caps the header; 0 disables deadlines. Raises
+        ValueError for a header that is not a positive number.
+        """
+        limit = float(os.getenv("REQUEST_DEADLINE_SECONDS", "55"))
+        seconds = limit
+        if header_value is not None:
+            seconds = float(header_value)
+            if not seconds > 0:
+                raise ValueError(f"{REQUEST_TIMEOUT_HEADER} must be a positive number of seconds")
+            if limit > 0:
+                seconds = min(seconds, limit)
+        if seconds <= 0:
+            return None
+        return cls(seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - self.clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self, stage: str) -> None:
+        if self.expired:
+            raise DeadlineExceeded(stage)
+
+    async def wait(self, awaitable: Awaitable[T], stage: str) -> T:
+        """Await within the remaining budget, raising DeadlineExceeded when it runs out"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise DeadlineExceeded(stage)
+        try:
+            return await asyncio.wait_for(awaitable, remaining)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(stage) from None
@@ -1,15 +1,26 @@
+import logging
 import re
 from typing import List, Dict
 import nltk
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 
-# Download required NLTK data
-try:
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
-except:
-    pass
+logger = logging.getLogger(__name__)
+
+_nltk_data_checked = False
+
+
+def _ensure_nltk_data() -> None:
+    """Download required NLTK data on first use, so importing this module stays offline"""
+    global _nltk_data_checked
+    if _nltk_data_checked:
+        return
+    _nltk_data_checked = True
+    try:
+        nltk.download('punkt', quiet=True)
+        nltk.download('stopwords', quiet=True)
+    except:
+        pass
 
 class TextProcessor:
     
@@ -25,6 +36,7 @@ class TextProcessor:
     @staticmethod
     def extract_keywords(text: str, top_n: int = 10) -> List[str]:
         """Extract important keywords from text"""
+        _ensure_nltk_data()
         try:
             # Tokenize and remove stopwords
             words = word_tokenize(text.lower())
@@ -46,7 +58,7 @@ class TextProcessor:
             return [word for word, freq in sorted_words[:top_n]]
             
         except Exception as e:
-            print(f"Error extracting keywords: {e}")
+            logger.error("Error extracting keywords: %s", e)
             return []
     
     @staticmethod
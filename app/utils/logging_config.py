@@ -0,0 +1,141 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+from app.utils.tracing import current_request_id
+
+# All service loggers live under this name (app.main, app.services.llm_service, ...)
+APP_LOGGER = "app"
+
+_listener: Optional[QueueListener] = None
+
+
+class Truncated:
+    """Defers str() of a large payload until the record is formatted, then caps its length"""
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value: Any, limit: Optional[int] = None):
+        self.value = value
+        self.limit = limit if limit is not None else int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "500"))
+
+    def __str__(self) -> str:
+        text = str(self.value)
+        if len(text) <= self.limit:
+            return text
+        return f"{text[:self.limit]}... [{len(text) - self.limit} more chars]"
+
+
+class PayloadSampler(logging.Filter):
+    """Keeps only a fraction of records marked `sampled`; everything else passes.
+
+    Runs before the message is formatted, so dropped payloads are never stringified.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False):
+            return True
+        return self.rate >= 1.0 or random.random() < self.rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Message rendering and JSON encoding happen on the listener thread; only
+        # request-scoped state and the traceback (while its frames are alive) are captured here
+        record.request_id = current_request_id()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra={"fields": {...}}` is merged into it"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def configure_logging() -> None:
+    """Route the app's loggers through a bounded queue to a JSON stdout writer thread.
+
+    LOG_LEVEL sets the level (default INFO). Payload dumps are logged at DEBUG,
+    truncated to LOG_PAYLOAD_MAX_CHARS and sampled at LOG_PAYLOAD_SAMPLE_RATE.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(PayloadSampler(float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.1"))))
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    logger = logging.getLogger(APP_LOGGER)
+    logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    logger.addHandler(handler)
+    logger.propagate = False
+
+    _listener = QueueListener(log_queue, stream_handler)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        logger = logging.getLogger(APP_LOGGER)
+        for handler in list(logger.handlers):
+            if isinstance(handler, NonBlockingQueueHandler):
+                logger.removeHandler(handler)
+
+
+def log_payload(logger: logging.Logger, label: str, payload: Any) -> None:
+    """Log a potentially large payload at DEBUG, sampled and truncated.
+
+    The payload is rendered later on the writer thread, so pass values that are
+    not mutated after logging.
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s: %s", label, Truncated(payload), extra={"sampled": True})
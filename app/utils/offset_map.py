@@ -0,0 +1,65 @@
+from bisect import bisect_right
+from typing import List, Tuple
+
+
+class OffsetMap:
+    """Maps offsets in a text derived from an original back to the original.
+
+    The derived text is a sequence of pieces, each either copied from the
+    original (offsets map one to one) or inserted (every offset maps to one
+    original position, such as the start of the whitespace run it replaced).
+    """
+
+    def __init__(self, pieces: List[Tuple[int, int, int, bool]], original_length: int):
+        # (derived_start, original_start, length, copied), ordered by derived_start
+        self._pieces = pieces
+        self._starts = [piece[0] for piece in pieces]
+        self.original_length = original_length
+
+    def to_original(self, offset: int) -> int:
+        index = bisect_right(self._starts, offset) - 1
+        if index < 0:
+            return 0
+        derived_start, original_start, length, copied = self._pieces[index]
+        if offset >= derived_start + length:
+            # Past the end of the last piece
+            return self.original_length if index == len(self._pieces) - 1 else original_start
+        return original_start + (offset - derived_start) if copied else original_start
+
+    def span_to_original(self, start: int, end: int) -> Tuple[int, int]:
+        """Original span covering the derived span [start, end)"""
+        original_start = self.to_original(start)
+        if end <= start:
+            return original_start, original_start
+        return original_start, max(original_start, self.to_original(end - 1) + 1)
+
+
+class MappedTextBuilder:
+    """Builds a derived text piece by piece along with its OffsetMap"""
+
+    def __init__(self, original: str):
+        self.original = original
+        self._parts: List[str] = []
+        self._pieces: List[Tuple[int, int, int, bool]] = []
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def copy(self, start: int, end: int) -> None:
+        """Append original[start:end]"""
+        if end > start:
+            self._append(self.original[start:end], start, True)
+
+    def insert(self, text: str, original_position: int) -> None:
+        """Append `text`, standing in for the original at `original_position`"""
+        if text:
+            self._append(text, original_position, False)
+
+    def _append(self, text: str, original_start: int, copied: bool) -> None:
+        self._parts.append(text)
+        self._pieces.append((self._length, original_start, len(text), copied))
+        self._length += len(text)
+
+    def build(self) -> Tuple[str, OffsetMap]:
+        return "".join(self._parts), OffsetMap(list(self._pieces), len(self.original))
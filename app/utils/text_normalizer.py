@@ -0,0 +1,83 @@
+import re
+from collections import Counter
+from typing import List, Tuple
+
+from app.utils.offset_map import MappedTextBuilder, OffsetMap
+
+# "3", "- 3 -", "Page 3", "Page 3 of 5", "3/5"
+_PAGE_NUMBER = re.compile(r"^[-–—]?\s*(?:page\s+)?\d{1,4}\s*(?:(?:of|/)\s*\d{1,4})?\s*[-–—]?$", re.IGNORECASE)
+_WORD = re.compile(r"\S+")
+# Page headers and footers are short; longer repeated lines are content
+_FURNITURE_MAX_CHARS = 80
+_SENTENCE_END = ".!?:;"
+
+
+class NormalizedText:
+    """Extracted text tidied for prompting, with offsets back to the original"""
+
+    def __init__(self, original: str, text: str, offsets: OffsetMap):
+        self.original = original
+        self.text = text
+        self.offsets = offsets
+
+
+def _lines(text: str) -> List[Tuple[int, int]]:
+    spans = []
+    start = 0
+    for line in text.split("\n"):
+        spans.append((start, start + len(line)))
+        start += len(line) + 1
+    return spans
+
+
+def normalize_text(text: str, repeated_line_min: int = 3) -> NormalizedText:
+    """Collapse whitespace, rejoin hyphenated line breaks and drop page furniture.
+
+    Runs of spaces and tabs become one space and blank-line runs one blank
+    line, so paragraphs survive. Page-number lines, and short lines repeated
+    at least `repeated_line_min` times (running headers and footers), are
+    dropped, and a page break they leave in mid-sentence is closed up.
+    "develop-\\nment" becomes "development" when the next line starts in
+    lower case.
+    """
+    lines = _lines(text)
+    keys = [" ".join(text[start:end].split()).lower() for start, end in lines]
+    counts = Counter(key for key in keys if key)
+
+    # (words of each kept line, whether a blank line precedes it)
+    content: List[Tuple[List[Tuple[int, int]], bool]] = []
+    blank_before = furniture_before = False
+    for (start, end), key in zip(lines, keys):
+        if not key:
+            blank_before = True
+            continue
+        if _PAGE_NUMBER.match(key) or (counts[key] >= repeated_line_min and len(key) <= _FURNITURE_MAX_CHARS):
+            furniture_before = True
+            continue
+        if furniture_before and content and text[content[-1][0][-1][1] - 1] not in _SENTENCE_END:
+            # A page break in mid-sentence is not a paragraph break
+            blank_before = False
+        content.append(([m.span() for m in _WORD.finditer(text, start, end)], blank_before))
+        blank_before = furniture_before = False
+
+    builder = MappedTextBuilder(text)
+    joined = False
+    for i, (words, blank) in enumerate(content):
+        last_start, last_end = words[-1]
+        next_line = content[i + 1] if i + 1 < len(content) else None
+        join_next = (
+            next_line is not None and not next_line[1]
+            and last_end - last_start > 1 and text[last_end - 1] == "-" and text[last_end - 2].isalpha()
+            and text[next_line[0][0][0]].islower()
+        )
+        for j, (start, end) in enumerate(words):
+            if j == 0:
+                if i > 0 and not joined:
+                    builder.insert("\n\n" if blank else "\n", start)
+            else:
+                builder.insert(" ", words[j - 1][1])
+            builder.copy(start, end - 1 if join_next and j == len(words) - 1 else end)
+        joined = join_next
+
+    normalized, offsets = builder.build()
+    return NormalizedText(text, normalized, offsets)
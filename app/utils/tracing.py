@@ -0,0 +1,213 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+
+class Span:
+    """One timed operation within a trace"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "duration_ms", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.duration_ms = 0.0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+
+class _Trace:
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List[Span] = []
+
+
+class SpanExporter:
+    """Receives every finished trace's spans; subclass to ship them elsewhere"""
+
+    def export(self, spans: List[Span]) -> None:
+        raise NotImplementedError
+
+
+class InMemoryExporter(SpanExporter):
+    """Keeps exported spans in a list - for tests"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, spans: List[Span]) -> None:
+        self.spans.extend(spans)
+
+
+class JsonLinesExporter(SpanExporter):
+    """Appends one JSON object per span to a local file for offline analysis"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+_current_trace: ContextVar[Optional[_Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+_exporter: Optional[SpanExporter] = None
+
+
+def set_exporter(exporter: Optional[SpanExporter]) -> None:
+    """Install the exporter; None disables span collection (request IDs still propagate)"""
+    global _exporter
+    _exporter = exporter
+
+
+def configure_tracing() -> None:
+    """Pick the exporter from TRACE_EXPORTER: `none` (default) or `jsonl` (writes TRACE_FILE)"""
+    kind = os.getenv("TRACE_EXPORTER", "none").lower()
+    if kind == "jsonl":
+        set_exporter(JsonLinesExporter(os.getenv("TRACE_FILE", "traces.jsonl")))
+    else:
+        set_exporter(None)
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a block as a child of the current span, or as a new trace's root span.
+
+    Yields the Span (or None while tracing is disabled) so callers can attach attributes.
+    """
+    if _exporter is None:
+        yield None
+        return
+
+    trace = _current_trace.get()
+    is_root = trace is None
+    if is_root:
+        trace = _Trace(_request_id.get() or uuid.uuid4().hex)
+    parent = _current_span.get()
+    current = Span(name, trace.trace_id, parent.span_id if parent else None, attributes)
+    trace_token = _current_trace.set(trace) if is_root else None
+    span_token = _current_span.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.duration_ms = (time.perf_counter() - started) * 1000
+        trace.spans.append(current)
+        _current_span.reset(span_token)
+        if is_root:
+            _current_trace.reset(trace_token)
+            _export(trace.spans)
+
+
+def _export(spans: List[Span]) -> None:
+    exporter = _exporter
+    if exporter is None:
+        return
+    try:
+        exporter.export(spans)
+    except Exception:
+        # Tracing must never fail a request
+        pass
+
+
+def traced(name: str):
+    """Decorator wrapping a sync or async function in a span"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class TracingMiddleware:
+    """ASGI middleware that assigns each request an ID and wraps it in a root span.
+
+    The ID comes from an incoming X-Request-ID header when present, is echoed
+    on the response and becomes the trace ID of every span the request creates.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _incoming_request_id(scope) or uuid.uuid4().hex
+        token = _request_id.set(request_id)
+        header = (REQUEST_ID_HEADER.lower().encode(), request_id.encode("latin-1"))
+
+        with span("http.request", method=scope["method"], path=scope["path"]) as root:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    message["headers"] = list(message.get("headers", [])) + [header]
+                    if root is not None:
+                        root.set(status=message["status"])
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                _request_id.reset(token)
+
+
+def _incoming_request_id(scope) -> Optional[str]:
+    for name, value in scope.get("headers", []):
+        if name == b"x-request-id":
+            # Bounded and printable so a client cannot inject into logs or headers
+            candidate = value.decode("latin-1")[:128]
+            if candidate.isascii() and candidate.isprintable():
+                return candidate
+    return None
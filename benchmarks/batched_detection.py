@@ -0,0 +1,57 @@
+"""Input tokens per posting when detect_bias batches short postings, without calling the model.
+
+    python benchmarks/batched_detection.py [--sizes 1,2,4,8] [posting.txt ...]
+
+Renders the single and batched detect_bias prompts for the postings (built-in
+short samples when none are given) and prints the estimated input tokens per
+posting at each batch size. Output tokens do not change with batching. Live
+numbers are under `batched_detection` and `token_usage` in GET /stats.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.llm_service import DETECT_BIAS_BATCH_PROMPT, DETECT_BIAS_PROMPT  # noqa: E402
+from app.services.token_usage import estimate_tokens  # noqa: E402
+
+SAMPLES = [
+    "Line cook wanted for a busy downtown bistro. Young, energetic team players preferred. "
+    "Weekend and evening shifts; food handler card required.",
+    "Warehouse associate: pick, pack and ship orders. Must lift 50 lbs. Native English speaker. "
+    "Full-time, $19/hour, benefits after 90 days.",
+    "Receptionist for a dental office. Greet patients, schedule appointments and answer phones. "
+    "Recent graduates encouraged to apply.",
+    "Delivery driver with a clean driving record. He will own the morning route and vehicle checks. "
+    "Part-time, flexible hours.",
+]
+
+
+def postings_input(texts):
+    # IDs are eight random hex digits in the service
+    postings = "\n".join(f'<posting id="{number:08x}">\n{text}\n</posting>' for number, text in enumerate(texts, 1))
+    return DETECT_BIAS_BATCH_PROMPT.render(postings=postings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1,2,4,8", help="comma-separated batch sizes")
+    parser.add_argument("paths", nargs="*", help="posting text files")
+    args = parser.parse_args()
+
+    texts = [open(path, encoding="utf-8").read() for path in args.paths] or SAMPLES
+    payload = sum(estimate_tokens(text) for text in texts) / len(texts)
+    single = sum(estimate_tokens(DETECT_BIAS_PROMPT.render(text=text)) for text in texts) / len(texts)
+    print(f"{len(texts)} postings, {payload:.0f} payload tokens each on average")
+    print(f"  unbatched    {single:7.0f} input tokens per posting")
+    for size in (int(value) for value in args.sizes.split(",")):
+        if size < 2:
+            continue
+        batch = [texts[i % len(texts)] for i in range(size)]
+        per_posting = estimate_tokens(postings_input(batch)) / size
+        print(f"  batch of {size:<3d} {per_posting:7.0f} input tokens per posting ({single / per_posting:.1f}x fewer)")
+
+
+if __name__ == "__main__":
+    main()
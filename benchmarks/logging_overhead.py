@@ -0,0 +1,99 @@
+"""Per-request logging overhead: the old print() debug output vs the queued structured logger.
+
+Replays the log calls one /analyze request makes with representative payload sizes
+(raw Gemini responses, cleaned results, the BiasAnalysisResult and the input text)
+and reports the time spent on the request path.
+
+    python benchmarks/logging_overhead.py [--requests 2000]
+
+stdout is redirected to /dev/null, so the numbers are a lower bound: a slow log
+pipe only makes the synchronous print() path worse, while the queued path never
+writes on the request thread.
+"""
+import argparse
+import contextlib
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.schemas import BiasAnalysisResult, BiasIssue, Suggestion  # noqa: E402
+
+TEXT = "We are looking for a rockstar developer who is a digital native. " * 60
+RAW_RESPONSE = {"candidates": [{"content": {"parts": [{"text": '{"issues": [...]} ' * 400}]}}]}
+CLEANED = {"issues": [{"type": "age", "text": "digital native", "explanation": "x" * 200}] * 10}
+RESULT = BiasAnalysisResult(
+    role="Software Developer", industry="Technology",
+    bias_score=0.4, inclusivity_score=0.6, clarity_score=0.8,
+    issues=[BiasIssue(type="age", text="digital native", start_index=0, end_index=14,
+                      severity="medium", explanation="x" * 200)] * 10,
+    suggestions=[Suggestion(original="rockstar", improved="skilled", rationale="y" * 200,
+                            category="inclusivity")] * 10,
+    seo_keywords=["developer"], improved_text=TEXT,
+    overall_assessment="Moderate bias"
+)
+
+
+def old_request():
+    print(f"Analyzing text: {TEXT[:100]}...")
+    print(f"Raw response: {RAW_RESPONSE}")
+    print(f"Cleaned result: {CLEANED}")
+    print(f"LLM bias result: {CLEANED}")
+    print(f"Parsed all_issues: {len(CLEANED['issues'])} issues")
+    print(f"Raw response from improve language function: {RAW_RESPONSE}")
+    print("==== Raw JSON response ====")
+    print(RAW_RESPONSE)
+    print(f"Cleaned result from improve language: {CLEANED}")
+    print(f"Final result before return: {RESULT}")
+    print(f"Analysis result going from /analyze: {RESULT}")
+
+
+def new_request(logger):
+    from app.utils.logging_config import log_payload
+    log_payload(logger, "Analyzing text", TEXT)
+    log_payload(logger, "Raw detect_bias response", RAW_RESPONSE)
+    log_payload(logger, "Cleaned detect_bias result", CLEANED)
+    log_payload(logger, "LLM bias result", CLEANED)
+    logger.debug("Parsed %d issues", len(CLEANED["issues"]))
+    log_payload(logger, "Raw improve_language response", RAW_RESPONSE)
+    log_payload(logger, "Raw improve_language JSON", RAW_RESPONSE)
+    log_payload(logger, "Cleaned improve_language result", CLEANED)
+    log_payload(logger, "Final analysis result", RESULT)
+
+
+def measure(fn, requests):
+    started = time.perf_counter()
+    for _ in range(requests):
+        fn()
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    from app.utils import logging_config
+    results = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        results["print (before)"] = measure(old_request, args.requests)
+        sys.stdout = devnull  # the listener's StreamHandler binds sys.stdout when configured
+        logging_config.configure_logging()
+        logger = logging.getLogger("app.benchmark")
+        for level, rate in (("INFO", "0.1"), ("DEBUG", "0.1"), ("DEBUG", "1.0")):
+            logging.getLogger(logging_config.APP_LOGGER).setLevel(level)
+            for handler in logging.getLogger(logging_config.APP_LOGGER).handlers:
+                for log_filter in handler.filters:
+                    log_filter.rate = float(rate)
+            results[f"queued logger, LOG_LEVEL={level}, sample={rate}"] = measure(lambda: new_request(logger), args.requests)
+        logging_config.shutdown_logging()
+        sys.stdout = sys.__stdout__
+
+    for name, micros in results.items():
+        print(f"{name:45s} {micros:9.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
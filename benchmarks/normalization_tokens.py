@@ -0,0 +1,106 @@
+"""Prompt tokens saved by the normalization stage on a corpus of extracted texts.
+
+    python benchmarks/normalization_tokens.py [--gemini] [extracted.txt | directory ...]
+
+Without arguments, runs on a built-in corpus: a few job descriptions laid out the
+way PDF and OCR extraction returns them (running headers and footers, page
+numbers, hyphenated line breaks, ragged whitespace). Token counts use the
+four-characters-per-token estimate; with --gemini and GOOGLE_GEMINI_API_KEY set,
+Gemini's count_tokens is used as well, which charges whitespace runs less.
+"""
+import os
+import sys
+import textwrap
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.token_usage import estimate_tokens  # noqa: E402
+from app.utils.text_normalizer import normalize_text  # noqa: E402
+
+JOBS = [
+    ("Senior Backend Engineer",
+     "We are looking for an experienced backend engineer to design and operate the services behind our "
+     "payments platform. You will own APIs end to end, from data modelling and implementation through "
+     "deployment and on-call, and collaborate with product managers and designers on new features. "
+     "Requirements: five or more years building distributed systems, strong knowledge of Python or Go, "
+     "experience with relational databases and message queues, and clear written communication."),
+    ("Registered Nurse",
+     "Our community hospital is hiring registered nurses for the medical-surgical unit. Nurses assess "
+     "patients, administer medication, coordinate care plans with physicians and educate families before "
+     "discharge. Candidates need a current nursing licence, basic life support certification and at least "
+     "one year of acute care experience. Rotating weekend shifts are required."),
+    ("Warehouse Associate",
+     "The warehouse associate receives, stores and ships customer orders accurately and safely. Duties "
+     "include operating pallet jacks, scanning inventory, packing orders and keeping work areas clean. "
+     "Previous warehouse experience is helpful but not required; full training is provided on site."),
+]
+
+
+def _as_extracted(title: str, body: str, pages: int = 3) -> str:
+    """Lay a posting out like multi-page PDF extraction output"""
+    lines = textwrap.wrap(" ".join([body] * 3), width=68, break_long_words=True)
+    # Hyphenate every fifth wrapped line mid-word, as PDF layout does
+    for i in range(4, len(lines) - 1, 5):
+        word = lines[i + 1].split(" ", 1)
+        if len(word[0]) > 6 and word[0].isalpha():
+            lines[i] += " " + word[0][:3] + "-"
+            lines[i + 1] = word[0][3:] + (" " + word[1] if len(word) > 1 else "")
+    per_page = -(-len(lines) // pages)
+    out = []
+    for page in range(pages):
+        out.append(f"ACME Corporation    |    Careers    |    {title}")
+        out.append("")
+        out.extend("  " + line.replace(" ", "  ", 2) + "   " for line in lines[page * per_page:(page + 1) * per_page])
+        out.extend(["", "", f"Page {page + 1} of {pages}", "Confidential - ACME Corporation", "\f"])
+    return "\n".join(out)
+
+
+def _load(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(".txt"):
+                    yield from _load([os.path.join(path, name)])
+        else:
+            with open(path, encoding="utf-8") as f:
+                yield path, f.read()
+
+
+def main():
+    args = sys.argv[1:]
+    use_gemini = "--gemini" in args
+    paths = [arg for arg in args if arg != "--gemini"]
+    corpus = list(_load(paths)) if paths else [(title, _as_extracted(title, body)) for title, body in JOBS]
+
+    count = None
+    if use_gemini:
+        import google.generativeai as genai
+        genai.configure(api_key=os.environ["GOOGLE_GEMINI_API_KEY"])
+        model = genai.GenerativeModel(os.getenv("GEMINI_MODEL", "gemini-2.5-flash"))
+
+        def gemini_tokens(text):
+            return model.count_tokens(text).total_tokens
+
+        count = gemini_tokens
+
+    totals = [0, 0, 0, 0]
+    for name, text in corpus:
+        normalized = normalize_text(text).text
+        before, after = estimate_tokens(text), estimate_tokens(normalized)
+        line = f"{name[:40]:40s} {len(text):7d} -> {len(normalized):7d} chars, ~{before:5d} -> ~{after:5d} tokens"
+        totals[0] += before
+        totals[1] += after
+        if count is not None:
+            gemini_before, gemini_after = count(text), count(normalized)
+            totals[2] += gemini_before
+            totals[3] += gemini_after
+            line += f", Gemini {gemini_before:5d} -> {gemini_after:5d}"
+        print(line)
+
+    print(f"\nEstimated: {totals[0]} -> {totals[1]} tokens ({1 - totals[1] / max(totals[0], 1):.1%} fewer)")
+    if count is not None:
+        print(f"Gemini:    {totals[2]} -> {totals[3]} tokens ({1 - totals[3] / max(totals[2], 1):.1%} fewer)")
+
+
+if __name__ == "__main__":
+    main()
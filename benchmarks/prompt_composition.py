@@ -0,0 +1,49 @@
+"""Static instruction text vs user text in the Gemini prompts, without calling the model.
+
+    python benchmarks/prompt_composition.py [job_description.txt ...]
+
+For each job description (a built-in sample when none is given), prints the
+estimated input tokens of the detect_bias and improve_language prompts and how
+much of them is fixed prompt boilerplate. Live per-call numbers, from Gemini's
+usage metadata where available, are under `token_usage` in GET /stats.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.llm_service import DETECT_BIAS_PROMPT, IMPROVE_LANGUAGE_PROMPT, PromptTemplate  # noqa: E402
+from app.services.token_usage import estimate_tokens  # noqa: E402
+
+SAMPLE = (
+    "We are looking for a young, energetic rockstar developer to join our fast-paced team. "
+    "The ideal candidate is a digital native with 5+ years of Python experience, strong "
+    "communication skills and a bachelor's degree in computer science. "
+) * 4
+
+# A typical issues block handed from detect_bias to improve_language
+ISSUES_CONTEXT = "\nDetected Issues:\n" + "".join(
+    "- Type: age\n  Text: 'young, energetic'\n  Severity: high\n  Explanation: Implies an age preference.\n"
+    for _ in range(3)
+)
+
+
+def describe(template: PromptTemplate, **fields) -> str:
+    prompt = template.render(**fields)
+    static = template.static_chars
+    total_tokens = estimate_tokens(prompt)
+    static_tokens = round(total_tokens * static / len(prompt))
+    return (f"  {template.name:17s} {total_tokens:6d} input tokens, {static_tokens:6d} static "
+            f"({static_tokens / total_tokens:.0%}), {total_tokens - static_tokens:5d} user")
+
+
+def main():
+    texts = [(path, open(path, encoding="utf-8").read()) for path in sys.argv[1:]] or [("<sample>", SAMPLE)]
+    for name, text in texts:
+        print(f"{name} ({len(text)} chars)")
+        print(describe(DETECT_BIAS_PROMPT, text=text))
+        print(describe(IMPROVE_LANGUAGE_PROMPT, text=text, issues_context=ISSUES_CONTEXT))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from app.services.admission import AdmissionPool, AdmissionRejected
+
+
+@pytest.mark.asyncio
+async def test_admit_queues_beyond_concurrency_in_order():
+    pool = AdmissionPool("llm", max_concurrency=1, max_queue=2, initial_service_seconds=1.0)
+    order = []
+    release = asyncio.Event()
+
+    async def hold(name):
+        async with pool.admit():
+            order.append(name)
+            await release.wait()
+
+    tasks = [asyncio.create_task(hold(name)) for name in ("a", "b", "c")]
+    await asyncio.sleep(0.01)
+    assert order == ["a"]
+    assert pool.in_flight == 1
+    assert pool.waiting == 2
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert order == ["a", "b", "c"]
+    assert pool.in_flight == 0
+    assert pool.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_admit_rejects_when_queue_is_full():
+    pool = AdmissionPool("cpu", max_concurrency=2, max_queue=1, initial_service_seconds=4.0)
+    release = asyncio.Event()
+
+    async def hold():
+        async with pool.admit():
+            await release.wait()
+
+    tasks = [asyncio.create_task(hold()) for _ in range(3)]
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        async with pool.admit():
+            pass
+    # One waiter plus the new request, two slots, ~4s each
+    assert exc_info.value.retry_after == 4
+    assert pool.snapshot()["rejected"] == 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    pool = AdmissionPool("llm", max_concurrency=1, max_queue=1, initial_service_seconds=1.0)
+    release = asyncio.Event()
+
+    async def hold():
+        async with pool.admit():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    waiter = asyncio.create_task(hold())
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    assert pool.waiting == 0
+
+    release.set()
+    await holder
+    assert pool.in_flight == 0
+
+
+def test_retry_after_is_clamped():
+    pool = AdmissionPool("llm", max_concurrency=1, max_queue=0, initial_service_seconds=0.01, max_retry_after=30)
+    assert pool.retry_after() == 1
+    pool.avg_service_seconds = 600
+    assert pool.retry_after() == 30
@@ -0,0 +1,51 @@
+import pytest
+from app.models.schemas import BiasAnalysisResult
+from app.services.analysis_selection import AnalysisSelection
+
+
+def test_default_is_full_analysis():
+    selection = AnalysisSelection.parse()
+
+    assert selection.is_full
+    assert selection.llm_calls == ("detect_bias", "improve_language")
+
+
+def test_detect_stage_only():
+    selection = AnalysisSelection.parse(stages="detect")
+
+    assert selection.stages == {"detect"}
+    assert selection.fields == {"scores", "issues"}
+    assert selection.llm_calls == ("detect_bias",)
+    assert not selection.is_full
+
+
+def test_fields_choose_the_stages():
+    assert AnalysisSelection.parse(fields="scores").stages == {"detect"}
+    assert AnalysisSelection.parse(fields="improved_text").stages == {"improve"}
+    assert AnalysisSelection.parse(fields="scores, improved_text").stages == {"detect", "improve"}
+
+
+@pytest.mark.parametrize("stages, fields", [
+    ("summarize", None),
+    ("", None),
+    (None, "salary"),
+    ("detect", "improved_text"),
+])
+def test_invalid_selections(stages, fields):
+    with pytest.raises(ValueError):
+        AnalysisSelection.parse(stages, fields)
+
+
+def test_apply_keeps_selected_and_status_fields():
+    result = BiasAnalysisResult(
+        role="Analyst", bias_score=0.2, inclusivity_score=0.8, clarity_score=0.9,
+        issues=[], suggestions=[], seo_keywords=[]
+    )
+
+    body = AnalysisSelection.parse(fields="scores").apply(result)
+
+    assert set(body) == {
+        "role", "industry", "bias_score", "inclusivity_score", "clarity_score", "overall_assessment",
+        "partial", "partial_reason", "result_id"
+    }
+    assert body["bias_score"] == 0.2
@@ -0,0 +1,48 @@
+from app.models.schemas import BiasAnalysisResult
+from app.services.analysis_store import AnalysisStore
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _result():
+    return BiasAnalysisResult(bias_score=0.1, inclusivity_score=0.9, clarity_score=0.8,
+                              issues=[], suggestions=[], seo_keywords=[], partial=True)
+
+
+def test_save_and_get():
+    store = AnalysisStore()
+    result_id = store.save("text", {"bias_score": 0.1}, [], _result())
+
+    entry = store.get(result_id)
+
+    assert entry.text == "text"
+    assert entry.llm_bias_result == {"bias_score": 0.1}
+    assert store.get("unknown") is None
+
+
+def test_entries_expire():
+    clock = _Clock()
+    store = AnalysisStore(ttl_seconds=60, clock=clock)
+    result_id = store.save("text", {}, [], _result())
+
+    clock.now = 61
+
+    assert store.get(result_id) is None
+    assert len(store) == 0
+
+
+def test_oldest_entries_are_evicted():
+    store = AnalysisStore(max_entries=2)
+    first = store.save("one", {}, [], _result())
+    second = store.save("two", {}, [], _result())
+    third = store.save("three", {}, [], _result())
+
+    assert store.get(first) is None
+    assert store.get(second) is not None
+    assert store.get(third) is not None
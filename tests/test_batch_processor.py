@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from app.services.batch_processor import BatchProcessor, iter_ndjson
+
+
+async def _jobs(delays, tracker):
+    """Yield jobs that sleep for the given delays while tracking how many run at once"""
+    for index, delay in enumerate(delays):
+        async def job(delay=delay, index=index):
+            tracker["running"] += 1
+            tracker["peak"] = max(tracker["peak"], tracker["running"])
+            await asyncio.sleep(delay)
+            tracker["running"] -= 1
+            return index
+        yield f"item-{index}", job
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+@pytest.mark.asyncio
+async def test_run_respects_concurrency_limit():
+    processor = BatchProcessor(max_concurrency=3)
+    tracker = {"running": 0, "peak": 0}
+
+    outcomes = [outcome async for outcome in processor.run(_jobs([0.01] * 10, tracker))]
+
+    assert len(outcomes) == 10
+    assert tracker["peak"] == 3
+    assert all(outcome.error is None for outcome in outcomes)
+
+
+@pytest.mark.asyncio
+async def test_run_yields_in_completion_order():
+    processor = BatchProcessor(max_concurrency=3)
+    tracker = {"running": 0, "peak": 0}
+
+    outcomes = [outcome async for outcome in processor.run(_jobs([0.05, 0.01, 0.03], tracker))]
+
+    assert [outcome.item_id for outcome in outcomes] == ["item-1", "item-2", "item-0"]
+
+
+@pytest.mark.asyncio
+async def test_run_captures_job_errors():
+    processor = BatchProcessor(max_concurrency=2)
+
+    async def jobs():
+        async def fail():
+            raise ValueError("boom")
+        yield "bad", fail
+
+    outcomes = [outcome async for outcome in processor.run(jobs())]
+
+    assert outcomes[0].item_id == "bad"
+    assert isinstance(outcomes[0].error, ValueError)
+
+
+def test_resolve_concurrency_is_clamped():
+    processor = BatchProcessor(max_concurrency=4)
+
+    assert processor.resolve_concurrency(None) == 4
+    assert processor.resolve_concurrency(2) == 2
+    assert processor.resolve_concurrency(50) == 4
+    assert processor.resolve_concurrency(-1) == 1
+
+
+@pytest.mark.asyncio
+async def test_iter_ndjson_handles_split_chunks():
+    lines = [line async for line in iter_ndjson(_chunks(b'{"id": "a"', b'}\n\n{"id"', b': "b"}\nnot json'))]
+
+    assert lines[0] == (1, {"id": "a"})
+    assert lines[1] == (2, {"id": "b"})
+    assert lines[2][0] == 3
+    assert isinstance(lines[2][1], ValueError)
@@ -569,9 +569,13 @@
 #                 assert len(result.seo_keywords) == 2
 #                 assert result.improved_text == 'Looking for an effective leader in financial analysis'
 
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, patch
 from app.services.bias_detector import BiasDetector
+from app.services.detection_batcher import DetectionBatcher
+from app.services.near_duplicate import NearDuplicateIndex
+from app.services.boilerplate import BoilerplateLibrary
 from app.models.schemas import (
     BiasAnalysisResult, BiasIssue, Suggestion, BiasType, 
     SeverityLevel, CategoryType
@@ -1108,4 +1112,471 @@ class TestIntegration:
                 assert result.bias_score == 0.1
                 assert len(result.suggestions) == 1
                 assert len(result.seo_keywords) == 2
-                assert result.improved_text == 'Looking for an effective leader in financial analysis'
\ No newline at end of file
+                assert result.improved_text == 'Looking for an effective leader in financial analysis'
+
+class TestAnalyzeStages:
+    """Test the staged analysis used for progress events"""
+
+    @pytest.mark.asyncio
+    async def test_analyze_stages_yields_each_stage(self, bias_detector):
+        with patch.object(bias_detector.llm_service, 'detect_bias', return_value={
+            'issues': [{'type': 'gender', 'text': 'strong leader', 'severity': 'medium', 'explanation': 'Gendered'}],
+            'bias_score': '0.2',
+            'inclusivity_score': 0.8,
+            'clarity_score': 0.9,
+            'role': 'Analyst',
+            'industry': 'Finance',
+            'overall_assessment': 'Mostly fine'
+        }):
+            with patch.object(bias_detector.llm_service, 'improve_language', return_value={
+                'suggestions': [{'original': 'strong leader', 'improved': 'effective leader',
+                                 'rationale': 'Neutral', 'category': 'inclusivity'}],
+                'seo_keywords': ['analyst'],
+                'improved_text': 'Improved text'
+            }):
+                events = [event async for event in bias_detector.analyze_stages("Looking for a strong leader")]
+
+        names = [name for name, _ in events]
+        assert names == ["issues", "scores", "suggestions", "improved_text", "complete"]
+        payloads = dict(events)
+        assert len(payloads["issues"]["issues"]) == 1
+        assert payloads["scores"]["bias_score"] == 0.2
+        assert payloads["suggestions"]["seo_keywords"] == ['analyst']
+        assert payloads["complete"]["analysis"].improved_text == 'Improved text'
+        assert all(payload["stage_ms"] >= 0 for _, payload in events)
+
+
+class TestDeadline:
+    """Test improve_language is skipped or cut off when the request deadline runs out"""
+
+    DETECTION = {
+        'issues': [{'type': 'gender', 'text': 'strong leader', 'severity': 'medium', 'explanation': 'Gendered'}],
+        'bias_score': 0.2,
+        'inclusivity_score': 0.8,
+        'clarity_score': 0.9,
+        'role': 'Analyst',
+        'industry': 'Finance',
+        'overall_assessment': 'Mostly fine'
+    }
+
+    @pytest.mark.asyncio
+    async def test_partial_result_when_budget_too_small_for_improvement(self, bias_detector):
+        from app.utils.deadline import Deadline
+        bias_detector.improve_min_seconds = 10
+
+        with patch.object(bias_detector.llm_service, 'detect_bias', return_value=self.DETECTION):
+            with patch.object(bias_detector.llm_service, 'improve_language', new_callable=AsyncMock) as improve:
+                result = await bias_detector.analyze_comprehensive("Looking for a strong leader", deadline=Deadline(5))
+
+        improve.assert_not_called()
+        assert result.partial is True
+        assert result.partial_reason == "deadline"
+        assert len(result.issues) == 1
+        assert result.bias_score == 0.2
+        assert result.suggestions == []
+        assert result.improved_text is None
+
+    @pytest.mark.asyncio
+    async def test_partial_result_when_improvement_runs_past_deadline(self, bias_detector):
+        from app.utils.deadline import Deadline, DeadlineExceeded
+        bias_detector.improve_min_seconds = 0
+
+        with patch.object(bias_detector.llm_service, 'detect_bias', return_value=self.DETECTION):
+            with patch.object(bias_detector.llm_service, 'improve_language',
+                              side_effect=DeadlineExceeded("improve_language")):
+                result = await bias_detector.analyze_comprehensive("Looking for a strong leader", deadline=Deadline(30))
+
+        assert result.partial is True
+        assert result.role == 'Analyst'
+
+    @pytest.mark.asyncio
+    async def test_deadline_during_detection_is_raised(self, bias_detector):
+        from app.utils.deadline import Deadline, DeadlineExceeded
+
+        with patch.object(bias_detector.llm_service, 'detect_bias', side_effect=DeadlineExceeded("detect_bias")):
+            with pytest.raises(DeadlineExceeded):
+                await bias_detector.analyze_comprehensive("Looking for a strong leader", deadline=Deadline(30))
+
+    @pytest.mark.asyncio
+    async def test_full_result_within_budget(self, bias_detector):
+        from app.utils.deadline import Deadline
+
+        with patch.object(bias_detector.llm_service, 'detect_bias', return_value=self.DETECTION) as detect:
+            with patch.object(bias_detector.llm_service, 'improve_language', return_value={
+                'suggestions': [], 'seo_keywords': [], 'improved_text': 'Improved text'
+            }):
+                deadline = Deadline(60)
+                result = await bias_detector.analyze_comprehensive("Looking for a strong leader", deadline=deadline)
+
+        assert result.partial is False
+        assert detect.call_args.kwargs["deadline"] is deadline
+
+
+class TestPartialResults:
+    """Test partial results and retrying only the improvement stage"""
+
+    DETECTION = TestDeadline.DETECTION
+    FAILED_IMPROVEMENT = {'suggestions': [], 'seo_keywords': [], 'improved_text': 'Error generating improved text'}
+    IMPROVEMENT = {
+        'suggestions': [{'original': 'strong leader', 'improved': 'effective leader',
+                         'rationale': 'Neutral', 'category': 'inclusivity'}],
+        'seo_keywords': ['analyst'],
+        'improved_text': 'Improved text'
+    }
+
+    @pytest.mark.asyncio
+    async def test_improvement_failure_raises_without_partial_mode(self, bias_detector):
+        from app.services.bias_detector import ImprovementFailed
+
+        with patch.object(bias_detector.llm_service, 'detect_bias', return_value=self.DETECTION):
+            with patch.object(bias_detector.llm_service, 'improve_language', return_value=self.FAILED_IMPROVEMENT):
+                with pytest.raises(ImprovementFailed, match="Language improvement service failed"):
+                    await bias_detector.analyze_comprehensive("Looking for a strong leader")
+
+    @pytest.mark.asyncio
+    async def test_partial_mode_returns_detection_with_result_id(self, bias_detector):
+        with patch.object(bias_detector.llm_service, 'detect_bias', return_value=self.DETECTION):
+            with patch.object(bias_detector.llm_service, 'improve_language', return_value=self.FAILED_IMPROVEMENT):
+                result = await bias_detector.analyze_comprehensive("Looking for a strong leader", allow_partial=True)
+
+        assert result.partial is True
+        assert result.partial_reason == "improve_failed"
+        assert result.result_id
+        assert len(result.issues) == 1
+        assert bias_detector.get_analysis(result.result_id) is result
+
+    @pytest.mark.asyncio
+    async def test_complete_improvement_reuses_detection(self, bias_detector):
+        with patch.object(bias_detector.llm_service, 'detect_bias', return_value=self.DETECTION):
+            with patch.object(bias_detector.llm_service, 'improve_language', return_value=self.FAILED_IMPROVEMENT):
+                partial = await bias_detector.analyze_comprehensive("Looking for a strong leader", allow_partial=True)
+
+        with patch.object(bias_detector.llm_service, 'detect_bias', new_callable=AsyncMock) as detect:
+            with patch.object(bias_detector.llm_service, 'improve_language', return_value=self.IMPROVEMENT) as improve:
+                completed = await bias_detector.complete_improvement(partial.result_id)
+                again = await bias_detector.complete_improvement(partial.result_id)
+
+        detect.assert_not_called()
+        improve.assert_called_once()
+        assert improve.call_args.args[1][0]["text"] == "strong leader"
+        assert completed.partial is False
+        assert completed.improved_text == 'Improved text'
+        assert completed.bias_score == 0.2
+        assert completed.result_id == partial.result_id
+        assert again is completed
+        assert bias_detector.get_analysis(partial.result_id) is completed
+
+    @pytest.mark.asyncio
+    async def test_complete_improvement_unknown_id(self, bias_detector):
+        with pytest.raises(KeyError):
+            await bias_detector.complete_improvement("missing")
+
+
+class TestStageSelection:
+    """Test only the requested stages call Gemini"""
+
+    @pytest.mark.asyncio
+    async def test_detect_only_skips_improvement(self, bias_detector):
+        with patch.object(bias_detector.llm_service, 'detect_bias', return_value=TestDeadline.DETECTION):
+            with patch.object(bias_detector.llm_service, 'improve_language', new_callable=AsyncMock) as improve:
+                result = await bias_detector.analyze_comprehensive("Looking for a strong leader", stages={"detect"})
+
+        improve.assert_not_called()
+        assert result.bias_score == 0.2
+        assert len(result.issues) == 1
+        assert result.improved_text is None
+        assert result.partial is False
+
+    @pytest.mark.asyncio
+    async def test_improve_only_skips_detection(self, bias_detector):
+        with patch.object(bias_detector.llm_service, 'detect_bias', new_callable=AsyncMock) as detect:
+            with patch.object(bias_detector.llm_service, 'improve_language', return_value={
+                'suggestions': [], 'seo_keywords': ['analyst'], 'improved_text': 'Improved text'
+            }) as improve:
+                result = await bias_detector.analyze_comprehensive("Looking for a strong leader", stages={"improve"})
+
+        detect.assert_not_called()
+        assert improve.call_args.args[1] == []
+        assert result.improved_text == 'Improved text'
+        assert result.bias_score is None
+
+
+class TestIncremental:
+    """Test incremental analysis only asks Gemini about changed paragraphs"""
+
+    TEXT = "We want a rockstar developer.\n\nYou must be a digital native."
+
+    @staticmethod
+    def _detection(paragraphs, changed, deadline=None):
+        text = "\n\n".join(paragraphs[index] for index in changed)
+        issues = [
+            {'type': 'clarity', 'text': phrase, 'start_index': 0, 'end_index': 0,
+             'severity': 'medium', 'explanation': 'Jargon'}
+            for phrase in ('rockstar', 'digital native', 'ninja') if phrase in text
+        ]
+        return {'role': 'Developer', 'industry': 'Software', 'issues': issues,
+                'bias_score': 0.1 * len(issues), 'inclusivity_score': 0.8, 'clarity_score': 0.9,
+                'overall_assessment': 'Some jargon'}
+
+    @staticmethod
+    def _improvement(text, issues, deadline=None):
+        return {'suggestions': [{'original': issue['text'], 'improved': 'skilled',
+                                 'rationale': 'Plain language', 'category': 'clarity'} for issue in issues],
+                'seo_keywords': ['developer'], 'improved_text': 'Improved'}
+
+    @pytest.mark.asyncio
+    async def test_only_changed_paragraphs_are_examined(self, bias_detector):
+        with patch.object(bias_detector.llm_service, 'detect_bias_changes', side_effect=self._detection) as detect:
+            with patch.object(bias_detector.llm_service, 'improve_language',
+                              side_effect=self._improvement) as improve:
+                await bias_detector.analyze_incremental(self.TEXT)
+                edited = self.TEXT.replace("digital native", "ninja")
+                result = await bias_detector.analyze_incremental(edited)
+
+        assert detect.call_count == 2
+        # The whole posting is sent as context, with only the edited paragraph marked
+        assert detect.call_args.args == (["We want a rockstar developer.", "You must be a ninja."], {1})
+        assert improve.call_args.args[0] == "You must be a ninja."
+        assert [i.text for i in result.issues] == ['rockstar', 'ninja']
+        ninja = result.issues[1]
+        assert edited[ninja.start_index:ninja.end_index] == 'ninja'
+        assert [s.original for s in result.suggestions] == ['rockstar', 'ninja']
+        assert result.seo_keywords == ['developer']
+        assert result.improved_text is None
+
+    @pytest.mark.asyncio
+    async def test_scores_are_computed_for_the_whole_document(self, bias_detector):
+        with patch.object(bias_detector.llm_service, 'detect_bias_changes', side_effect=self._detection):
+            await bias_detector.analyze_incremental("A rockstar.", stages={"detect"})
+            result = await bias_detector.analyze_incremental("A rockstar.\n\nPlain words here.", stages={"detect"})
+
+        # One medium clarity issue over a short posting's maximum of 2.0
+        assert (result.bias_score, result.inclusivity_score, result.clarity_score) == (0.0, 1.0, 0.8)
+        assert result.role == 'Developer'
+
+    @pytest.mark.asyncio
+    async def test_unchanged_text_makes_no_calls(self, bias_detector):
+        with patch.object(bias_detector.llm_service, 'detect_bias_changes', side_effect=self._detection) as detect:
+            await bias_detector.analyze_incremental(self.TEXT, stages={"detect"})
+            await bias_detector.analyze_incremental(self.TEXT.replace(".\n\n", ".\n  \n\n"), stages={"detect"})
+
+        assert detect.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_removed_paragraph_refreshes_document_fields_only(self, bias_detector):
+        with patch.object(bias_detector.llm_service, 'detect_bias_changes', side_effect=self._detection) as detect:
+            await bias_detector.analyze_incremental(self.TEXT, stages={"detect"})
+            result = await bias_detector.analyze_incremental("We want a rockstar developer.", stages={"detect"})
+
+        assert detect.call_args.args == (["We want a rockstar developer."], set())
+        assert [i.text for i in result.issues] == ['rockstar']
+
+    @pytest.mark.asyncio
+    async def test_not_a_job_description_is_not_cached(self, bias_detector):
+        not_a_job = {'role': 'N/A', 'industry': 'N/A', 'issues': [], 'bias_score': 'N/A',
+                     'inclusivity_score': 'N/A', 'clarity_score': 'N/A',
+                     'overall_assessment': 'Not a job description'}
+        with patch.object(bias_detector.llm_service, 'detect_bias_changes', return_value=not_a_job):
+            result = await bias_detector.analyze_incremental(self.TEXT, stages={"detect"})
+
+        assert result.role == 'N/A'
+        assert len(bias_detector.segment_cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_issues_not_in_the_text_are_dropped(self, bias_detector):
+        detection = {**self._detection([self.TEXT], {0}), 'issues': [
+            {'type': 'clarity', 'text': 'guru', 'start_index': 0, 'end_index': 4,
+             'severity': 'low', 'explanation': 'Jargon'}
+        ]}
+        with patch.object(bias_detector.llm_service, 'detect_bias_changes', return_value=detection):
+            result = await bias_detector.analyze_incremental(self.TEXT, stages={"detect"})
+
+        assert result.issues == []
+
+    @pytest.mark.asyncio
+    async def test_detection_failure_is_not_cached(self, bias_detector):
+        with patch.object(bias_detector.llm_service, 'detect_bias_changes', side_effect=Exception("boom")):
+            result = await bias_detector.analyze_incremental(self.TEXT, stages={"detect"})
+
+        assert result.role == 'Unknown'
+        assert len(bias_detector.segment_cache) == 0
+
+
+class TestRuleBasedBias:
+    """Test the keyword scan used for instant live-analysis hits"""
+
+    def test_finds_keywords_with_offsets(self, bias_detector):
+        text = "We need a Salesman who is a digital native."
+
+        issues = bias_detector.detect_rule_based_bias(text)
+
+        assert [(i.text, i.type) for i in issues] == [
+            ("Salesman", BiasType.GENDER), ("digital native", BiasType.AGE)
+        ]
+        assert all(text[i.start_index:i.end_index] == i.text for i in issues)
+        assert "salesperson" in issues[0].explanation
+
+    def test_matches_whole_words_only(self, bias_detector):
+        assert bias_detector.detect_rule_based_bias("Strongly typed languages, youngest company") == []
+
+
+class TestNearDuplicateReuse:
+    """Test reposted job descriptions reuse the earlier detection"""
+
+    POSTING = ("Posted on 1 March 2024.\n\n"
+               "We are hiring a rockstar developer to build our payment platform with a small product team. "
+               "You will design services, review code, mentor colleagues and work closely with designers "
+               "and product managers on features used by millions of customers every day.")
+
+    @staticmethod
+    def _detection(text, deadline=None):
+        issues = [{'type': 'clarity', 'text': phrase, 'start_index': 0, 'end_index': 0,
+                   'severity': 'medium', 'explanation': 'Jargon'}
+                  for phrase in ('rockstar', 'ninja') if phrase in text]
+        return {'role': 'Developer', 'industry': 'Fintech', 'issues': issues, 'bias_score': 0.3,
+                'inclusivity_score': 0.7, 'clarity_score': 0.8, 'overall_assessment': 'Some jargon'}
+
+    @pytest.mark.asyncio
+    async def test_repost_sends_only_new_paragraphs(self, bias_detector):
+        bias_detector.near_duplicates = NearDuplicateIndex(capacity=10, threshold=0.6)
+        repost = "Posted on 9 April 2024, ninja welcome.\n\n" + self.POSTING.split("\n\n")[1]
+
+        def changes(paragraphs, changed, deadline=None):
+            return self._detection("\n\n".join(paragraphs[index] for index in changed))
+
+        with patch.object(bias_detector.llm_service, 'detect_bias', side_effect=self._detection) as detect:
+            with patch.object(bias_detector.llm_service, 'detect_bias_changes', side_effect=changes) as detect_changes:
+                await bias_detector.analyze_comprehensive(self.POSTING, stages={"detect"})
+                result = await bias_detector.analyze_comprehensive(repost, stages={"detect"})
+
+        assert detect.call_count == 1
+        # The whole repost is sent as context, with only the new paragraph to be checked
+        assert detect_changes.call_args.args == (repost.split("\n\n"), {0})
+        assert sorted(i.text for i in result.issues) == ['ninja', 'rockstar']
+        assert all(repost[i.start_index:i.end_index] == i.text for i in result.issues)
+        # Two medium clarity issues, recomputed with the prompt's formulas
+        assert (result.bias_score, result.clarity_score) == (0.0, 0.6)
+
+    @pytest.mark.asyncio
+    async def test_unchanged_repost_keeps_scores_and_stores_no_text(self, bias_detector):
+        bias_detector.near_duplicates = NearDuplicateIndex(capacity=10, threshold=0.6)
+
+        with patch.object(bias_detector.llm_service, 'detect_bias', side_effect=self._detection) as detect:
+            await bias_detector.analyze_comprehensive(self.POSTING, stages={"detect"})
+            result = await bias_detector.analyze_comprehensive(self.POSTING.replace("\n\n", "\n\n\n"),
+                                                               stages={"detect"})
+
+        assert detect.call_count == 1
+        assert result.bias_score == 0.3 and [i.text for i in result.issues] == ['rockstar']
+        keys, stored = bias_detector.near_duplicates.query(self.POSTING)[1]
+        assert len(keys) == 16 and 'rockstar developer' not in repr(stored)
+
+    @pytest.mark.asyncio
+    async def test_not_a_job_description_is_not_indexed(self, bias_detector):
+        bias_detector.near_duplicates = NearDuplicateIndex(capacity=10, threshold=0.6)
+        not_a_job = {'role': 'N/A', 'industry': 'N/A', 'issues': [], 'bias_score': 'N/A',
+                     'inclusivity_score': 'N/A', 'clarity_score': 'N/A', 'overall_assessment': 'Not a job description'}
+
+        with patch.object(bias_detector.llm_service, 'detect_bias', return_value=not_a_job):
+            await bias_detector.analyze_comprehensive(self.POSTING, stages={"detect"})
+
+        assert len(bias_detector.near_duplicates) == 0
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self, bias_detector):
+        assert bias_detector.near_duplicates is None
+        with patch.object(bias_detector.llm_service, 'detect_bias', side_effect=self._detection) as detect:
+            await bias_detector.analyze_comprehensive(self.POSTING, stages={"detect"})
+            await bias_detector.analyze_comprehensive(self.POSTING, stages={"detect"})
+
+        assert detect.call_count == 2
+
+
+class TestBoilerplateElision:
+    """Test known-clean boilerplate is kept out of Gemini prompts"""
+
+    EEO = ("We are an equal opportunity employer and value diversity at our company. We do not discriminate "
+           "on the basis of race, religion, color, national origin, gender, sexual orientation or age.")
+
+    @pytest.mark.asyncio
+    async def test_boilerplate_is_elided_and_reattached(self, bias_detector):
+        bias_detector.boilerplate = BoilerplateLibrary(min_documents=1, min_chars=100)
+        text = f"We need a rockstar chef.\n\n{self.EEO}"
+
+        def detection(prompt_text, deadline=None):
+            start = prompt_text.find('rockstar')
+            return {**TestDeadline.DETECTION, 'issues': [{
+                'type': 'clarity', 'text': 'rockstar', 'start_index': start, 'end_index': start + 8,
+                'severity': 'low', 'explanation': 'Jargon'
+            }]}
+
+        with patch.object(bias_detector.llm_service, 'detect_bias', side_effect=detection) as detect:
+            with patch.object(bias_detector.llm_service, 'improve_language', return_value={
+                'suggestions': [], 'seo_keywords': [], 'improved_text': 'We need a skilled chef.'
+            }) as improve:
+                await bias_detector.analyze_comprehensive(text)
+                result = await bias_detector.analyze_comprehensive(f"{self.EEO}\n\nWe need a rockstar chef.")
+
+        assert detect.call_args.args[0] == "We need a rockstar chef."
+        assert improve.call_args.args[0] == "We need a rockstar chef."
+        issue = result.issues[0]
+        assert issue.start_index == len(self.EEO) + 2 + len("We need a ")
+        # The statement opened the posting, so it opens the rewrite too
+        assert result.improved_text == f"{self.EEO}\n\nWe need a skilled chef."
+
+
+class TestNormalization:
+    """Test extracted text is normalized before prompting and offsets still fit the original"""
+
+    @pytest.mark.asyncio
+    async def test_prompt_is_normalized_and_offsets_mapped(self, bias_detector):
+        text = "We   need a   rockstar\n\n\n\nchef to lead menu develop-\nment.\nPage 1 of 1"
+
+        def detection(prompt_text, deadline=None):
+            start = prompt_text.find('rockstar')
+            return {**TestDeadline.DETECTION, 'issues': [{
+                'type': 'clarity', 'text': 'rockstar', 'start_index': start, 'end_index': start + 8,
+                'severity': 'low', 'explanation': 'Jargon'
+            }]}
+
+        with patch.object(bias_detector.llm_service, 'detect_bias', side_effect=detection) as detect:
+            result = await bias_detector.analyze_comprehensive(text, stages={"detect"})
+
+        assert detect.call_args.args[0] == "We need a rockstar\n\nchef to lead menu development."
+        issue = result.issues[0]
+        assert text[issue.start_index:issue.end_index] == "rockstar"
+
+    @pytest.mark.asyncio
+    async def test_normalization_can_be_disabled(self, bias_detector):
+        bias_detector.normalize = False
+        text = "We   need a   rockstar chef."
+
+        with patch.object(bias_detector.llm_service, 'detect_bias', return_value=TestDeadline.DETECTION) as detect:
+            await bias_detector.analyze_comprehensive(text, stages={"detect"})
+
+        assert detect.call_args.args[0] == text
+
+
+class TestBatchedDetection:
+    """Test concurrent short analyses share one detect_bias call"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_analyses_are_batched(self, bias_detector):
+        bias_detector.detection_batcher = DetectionBatcher(bias_detector.llm_service, max_items=2)
+        texts = ["We need a rockstar chef.", "We need a ninja cashier."]
+
+        async def detect_batch(batch):
+            return [{**TestDeadline.DETECTION, 'issues': [{
+                'type': 'clarity', 'text': text.split()[3], 'start_index': 10, 'end_index': 10 + len(text.split()[3]),
+                'severity': 'low', 'explanation': 'Jargon'
+            }]} for text in batch]
+
+        with patch.object(bias_detector.llm_service, 'detect_bias_batch', side_effect=detect_batch) as batch:
+            with patch.object(bias_detector.llm_service, 'detect_bias') as single:
+                results = await asyncio.gather(
+                    *(bias_detector.analyze_comprehensive(text, stages={"detect"}) for text in texts)
+                )
+
+        batch.assert_awaited_once_with(texts)
+        single.assert_not_called()
+        assert [result.issues[0].text for result in results] == ["rockstar", "ninja"]
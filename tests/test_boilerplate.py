@@ -0,0 +1,74 @@
+from app.services.boilerplate import BoilerplateLibrary
+
+EEO = ("We are an equal opportunity employer and value diversity at our company. We do not discriminate "
+       "on the basis of race, religion, color, national origin, gender, sexual orientation, age, marital "
+       "status, veteran status, or disability status.")
+
+
+def _posting(job: str) -> str:
+    return f"{job}\n\n{EEO}"
+
+
+def test_paragraph_becomes_boilerplate_after_min_documents():
+    library = BoilerplateLibrary(min_documents=2, min_chars=100)
+    library.observe(_posting("Backend engineer"), [])
+    assert library.strip(_posting("Designer")).elided == []
+
+    library.observe(_posting("Data analyst"), [])
+    stripped = library.strip(_posting("Designer wanted"))
+
+    assert stripped.text == "Designer wanted"
+    assert [segment.text for segment in stripped.elided] == [EEO]
+    assert library.snapshot()["estimated_tokens_elided"] > 50
+
+
+def test_flagged_paragraphs_are_never_elided():
+    library = BoilerplateLibrary(min_documents=1, min_chars=100)
+    library.observe(_posting("Engineer"), ["veteran status"])
+    library.observe(_posting("Engineer"), [])
+
+    assert library.strip(_posting("Designer")).elided == []
+
+
+def test_nothing_is_elided_when_only_boilerplate_is_left():
+    library = BoilerplateLibrary(min_documents=1, min_chars=100)
+    library.observe(EEO, [])
+
+    stripped = library.strip(EEO)
+
+    assert stripped.text == EEO
+    assert stripped.elided == []
+
+
+def test_offsets_and_reattach():
+    library = BoilerplateLibrary(min_documents=1, min_chars=100)
+    library.observe(EEO, [])
+    text = f"Senior chef.\n\n{EEO}\n\nMust be a rockstar."
+
+    stripped = library.strip(text)
+
+    assert stripped.text == "Senior chef.\n\nMust be a rockstar."
+    start = stripped.text.index("rockstar")
+    assert text[slice(*stripped.offsets.span_to_original(start, start + 8))] == "rockstar"
+    assert stripped.reattach("Improved posting") == f"Improved posting\n\n{EEO}"
+    assert stripped.reattach("N/A - not a job description").startswith("N/A")
+
+
+def test_reattach_puts_paragraphs_back_after_their_rewritten_neighbour():
+    library = BoilerplateLibrary(min_documents=1, min_chars=100)
+    library.observe(f"{EEO}\n\n{EEO[:-1]}!", [])
+    stripped = library.strip(f"{EEO}\n\nSenior chef for a busy bistro.\n\n{EEO[:-1]}!\n\nMust be a rockstar.")
+
+    improved = "**Senior Chef** for a busy bistro.\n\nYou bring strong kitchen skills."
+
+    assert stripped.reattach(improved) == (
+        f"{EEO}\n\n**Senior Chef** for a busy bistro.\n\n{EEO[:-1]}!\n\nYou bring strong kitchen skills."
+    )
+
+
+def test_tracked_paragraphs_are_bounded():
+    library = BoilerplateLibrary(min_chars=10, max_tracked=2)
+    for i in range(5):
+        library.observe(f"Paragraph number {i} is long enough", [])
+
+    assert library.snapshot()["tracked_paragraphs"] == 2
@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from app.services.cancellation import CancellationTracker, ClientDisconnected
+from app.services.llm_service import _call_log
+
+
+class _FakeLLMService:
+    """Stands in for LLMService: issues the two analysis calls in order"""
+
+    def __init__(self, call_delay):
+        self.call_delay = call_delay
+        self.completed = []
+        self.average_call = MagicMock(return_value={"ms": 1500.0, "tokens": 900})
+
+    async def analyze(self):
+        for call_name in ("detect_bias", "improve_language"):
+            log = _call_log.get()
+            log.started.append(call_name)
+            await asyncio.sleep(self.call_delay)
+            log.finished.append(call_name)
+            self.completed.append(call_name)
+        return "result"
+
+
+def _receive_disconnect_after(delay):
+    async def receive():
+        await asyncio.sleep(delay)
+        return {"type": "http.disconnect"}
+    return receive
+
+
+def _receive_never():
+    async def receive():
+        await asyncio.Event().wait()
+    return receive
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result_while_connected():
+    service = _FakeLLMService(call_delay=0)
+    tracker = CancellationTracker(service)
+
+    assert await tracker.run(_receive_never(), service.analyze) == "result"
+    assert tracker.snapshot()["cancelled_requests"] == 0
+
+
+@pytest.mark.asyncio
+async def test_run_cancels_pending_calls_on_disconnect():
+    service = _FakeLLMService(call_delay=0.2)
+    tracker = CancellationTracker(service)
+
+    with pytest.raises(ClientDisconnected):
+        await tracker.run(_receive_disconnect_after(0.05), service.analyze)
+
+    assert service.completed == []
+    stats = tracker.snapshot()
+    assert stats["cancelled_requests"] == 1
+    # detect_bias was in flight; improve_language was never issued
+    assert stats["llm_calls_abandoned"] == 1
+    assert stats["llm_calls_saved"] == 1
+    assert stats["llm_ms_saved"] == 1500.0
+    assert stats["estimated_tokens_saved"] == 900
+    service.average_call.assert_called_once_with("improve_language")
+
+
+@pytest.mark.asyncio
+async def test_run_propagates_work_errors():
+    tracker = CancellationTracker(_FakeLLMService(call_delay=0))
+
+    async def failing():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await tracker.run(_receive_never(), failing)
+    assert tracker.snapshot()["cancelled_requests"] == 0
@@ -0,0 +1,134 @@
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app import cli
+from app.cli import BulkAnalyzer, Progress, ResultsCheckpoint, iter_items
+from app.models.schemas import BatchResultLine, BiasAnalysisResult
+
+POSTING = "We are hiring a line cook for our busy downtown bistro. Evening and weekend shifts."
+
+
+def _result(text, stages=None):
+    return BiasAnalysisResult(role=text[:20], bias_score=0.1, issues=[], suggestions=[], seo_keywords=[])
+
+
+@pytest.fixture
+def detector():
+    detector = MagicMock()
+    detector.analyze_comprehensive = AsyncMock(side_effect=_result)
+    return detector
+
+
+def _lines(path):
+    return [json.loads(line) for line in open(path, encoding="utf-8")]
+
+
+def test_iter_items_reads_directories_and_jsonl(tmp_path):
+    (tmp_path / "docs" / "b").mkdir(parents=True)
+    (tmp_path / "docs" / "a.txt").write_text(POSTING)
+    (tmp_path / "docs" / "b" / "c.pdf").write_bytes(b"%PDF")
+    (tmp_path / "docs" / "notes.md").write_text("skipped")
+    postings = tmp_path / "postings.jsonl"
+    postings.write_text(json.dumps({"id": "p1", "text": POSTING}) + "\n\nnot json\n" + json.dumps({"id": "p2"}) + "\n")
+
+    items = list(iter_items([str(tmp_path / "docs"), str(postings)]))
+
+    assert [item.id for item in items] == ["a.txt", "b/c.pdf", "p1", "postings.jsonl:3", "postings.jsonl:4"]
+    assert items[2].text == POSTING
+    assert items[3].error == "Invalid JSON on line 3"
+    assert items[4].error == "Postings need a 'text' field"
+
+
+def test_checkpoint_drops_a_cut_off_line_and_remembers_outcomes(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text('{"id": "a", "success": true}\n{"id": "b", "success": false}\n{"id": "c", "succ')
+
+    checkpoint = ResultsCheckpoint(str(path)).open()
+    checkpoint.write(BatchResultLine(id="d", success=True))
+    checkpoint.close()
+
+    assert [line["id"] for line in _lines(path)] == ["a", "b", "d"]
+    assert checkpoint.is_done("a") and checkpoint.is_done("b") and not checkpoint.is_done("c")
+    assert not checkpoint.is_done("b", retry_failed=True)
+
+
+@pytest.mark.asyncio
+async def test_bulk_analyzer_records_results_and_errors(tmp_path, detector):
+    postings = tmp_path / "postings.jsonl"
+    postings.write_text("\n".join(json.dumps(p) for p in [
+        {"id": "ok", "text": POSTING}, {"id": "short", "text": "Cook"}
+    ]))
+    checkpoint = ResultsCheckpoint(str(tmp_path / "results.jsonl")).open()
+    analyzer = BulkAnalyzer(detector, ThreadPoolExecutor(1), checkpoint, concurrency=2, stages={"detect"})
+
+    progress = await analyzer.run(iter_items([str(postings)]), Progress(2))
+    checkpoint.close()
+
+    lines = {line["id"]: line for line in _lines(tmp_path / "results.jsonl")}
+    assert lines["ok"]["success"] and lines["ok"]["result"]["bias_score"] == 0.1
+    assert lines["short"]["error"]["status_code"] == 400
+    assert (progress.succeeded, progress.failed) == (1, 1)
+    detector.analyze_comprehensive.assert_awaited_once_with(POSTING, stages={"detect"})
+
+
+@pytest.mark.asyncio
+async def test_documents_are_extracted_in_worker_processes(tmp_path, detector):
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "cook.txt").write_text(POSTING)
+    (tmp_path / "docs" / "empty.txt").write_text("")
+    checkpoint = ResultsCheckpoint(str(tmp_path / "results.jsonl")).open()
+
+    with ProcessPoolExecutor(1) as executor:
+        await BulkAnalyzer(detector, executor, checkpoint).run(iter_items([str(tmp_path / "docs")]), Progress(2))
+    checkpoint.close()
+
+    lines = {line["id"]: line for line in _lines(tmp_path / "results.jsonl")}
+    assert lines["cook.txt"]["success"]
+    assert lines["empty.txt"]["error"] == {"message": "Empty file provided", "status_code": 400,
+                                           "type": "validation_error"}
+    assert detector.analyze_comprehensive.await_args.args[0] == POSTING
+
+
+def test_rerun_resumes_after_recorded_items(tmp_path, detector, capsys):
+    postings = tmp_path / "postings.jsonl"
+    postings.write_text("\n".join(json.dumps({"id": str(i), "text": POSTING}) for i in range(3)))
+    output = tmp_path / "results.jsonl"
+    output.write_text(json.dumps({"id": "0", "success": True}) + "\n")
+
+    with patch("app.services.bias_detector.BiasDetector", return_value=detector):
+        assert cli.main([str(postings), "-o", str(output), "--workers", "0", "--stages", "detect"]) == 0
+        assert cli.main([str(postings), "-o", str(output), "--workers", "0"]) == 0
+
+    # Lines are appended in completion order
+    ids = [line["id"] for line in _lines(output)]
+    assert ids[0] == "0" and sorted(ids) == ["0", "1", "2"]
+    assert detector.analyze_comprehensive.await_count == 2
+    assert "Analyzed 0 items" in capsys.readouterr().err
+
+
+def test_progress_estimates_time_remaining():
+    now = [0.0]
+    progress = Progress(10, clock=lambda: now[0])
+    for _ in range(4):
+        progress.record(True)
+    now[0] = 2.0
+
+    assert progress.rate() == 2.0
+    assert progress.eta_seconds() == 3.0
+    assert progress.line() == "4/10 (40%) 2.00 items/s, 0 failed, ETA 0m03s"
+
+
+def test_export_parquet_after_run(tmp_path, detector):
+    pytest.importorskip("pyarrow")
+    from app.services.result_export import read_results
+    postings = tmp_path / "postings.jsonl"
+    postings.write_text(json.dumps({"id": "cook", "text": POSTING}))
+
+    with patch("app.services.bias_detector.BiasDetector", return_value=detector):
+        cli.main([str(postings), "-o", str(tmp_path / "results.jsonl"), "--workers", "0",
+                  "--export-parquet", str(tmp_path / "export")])
+
+    assert [analysis_id for analysis_id, _ in read_results(str(tmp_path / "export"))] == ["cook"]
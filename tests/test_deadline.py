@@ -0,0 +1,65 @@
+import asyncio
+import pytest
+from app.utils.deadline import Deadline, DeadlineExceeded
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_remaining_counts_down():
+    clock = _Clock()
+    deadline = Deadline(30, clock=clock)
+
+    clock.now += 12
+    assert deadline.remaining() == 18
+    clock.now += 20
+    assert deadline.remaining() == 0
+    assert deadline.expired
+    with pytest.raises(DeadlineExceeded, match="detect_bias"):
+        deadline.check("detect_bias")
+
+
+def test_for_request_defaults_to_config(monkeypatch):
+    monkeypatch.setenv("REQUEST_DEADLINE_SECONDS", "40")
+    assert Deadline.for_request(None).seconds == 40
+
+
+def test_for_request_header_is_capped_by_config(monkeypatch):
+    monkeypatch.setenv("REQUEST_DEADLINE_SECONDS", "40")
+    assert Deadline.for_request("15").seconds == 15
+    assert Deadline.for_request("120").seconds == 40
+
+
+def test_for_request_disabled(monkeypatch):
+    monkeypatch.setenv("REQUEST_DEADLINE_SECONDS", "0")
+    assert Deadline.for_request(None) is None
+    assert Deadline.for_request("20").seconds == 20
+
+
+@pytest.mark.parametrize("value", ["soon", "0", "-5"])
+def test_for_request_rejects_invalid_header(value):
+    with pytest.raises(ValueError):
+        Deadline.for_request(value)
+
+
+@pytest.mark.asyncio
+async def test_wait_raises_when_budget_runs_out():
+    deadline = Deadline(0.05)
+
+    with pytest.raises(DeadlineExceeded) as exc_info:
+        await deadline.wait(asyncio.sleep(1), "ocr")
+
+    assert exc_info.value.stage == "ocr"
+
+
+@pytest.mark.asyncio
+async def test_wait_returns_result_within_budget():
+    async def work():
+        return "done"
+
+    assert await Deadline(1).wait(work(), "ocr") == "done"
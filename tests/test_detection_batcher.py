@@ -0,0 +1,105 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.detection_batcher import DetectionBatcher
+from app.utils.deadline import Deadline
+
+
+def _detection(text):
+    return {'role': text, 'industry': 'Retail', 'issues': [], 'bias_score': 0.0,
+            'inclusivity_score': 1.0, 'clarity_score': 1.0, 'overall_assessment': 'Fine'}
+
+
+@pytest.fixture
+def llm_service():
+    service = MagicMock()
+    service.detect_bias = AsyncMock(side_effect=lambda text, deadline=None: _detection(f"single:{text}"))
+    service.detect_bias_batch = AsyncMock(side_effect=lambda texts: [_detection(text) for text in texts])
+    return service
+
+
+@pytest.mark.asyncio
+async def test_concurrent_short_texts_share_one_call(llm_service):
+    batcher = DetectionBatcher(llm_service, max_items=3, linger_seconds=1.0)
+
+    results = await asyncio.gather(*(batcher.detect(text) for text in ("a", "b", "c")))
+
+    assert [result['role'] for result in results] == ["a", "b", "c"]
+    llm_service.detect_bias_batch.assert_awaited_once_with(["a", "b", "c"])
+    llm_service.detect_bias.assert_not_awaited()
+    assert batcher.snapshot()["batches"] == 1
+    assert batcher.snapshot()["avg_batch_size"] == 3
+
+
+@pytest.mark.asyncio
+async def test_linger_flushes_a_partial_batch(llm_service):
+    batcher = DetectionBatcher(llm_service, max_items=8, linger_seconds=0.01)
+
+    results = await asyncio.gather(batcher.detect("a"), batcher.detect("b"))
+
+    assert [result['role'] for result in results] == ["a", "b"]
+    llm_service.detect_bias_batch.assert_awaited_once_with(["a", "b"])
+
+
+@pytest.mark.asyncio
+async def test_missing_results_are_rerun_individually(llm_service):
+    llm_service.detect_bias_batch = AsyncMock(return_value=[_detection("a"), None])
+    batcher = DetectionBatcher(llm_service, max_items=2)
+
+    results = await asyncio.gather(batcher.detect("a"), batcher.detect("b"))
+
+    assert [result['role'] for result in results] == ["a", "single:b"]
+    llm_service.detect_bias.assert_awaited_once_with("b")
+    assert batcher.snapshot()["retried_texts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_token_budget_starts_a_new_batch(llm_service):
+    batcher = DetectionBatcher(llm_service, max_items=8, max_tokens=10, linger_seconds=0.01)
+
+    await asyncio.gather(*(batcher.detect(text) for text in ("x" * 20, "y" * 20, "z" * 20)))
+
+    assert [call.args[0] for call in llm_service.detect_bias_batch.await_args_list] == [["x" * 20, "y" * 20]]
+    llm_service.detect_bias.assert_awaited_once_with("z" * 20)
+
+
+@pytest.mark.asyncio
+async def test_long_texts_and_deadlines_bypass_the_batcher(llm_service):
+    batcher = DetectionBatcher(llm_service, max_chars=10)
+
+    long_result = await batcher.detect("x" * 11)
+    deadline_result = await batcher.detect("short", Deadline(30))
+
+    assert long_result['role'] == "single:" + "x" * 11
+    assert deadline_result['role'] == "single:short"
+    llm_service.detect_bias_batch.assert_not_awaited()
+    assert batcher.snapshot()["direct_texts"] == 2
+
+
+@pytest.mark.asyncio
+async def test_service_error_reaches_every_caller(llm_service):
+    llm_service.detect_bias_batch = AsyncMock(side_effect=RuntimeError("quota"))
+    batcher = DetectionBatcher(llm_service, max_items=2)
+
+    results = await asyncio.gather(batcher.detect("a"), batcher.detect("b"), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_stop_the_batch(llm_service):
+    batcher = DetectionBatcher(llm_service, max_items=8, linger_seconds=0.01)
+    first = asyncio.create_task(batcher.detect("a"))
+    second = asyncio.create_task(batcher.detect("b"))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert (await second)['role'] == "b"
+    llm_service.detect_bias_batch.assert_awaited_once_with(["a", "b"])
+
+
+def test_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("BATCH_DETECTION", raising=False)
+    assert DetectionBatcher.from_env(MagicMock()) is None
@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from app.services.hedging import Hedger
+
+
+def _warmed(hedger, call="detect_bias", latency=0.01, samples=20):
+    history = hedger._calls(call)
+    history.latencies.extend([latency] * samples)
+    history.hedged.extend([False] * samples)
+    return hedger
+
+
+def _attempts(*delays, errors=()):
+    """attempt() factory whose n-th call sleeps delays[n] and returns n (or raises if n in errors)"""
+    started = []
+
+    async def attempt():
+        index = len(started)
+        started.append(index)
+        await asyncio.sleep(delays[index])
+        if index in errors:
+            raise RuntimeError(f"attempt {index} failed")
+        return index
+
+    return attempt, started
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_history():
+    hedger = Hedger(min_samples=20)
+    attempt, started = _attempts(0.05)
+
+    assert await hedger.run("detect_bias", attempt) == 0
+    assert started == [0]
+    assert hedger.delay("detect_bias") is None
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_hedge_wins():
+    hedger = _warmed(Hedger(max_rate=0.5))
+    attempt, started = _attempts(1.0, 0.0)
+
+    assert await hedger.run("detect_bias", attempt) == 1
+
+    assert started == [0, 1]
+    stats = hedger.snapshot()["detect_bias"]
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged():
+    hedger = _warmed(Hedger(max_rate=0.5), latency=0.5)
+    attempt, started = _attempts(0.0)
+
+    assert await hedger.run("detect_bias", attempt) == 0
+    assert started == [0]
+
+
+@pytest.mark.asyncio
+async def test_failed_hedge_falls_back_to_primary():
+    hedger = _warmed(Hedger(max_rate=0.5))
+    attempt, _ = _attempts(0.05, 0.0, errors=(1,))
+
+    assert await hedger.run("detect_bias", attempt) == 0
+    assert hedger.snapshot()["detect_bias"]["hedge_wins"] == 0
+
+
+@pytest.mark.asyncio
+async def test_both_failing_raises_primary_error():
+    hedger = _warmed(Hedger(max_rate=0.5))
+    attempt, _ = _attempts(0.05, 0.0, errors=(0, 1))
+
+    with pytest.raises(RuntimeError, match="attempt 0"):
+        await hedger.run("detect_bias", attempt)
+
+
+@pytest.mark.asyncio
+async def test_hedge_rate_is_capped():
+    hedger = _warmed(Hedger(max_rate=0.05), samples=20)
+    hedger._calls("detect_bias").hedged[-1] = True  # one hedge in the last 20 calls already
+
+    attempt, started = _attempts(0.05)
+    await hedger.run("detect_bias", attempt)
+
+    assert started == [0]
+    assert hedger.snapshot()["detect_bias"]["skipped_over_rate_cap"] == 1
+
+
+def test_delay_uses_configured_percentile():
+    hedger = Hedger(percentile=90, min_samples=10)
+    hedger._calls("detect_bias").latencies.extend(i / 10 for i in range(1, 11))
+
+    assert hedger.delay("detect_bias") == pytest.approx(0.9)
@@ -0,0 +1,46 @@
+from app.services.incremental import SegmentCache, locate, split_segments
+
+
+def test_split_segments_keeps_offsets():
+    text = "  First paragraph.\n\nSecond one\nwraps here.\n \n\nThird."
+
+    segments = split_segments(text)
+
+    assert [s.text for s in segments] == ["First paragraph.", "Second one\nwraps here.", "Third."]
+    for segment in segments:
+        assert text[segment.start:segment.end] == segment.text
+
+
+def test_split_segments_ignores_blank_text():
+    assert split_segments(" \n\n \n") == []
+
+
+def test_fingerprint_ignores_whitespace_only():
+    rewrapped, edited = split_segments("Strong leader\nwanted.\n\nStrong leader wanted!")
+
+    assert rewrapped.fingerprint == split_segments("Strong leader wanted.")[0].fingerprint
+    assert rewrapped.fingerprint != edited.fingerprint
+
+
+def test_locate_is_case_insensitive():
+    segments = split_segments("We need a rockstar.\n\nMust be a Digital Native.")
+
+    segment, index = locate(segments, "digital native")
+
+    assert segment is segments[1]
+    assert segment.text[index:index + len("digital native")] == "Digital Native"
+    assert locate(segments, "ninja") is None
+    assert locate(segments, "  ") is None
+
+
+def test_segment_cache_evicts_least_recently_used():
+    cache = SegmentCache(max_entries=2)
+    cache.put("detect", "a", {"n": 1})
+    cache.put("detect", "b", {"n": 2})
+    cache.get("detect", "a")
+    cache.put("detect", "c", {"n": 3})
+
+    assert cache.get("detect", "b") is None
+    assert cache.get("detect", "a") == {"n": 1}
+    assert cache.get("improve", "a") is None
+    assert len(cache) == 2
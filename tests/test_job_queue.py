@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.services.job_queue import JobQueue, JobWorkerPool, RecordingWebhookNotifier, validate_callback_url
+from app.models.schemas import BiasAnalysisResult
+
+
+@pytest.fixture
+def queue(tmp_path):
+    job_queue = JobQueue(str(tmp_path / "jobs.db"), max_attempts=2)
+    yield job_queue
+    job_queue.close()
+
+
+def _result():
+    return BiasAnalysisResult(
+        bias_score=0.1, inclusivity_score=0.9, clarity_score=1.0,
+        issues=[], suggestions=[], seo_keywords=[]
+    )
+
+
+def test_claim_next_is_fifo_and_marks_running(queue):
+    first = queue.submit(text="first job")
+    queue.submit(text="second job")
+
+    claimed = queue.claim_next()
+
+    assert claimed["id"] == first["id"]
+    assert claimed["status"] == "running"
+    assert queue.get(first["id"])["attempts"] == 1
+    assert queue.depth() == 1
+
+
+def test_jobs_survive_reopen_and_running_jobs_are_requeued(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    queue = JobQueue(db_path)
+    job = queue.submit(text="interrupted job")
+    queue.claim_next()
+    queue.close()
+
+    # Simulate a worker restart against the same database
+    reopened = JobQueue(db_path)
+    assert reopened.get(job["id"])["status"] == "running"
+    assert reopened.recover() == 1
+    assert reopened.get(job["id"])["status"] == "queued"
+    reopened.close()
+
+
+def test_recover_gives_up_after_max_attempts(queue):
+    job = queue.submit(text="crashes the worker")
+    queue.claim_next()
+    queue.recover()
+    queue.claim_next()
+
+    queue.recover()
+
+    stored = queue.get(job["id"])
+    assert stored["status"] == "failed"
+    assert "abandoned after 2 attempts" in stored["error_message"]
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_completes_jobs_and_sends_webhooks(queue):
+    notifier = RecordingWebhookNotifier()
+
+    async def handler(job):
+        if job["text"] == "bad":
+            raise HTTPException(status_code=400, detail="Job description text must be at least 50 characters long")
+        return _result()
+
+    pool = JobWorkerPool(queue, handler, workers=2, notifier=notifier, poll_interval=0.01)
+    ok = queue.submit(text="good", callback_url="http://hooks.local/ok")
+    bad = queue.submit(text="bad", callback_url="http://hooks.local/bad")
+    pool.start()
+    try:
+        for _ in range(100):
+            if len(notifier.deliveries) == 2:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await pool.stop()
+
+    assert queue.get(ok["id"])["status"] == "completed"
+    assert BiasAnalysisResult.model_validate_json(queue.get(ok["id"])["result"]).bias_score == 0.1
+    failed = queue.get(bad["id"])
+    assert failed["status"] == "failed"
+    assert failed["error_status"] == 400
+
+    payloads = {delivery["url"]: delivery["payload"] for delivery in notifier.deliveries}
+    assert payloads["http://hooks.local/ok"]["status"] == "completed"
+    assert payloads["http://hooks.local/bad"]["error"]["status_code"] == 400
+
+
+def test_callback_urls_must_resolve_to_public_addresses(monkeypatch):
+    resolved = {"hooks.example.com": "93.184.216.34", "intranet.example.com": "192.168.1.20"}
+    monkeypatch.setattr("socket.getaddrinfo", lambda host, port, proto=0: [(2, 1, 6, "", (resolved[host], port))])
+
+    validate_callback_url("https://hooks.example.com/done")
+    with pytest.raises(ValueError, match="not a public address"):
+        validate_callback_url("https://intranet.example.com/done")
+    with pytest.raises(ValueError, match="http or https"):
+        validate_callback_url("file:///etc/passwd")
+
+
+def test_allowlisted_callback_hosts_skip_the_address_check():
+    validate_callback_url("http://hooks.internal:9000/done", allowed_hosts=["hooks.internal"])
+    with pytest.raises(ValueError, match="not allowed"):
+        validate_callback_url("http://93.184.216.34/done", allowed_hosts=["hooks.internal"])
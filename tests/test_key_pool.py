@@ -0,0 +1,145 @@
+import asyncio
+import time
+from unittest.mock import patch
+import pytest
+from google.api_core import exceptions as google_exceptions
+from app.services.key_pool import ApiKey, ApiKeyPool, KeyPoolExhausted, _keyed_model
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _SlowModel:
+    def __init__(self, delay=0.05, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def generate_content(self, contents, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return f"response to {contents}"
+
+
+def _pool(labels, clock=None, rpm=None, models=None):
+    models = models if models is not None else {label: _SlowModel() for label in labels}
+    keys = [ApiKey(label, f"secret-{label}", rpm) for label in labels]
+    return ApiKeyPool(
+        keys,
+        eject_seconds=60,
+        auth_eject_seconds=600,
+        model_factory=lambda model_name, api_key: models[api_key.replace("secret-", "")],
+        clock=clock or _Clock()
+    ), models
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_spread_evenly_over_keys():
+    pool, models = _pool(["a", "b", "c"])
+
+    results = await asyncio.gather(*(pool.generate("gemini-2.5-flash", f"prompt {i}") for i in range(6)))
+
+    assert len(results) == 6
+    assert [model.calls for model in models.values()] == [2, 2, 2]
+    assert all(key.in_flight == 0 for key in pool.keys)
+
+
+@pytest.mark.asyncio
+async def test_quota_error_ejects_key_and_fails_over():
+    clock = _Clock()
+    models = {"a": _SlowModel(0, google_exceptions.ResourceExhausted("quota exceeded")), "b": _SlowModel(0)}
+    pool, _ = _pool(["a", "b"], clock=clock, models=models)
+
+    assert await pool.generate("gemini-2.5-flash", "p") == "response to p"
+    await pool.generate("gemini-2.5-flash", "q")
+
+    assert models["a"].calls == 1
+    assert models["b"].calls == 2
+    assert pool.snapshot()["a"]["healthy"] is False
+
+    clock.now += 61
+    assert pool.snapshot()["a"]["healthy"] is True
+
+
+@pytest.mark.asyncio
+async def test_auth_error_ejects_key_for_longer():
+    clock = _Clock()
+    models = {"a": _SlowModel(0, google_exceptions.PermissionDenied("API key not valid")), "b": _SlowModel(0)}
+    pool, _ = _pool(["a", "b"], clock=clock, models=models)
+
+    await pool.generate("gemini-2.5-flash", "p")
+
+    assert pool.snapshot()["a"]["ejected_for_seconds"] == 600
+
+
+@pytest.mark.asyncio
+async def test_other_errors_do_not_eject():
+    models = {"a": _SlowModel(0, RuntimeError("503 overloaded"))}
+    pool, _ = _pool(["a"], models=models)
+
+    with pytest.raises(RuntimeError):
+        await pool.generate("gemini-2.5-flash", "p")
+
+    assert pool.snapshot()["a"]["healthy"] is True
+
+
+@pytest.mark.asyncio
+async def test_quota_error_on_every_key_is_raised():
+    error = google_exceptions.ResourceExhausted("quota exceeded")
+    pool, _ = _pool(["a", "b"], models={"a": _SlowModel(0, error), "b": _SlowModel(0, error)})
+
+    with pytest.raises(google_exceptions.ResourceExhausted):
+        await pool.generate("gemini-2.5-flash", "p")
+    with pytest.raises(KeyPoolExhausted, match="quota"):
+        await pool.generate("gemini-2.5-flash", "p")
+
+
+@pytest.mark.asyncio
+async def test_capacity_grows_with_each_rate_limited_key():
+    clock = _Clock()
+    pool, _ = _pool(["a", "b", "c"], clock=clock, rpm=2, models={label: _SlowModel(0) for label in "abc"})
+
+    for i in range(6):
+        await pool.generate("gemini-2.5-flash", str(i))
+    with pytest.raises(KeyPoolExhausted):
+        await pool.generate("gemini-2.5-flash", "one too many")
+
+    clock.now += 60
+    await pool.generate("gemini-2.5-flash", "next minute")
+
+
+def test_from_env_parses_labels(monkeypatch):
+    monkeypatch.setenv("GOOGLE_GEMINI_API_KEYS", "project-a=AIzaA, AIzaB")
+    monkeypatch.setenv("GEMINI_KEY_RPM", "15")
+
+    pool = ApiKeyPool.from_env()
+
+    assert [(key.label, key.key, key.requests_per_minute) for key in pool.keys] == [
+        ("project-a", "AIzaA", 15), ("key1", "AIzaB", 15)
+    ]
+
+
+def test_from_env_without_keys(monkeypatch):
+    monkeypatch.delenv("GOOGLE_GEMINI_API_KEYS", raising=False)
+    assert ApiKeyPool.from_env() is None
+
+
+def test_keyed_model_calls_go_through_its_own_client():
+    """Fails if the pinned SDK stops using GenerativeModel._client"""
+    from google.ai import generativelanguage as glm
+    model = _keyed_model("gemini-2.5-flash", "secret-a")
+    response = glm.GenerateContentResponse(candidates=[
+        glm.Candidate(content=glm.Content(parts=[glm.Part(text="ok")], role="model"), finish_reason=1)
+    ])
+
+    assert isinstance(model._client, glm.GenerativeServiceClient)
+    with patch.object(model._client, "generate_content", return_value=response) as generate:
+        assert model.generate_content("hello").text == "ok"
+    generate.assert_called_once()
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from app.services.live_analysis import LiveAnalysisHub
+
+
+class _Editor:
+    """Collects messages sent to one connection and records analyzed texts"""
+
+    def __init__(self, analysis_seconds: float = 0.0):
+        self.messages = []
+        self.analyzed = []
+        self.analysis_seconds = analysis_seconds
+
+    async def send(self, message):
+        self.messages.append(message)
+
+    async def analyze(self, text):
+        await asyncio.sleep(self.analysis_seconds)
+        self.analyzed.append(text)
+        return {"type": "analysis", "analysis": {"length": len(text)}}
+
+    @staticmethod
+    def rules(text):
+        return [word for word in text.split() if word == "rockstar"]
+
+    def of_type(self, kind):
+        return [m for m in self.messages if m["type"] == kind]
+
+
+def _open(hub, editor):
+    return hub.open(editor.send, editor.analyze, editor.rules)
+
+
+@pytest.mark.asyncio
+async def test_rules_are_sent_for_every_revision_and_bursts_coalesce():
+    hub = LiveAnalysisHub(debounce_seconds=0.05)
+    editor = _Editor()
+    session = _open(hub, editor)
+
+    for text in ("a rockstar", "a rockstar dev", "a rockstar developer"):
+        await session.submit(text)
+    await asyncio.sleep(0.15)
+
+    assert [m["revision"] for m in editor.of_type("rules")] == [1, 2, 3]
+    assert editor.of_type("rules")[0]["issues"] == ["rockstar"]
+    assert editor.analyzed == ["a rockstar developer"]
+    assert editor.of_type("analysis")[0]["revision"] == 3
+    assert hub.revisions == {"coalesced": 2, "analyzed": 1}
+    assert hub.buffered_bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_new_revision_cancels_analysis_in_flight():
+    hub = LiveAnalysisHub(debounce_seconds=0.0)
+    editor = _Editor(analysis_seconds=0.2)
+    session = _open(hub, editor)
+
+    await session.submit("first", revision=10)
+    await asyncio.sleep(0.05)
+    await session.submit("second", revision=11)
+    await asyncio.sleep(0.3)
+
+    assert editor.analyzed == ["second"]
+    assert [m["revision"] for m in editor.of_type("analysis")] == [11]
+    assert hub.revisions["superseded"] == 1
+
+
+@pytest.mark.asyncio
+async def test_buffered_bytes_track_the_pending_revision():
+    hub = LiveAnalysisHub(debounce_seconds=10)
+    session = _open(hub, _Editor())
+
+    await session.submit("héllo")
+
+    assert hub.snapshot()["buffered_bytes"] == 6
+    assert hub.snapshot()["max_connection_bytes"] == 6
+    session.close()
+    assert hub.snapshot()["buffered_bytes"] == 0
+    assert hub.snapshot()["connections"] == 0
+
+
+@pytest.mark.asyncio
+async def test_oversized_documents_are_rejected():
+    hub = LiveAnalysisHub(max_document_chars=5)
+    session = _open(hub, _Editor())
+
+    with pytest.raises(ValueError):
+        await session.submit("too long")
+
+    assert hub.revisions == {"rejected": 1}
+    assert hub.buffered_bytes == 0
+
+
+def test_connection_limit():
+    hub = LiveAnalysisHub(max_connections=1)
+    editor = _Editor()
+
+    first = _open(hub, editor)
+
+    assert first is not None
+    assert _open(hub, editor) is None
+    assert hub.snapshot()["rejected_connections"] == 1
+    first.close()
+    assert _open(hub, editor) is not None
@@ -0,0 +1,59 @@
+import json
+import logging
+import queue
+from app.utils.logging_config import JsonFormatter, NonBlockingQueueHandler, PayloadSampler, Truncated
+
+
+def _record(msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord("app.test", logging.INFO, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+def test_truncated_caps_long_payloads():
+    assert str(Truncated("short", limit=10)) == "short"
+    assert str(Truncated("x" * 25, limit=10)) == "xxxxxxxxxx... [15 more chars]"
+
+
+def test_sampler_only_drops_sampled_records():
+    sampler = PayloadSampler(rate=0.0)
+    assert sampler.filter(_record()) is True
+    assert sampler.filter(_record(sampled=True)) is False
+    assert PayloadSampler(rate=1.0).filter(_record(sampled=True)) is True
+
+
+def test_queue_handler_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+
+    handler.handle(_record())
+    handler.handle(_record())
+
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+
+
+def test_queue_handler_defers_message_rendering():
+    rendered = []
+
+    class Payload:
+        def __str__(self):
+            rendered.append(True)
+            return "payload"
+
+    handler = NonBlockingQueueHandler(queue.Queue())
+    handler.handle(_record(args=(Payload(),)))
+
+    assert rendered == []
+    assert handler.queue.get_nowait().getMessage() == "hello payload"
+
+
+def test_json_formatter_merges_fields():
+    line = JsonFormatter().format(_record(fields={"bytes": 1024, "filename": "job.pdf"}))
+    entry = json.loads(line)
+
+    assert entry["message"] == "hello world"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "app.test"
+    assert entry["bytes"] == 1024
+    assert entry["filename"] == "job.pdf"
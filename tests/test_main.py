@@ -7,10 +7,12 @@ import io
 import os
 import json
 from app.models.schemas import TextExtractionResponse, BiasAnalysisResult, BiasIssue, Suggestion, BiasType, SeverityLevel, CategoryType
+from app.services.admission import AdmissionPool
 
 @pytest.fixture
-def client():
-    """Create a test client for the FastAPI app"""
+def client(tmp_path, monkeypatch):
+    """Create a test client for the FastAPI app, with its job database in tmp_path"""
+    monkeypatch.setenv("JOB_DB_PATH", str(tmp_path / "jobs.db"))
     with TestClient(app) as test_client:
         yield test_client
 
@@ -45,6 +47,15 @@ def test_health_check(client):
         "service": "python-llm-bias-detector"
     }
 
+def test_stats_reports_cancellation_savings(client):
+    """Test /stats exposes the disconnect cancellation counters"""
+    response = client.get("/stats")
+    assert response.status_code == 200
+    assert set(response.json()["cancellation"]) == {
+        "cancelled_requests", "llm_calls_saved", "llm_ms_saved",
+        "estimated_tokens_saved", "llm_calls_abandoned"
+    }
+
 # Test /extract endpoint
 def test_extract_no_file(client):
     """Test /extract endpoint with no file"""
@@ -723,4 +734,492 @@ def test_analyze_file_with_language_service_error(client, mock_text_extractor, m
     assert error_data["error"] == True
     assert "Language improvement service is temporarily unavailable" in error_data["message"]
     assert error_data["status_code"] == 503
-    assert error_data["type"] == "service_unavailable"
\ No newline at end of file
+    assert error_data["type"] == "service_unavailable"
+
+# Test /analyze-batch endpoints
+BATCH_TEXT = "We are looking for a software developer who can work independently and lead our team to success."
+
+def _batch_lines(response):
+    return [json.loads(line) for line in response.text.splitlines() if line.strip()]
+
+def _simple_result():
+    return BiasAnalysisResult(
+        role="Software Developer",
+        industry="Technology",
+        bias_score=0.1,
+        inclusivity_score=0.9,
+        clarity_score=0.9,
+        issues=[],
+        suggestions=[],
+        seo_keywords=[],
+        improved_text="Improved text here...",
+        overall_assessment="Analysis complete."
+    )
+
+def test_analyze_batch_json_body(client, mock_bias_detector):
+    """Test batch analysis streams one NDJSON line per item tagged with its ID"""
+    mock_bias_detector.analyze_comprehensive = AsyncMock(return_value=_simple_result())
+
+    response = client.post("/analyze-batch", json={"items": [
+        {"id": "job-1", "text": BATCH_TEXT},
+        {"id": "job-2", "text": BATCH_TEXT},
+    ]})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = _batch_lines(response)
+    assert {line["id"] for line in lines} == {"job-1", "job-2"}
+    assert all(line["success"] for line in lines)
+    assert lines[0]["result"]["role"] == "Software Developer"
+
+def test_analyze_batch_item_errors(client, mock_bias_detector):
+    """Test per-item failures become error lines instead of failing the batch"""
+    mock_bias_detector.analyze_comprehensive = AsyncMock(
+        side_effect=Exception("Language improvement service failed")
+    )
+
+    response = client.post("/analyze-batch", json={"items": [
+        {"id": "short", "text": "Too short"},
+        {"id": "llm-down", "text": BATCH_TEXT},
+    ]})
+
+    assert response.status_code == 200
+    lines = {line["id"]: line for line in _batch_lines(response)}
+    assert lines["short"]["success"] is False
+    assert lines["short"]["error"]["type"] == "validation_error"
+    assert lines["llm-down"]["error"]["status_code"] == 503
+    assert lines["llm-down"]["error"]["type"] == "service_unavailable"
+
+@pytest.mark.asyncio
+async def test_analyze_batch_ndjson_body(mock_bias_detector):
+    """Test NDJSON request bodies stream through without deadlocking, including a malformed line"""
+    import asyncio
+    import httpx
+
+    mock_bias_detector.analyze_comprehensive = AsyncMock(return_value=_simple_result())
+    body = "\n".join([
+        json.dumps({"id": "a", "text": BATCH_TEXT}),
+        "{not json",
+        json.dumps({"id": "b", "text": BATCH_TEXT}),
+    ])
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as async_client:
+        response = await asyncio.wait_for(
+            async_client.post("/analyze-batch", content=body, headers={"Content-Type": "application/x-ndjson"}),
+            timeout=10
+        )
+
+    assert response.status_code == 200
+    lines = {line["id"]: line for line in _batch_lines(response)}
+    assert lines["a"]["success"] is True
+    assert lines["b"]["success"] is True
+    assert lines["2"]["success"] is False
+    assert "Invalid JSON on line 2" in lines["2"]["error"]["message"]
+
+def test_analyze_batch_invalid_body(client):
+    """Test a JSON body without an items list is rejected"""
+    response = client.post("/analyze-batch", json={"text": BATCH_TEXT})
+    assert response.status_code == 400
+    assert response.json()["type"] == "validation_error"
+
+def test_analyze_batch_json_item_limit(client):
+    """Test oversized JSON batches are pointed at the NDJSON form"""
+    with patch('app.main.BATCH_MAX_JSON_ITEMS', 1):
+        response = client.post("/analyze-batch", json={"items": [
+            {"id": "1", "text": BATCH_TEXT},
+            {"id": "2", "text": BATCH_TEXT},
+        ]})
+    assert response.status_code == 413
+    assert "NDJSON" in response.json()["message"]
+
+def test_analyze_batch_files(client, mock_text_extractor, mock_bias_detector):
+    """Test batch file analysis tags results with the file names"""
+    mock_text_extractor.extract_from_content = AsyncMock(return_value=TextExtractionResponse(
+        success=True,
+        extracted_text=BATCH_TEXT,
+        file_type="txt"
+    ))
+    mock_bias_detector.analyze_comprehensive = AsyncMock(return_value=_simple_result())
+
+    files = [
+        ('files', ('first.txt', BATCH_TEXT.encode(), 'text/plain')),
+        ('files', ('empty.txt', b'', 'text/plain')),
+    ]
+    response = client.post("/analyze-batch-files", files=files)
+
+    assert response.status_code == 200
+    lines = {line["id"]: line for line in _batch_lines(response)}
+    assert lines["first.txt"]["success"] is True
+    assert lines["empty.txt"]["success"] is False
+    assert "Empty file provided" in lines["empty.txt"]["error"]["message"]
+
+# Test /jobs endpoints
+def _wait_for_job(client, job_id):
+    import time
+    for _ in range(200):
+        status = client.get(f"/jobs/{job_id}").json()
+        if status["status"] in ("completed", "failed"):
+            return status
+        time.sleep(0.01)
+    return status
+
+def test_job_submit_poll_and_result(client, mock_bias_detector):
+    """Test a queued analysis runs in the background and its result can be fetched"""
+    mock_bias_detector.analyze_comprehensive = AsyncMock(return_value=_simple_result())
+
+    response = client.post("/jobs", json={"text": BATCH_TEXT})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.json()["status"] == "queued"
+
+    assert _wait_for_job(client, job_id)["status"] == "completed"
+    result = client.get(f"/jobs/{job_id}/result")
+    assert result.status_code == 200
+    assert result.json()["role"] == "Software Developer"
+
+def test_job_failure_is_reported(client, mock_bias_detector):
+    """Test a failed analysis keeps its status code and error type"""
+    mock_bias_detector.analyze_comprehensive = AsyncMock(
+        side_effect=Exception("Language improvement service failed")
+    )
+
+    job_id = client.post("/jobs", json={"text": BATCH_TEXT}).json()["job_id"]
+
+    status = _wait_for_job(client, job_id)
+    assert status["status"] == "failed"
+    assert status["error"]["type"] == "service_unavailable"
+    assert client.get(f"/jobs/{job_id}/result").status_code == 503
+
+def test_job_file_submission(client, mock_text_extractor, mock_bias_detector):
+    """Test uploaded files are extracted by the worker"""
+    mock_text_extractor.extract_from_content = AsyncMock(return_value=TextExtractionResponse(
+        success=True,
+        extracted_text=BATCH_TEXT,
+        file_type="txt"
+    ))
+    mock_bias_detector.analyze_comprehensive = AsyncMock(return_value=_simple_result())
+
+    response = client.post("/jobs/file", files={'file': ('job.txt', BATCH_TEXT.encode(), 'text/plain')})
+    assert response.status_code == 202
+
+    assert _wait_for_job(client, response.json()["job_id"])["status"] == "completed"
+    mock_text_extractor.extract_from_content.assert_called_once()
+
+@pytest.mark.parametrize("callback_url", [
+    "ftp://93.184.216.34/hook", "http://127.0.0.1:8000/hook", "http://10.0.0.5/hook",
+    "http://169.254.169.254/latest/meta-data", "http://[::1]/hook"
+])
+def test_job_callback_must_be_a_public_http_url(client, callback_url):
+    response = client.post("/jobs", json={"text": BATCH_TEXT, "callback_url": callback_url})
+
+    assert response.status_code == 400
+    assert "callback_url" in response.json()["message"]
+
+def test_job_file_callback_outside_allowlist_is_rejected(client, monkeypatch):
+    monkeypatch.setenv("WEBHOOK_ALLOWED_HOSTS", "hooks.internal")
+    files = {'file': ('job.txt', BATCH_TEXT.encode(), 'text/plain')}
+
+    response = client.post("/jobs/file", files=files, data={"callback_url": "http://93.184.216.34/hook"})
+
+    assert response.status_code == 400
+    assert "not allowed" in response.json()["message"]
+
+def test_importing_the_app_creates_no_job_database():
+    import subprocess
+    import sys
+    import tempfile
+    with tempfile.TemporaryDirectory() as cwd:
+        subprocess.run([sys.executable, "-c", "import app.main"], cwd=cwd, check=True,
+                       env={**os.environ, "PYTHONPATH": os.getcwd() + os.pathsep + os.environ.get("PYTHONPATH", "")})
+        assert os.listdir(cwd) == []
+
+def test_job_short_text_and_unknown_job(client):
+    """Test validation happens at submit time and unknown jobs are 404"""
+    assert client.post("/jobs", json={"text": "Too short"}).status_code == 400
+    response = client.get("/jobs/does-not-exist")
+    assert response.status_code == 404
+    assert response.json()["type"] == "not_found_error"
+
+# Test /analyze-file/stream (server-sent events)
+def _sse_events(response):
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+async def _fake_stages(text):
+    result = _simple_result()
+    yield "issues", {"issues": [], "stage_ms": 1.0}
+    yield "scores", {"bias_score": 0.1, "stage_ms": 0.1}
+    yield "suggestions", {"suggestions": [], "seo_keywords": [], "stage_ms": 2.0}
+    yield "improved_text", {"improved_text": result.improved_text, "stage_ms": 0.1}
+    yield "complete", {"analysis": result, "stage_ms": 0.0}
+
+def test_analyze_file_stream_emits_stages(client, mock_text_extractor, mock_bias_detector):
+    """Test the SSE variant emits every stage in order with timings"""
+    mock_text_extractor.extract_from_content = AsyncMock(return_value=TextExtractionResponse(
+        success=True,
+        extracted_text=BATCH_TEXT,
+        file_type="txt"
+    ))
+    mock_bias_detector.analyze_stages = _fake_stages
+
+    response = client.post("/analyze-file/stream", files={'file': ('job.txt', BATCH_TEXT.encode(), 'text/plain')})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _sse_events(response)
+    assert [name for name, _ in events] == [
+        "upload", "extracted", "issues", "scores", "suggestions", "improved_text", "complete"
+    ]
+    assert events[1][1]["text_length"] == len(BATCH_TEXT)
+    assert all("stage_ms" in payload and "total_ms" in payload for _, payload in events)
+    assert events[-1][1]["analysis"]["role"] == "Software Developer"
+    assert events[-1][1]["extracted_text"] == BATCH_TEXT
+
+def test_analyze_file_stream_extraction_error(client, mock_text_extractor):
+    """Test extraction failures are reported as an error event"""
+    mock_text_extractor.extract_from_content = AsyncMock(return_value=TextExtractionResponse(
+        success=False,
+        error_message="Unsupported file type: xyz"
+    ))
+
+    response = client.post("/analyze-file/stream", files={'file': ('job.xyz', b'content', 'text/plain')})
+
+    events = _sse_events(response)
+    assert [name for name, _ in events] == ["upload", "error"]
+    assert events[1][1]["type"] == "validation_error"
+
+def test_analyze_file_stream_empty_upload(client):
+    """Test upload validation still returns a plain HTTP error"""
+    response = client.post("/analyze-file/stream", files={'file': ('job.txt', b'', 'text/plain')})
+    assert response.status_code == 400
+
+# Test admission control
+def test_analyze_sheds_load_with_retry_after(client, mock_bias_detector):
+    """Test a full LLM pool rejects /analyze with 503 and Retry-After"""
+    full_pool = AdmissionPool("llm", max_concurrency=1, max_queue=0, initial_service_seconds=7.0)
+    full_pool.in_flight = 1
+
+    with patch('app.main.llm_admission', full_pool):
+        response = client.post("/analyze", json={"text": BATCH_TEXT})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+    assert response.json()["type"] == "service_unavailable"
+    mock_bias_detector.analyze_comprehensive.assert_not_called()
+
+def test_extract_sheds_load_when_cpu_pool_is_full(client, mock_text_extractor):
+    """Test /extract is rejected before extraction when the CPU pool is full"""
+    full_pool = AdmissionPool("cpu", max_concurrency=1, max_queue=0, initial_service_seconds=2.0)
+    full_pool.in_flight = 1
+
+    with patch('app.main.cpu_admission', full_pool):
+        response = client.post("/extract", files={'file': ('job.txt', b'content', 'text/plain')})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+    mock_text_extractor.extract_from_content.assert_not_called()
+
+# Test /metrics
+def test_metrics_exposes_request_and_stage_metrics(client, mock_text_extractor):
+    """Test /metrics reports per-route request counts and stage histograms"""
+    mock_text_extractor.extract_from_content = AsyncMock(return_value=TextExtractionResponse(
+        success=True,
+        extracted_text=BATCH_TEXT,
+        file_type="txt"
+    ))
+    client.post("/extract", files={'file': ('job.txt', BATCH_TEXT.encode(), 'text/plain')})
+    client.get("/jobs/does-not-exist")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_requests_total{method="POST",path="/extract",status="200"}' in body
+    # Route templates keep path parameters out of the labels
+    assert 'http_requests_total{method="GET",path="/jobs/{job_id}",status="404"}' in body
+    assert 'analysis_stage_duration_seconds_count{stage="upload_read"}' in body
+    assert 'queue_depth{queue="jobs"}' in body
+    assert "llm_calls_in_flight" in body
+
+# Test request deadlines
+def test_analyze_rejects_invalid_timeout_header(client, mock_bias_detector):
+    """Test a malformed X-Request-Timeout header is a validation error"""
+    response = client.post("/analyze", json={"text": BATCH_TEXT}, headers={"X-Request-Timeout": "soon"})
+
+    assert response.status_code == 400
+    mock_bias_detector.analyze_comprehensive.assert_not_called()
+
+def test_analyze_passes_deadline_and_maps_expiry_to_504(client, mock_bias_detector):
+    """Test the header deadline reaches the detector and running out is a 504"""
+    from app.utils.deadline import DeadlineExceeded
+    mock_bias_detector.analyze_comprehensive = AsyncMock(side_effect=DeadlineExceeded("detect_bias"))
+
+    response = client.post("/analyze", json={"text": BATCH_TEXT}, headers={"X-Request-Timeout": "20"})
+
+    assert response.status_code == 504
+    assert "detect_bias" in response.json()["message"]
+    deadline = mock_bias_detector.analyze_comprehensive.call_args.kwargs["deadline"]
+    assert 0 < deadline.remaining() <= 20
+
+def test_analyze_file_returns_partial_result(client, mock_text_extractor, mock_bias_detector):
+    """Test a deadline-limited analysis is returned with the partial flag"""
+    mock_text_extractor.extract_from_content = AsyncMock(return_value=TextExtractionResponse(
+        success=True,
+        extracted_text=BATCH_TEXT,
+        file_type="txt"
+    ))
+    partial = _simple_result()
+    partial.partial = True
+    partial.partial_reason = "deadline"
+    mock_bias_detector.analyze_comprehensive = AsyncMock(return_value=partial)
+
+    response = client.post("/analyze-file", files={'file': ('job.txt', BATCH_TEXT.encode(), 'text/plain')})
+
+    assert response.status_code == 200
+    assert response.json()["analysis"]["partial"] is True
+    assert mock_text_extractor.extract_from_content.call_args.kwargs["deadline"] is not None
+
+# Test partial results and improvement retries
+def test_analyze_partial_mode_is_passed_to_detector(client, mock_bias_detector):
+    """Test ?partial=true asks the detector for a partial result on improvement failure"""
+    partial = _simple_result()
+    partial.partial = True
+    partial.partial_reason = "improve_failed"
+    partial.result_id = "abc123"
+    mock_bias_detector.analyze_comprehensive = AsyncMock(return_value=partial)
+
+    response = client.post("/analyze?partial=true", json={"text": BATCH_TEXT})
+
+    assert response.status_code == 200
+    assert response.json()["result_id"] == "abc123"
+    assert mock_bias_detector.analyze_comprehensive.call_args.kwargs["allow_partial"] is True
+
+def test_get_analysis_not_found(client, mock_bias_detector):
+    """Test fetching an unknown or expired result ID"""
+    mock_bias_detector.get_analysis = Mock(return_value=None)
+
+    response = client.get("/analyses/missing")
+
+    assert response.status_code == 404
+    assert response.json()["type"] == "not_found_error"
+
+def test_retry_improvement(client, mock_bias_detector):
+    """Test /analyses/{id}/improve completes a stored partial analysis"""
+    completed = _simple_result()
+    completed.result_id = "abc123"
+    mock_bias_detector.complete_improvement = AsyncMock(return_value=completed)
+
+    response = client.post("/analyses/abc123/improve")
+
+    assert response.status_code == 200
+    assert response.json()["partial"] is False
+    assert mock_bias_detector.complete_improvement.call_args.args[0] == "abc123"
+
+def test_retry_improvement_failures(client, mock_bias_detector):
+    """Test unknown IDs are 404 and a repeated improvement failure is 503"""
+    from app.services.bias_detector import ImprovementFailed
+    mock_bias_detector.complete_improvement = AsyncMock(side_effect=KeyError("missing"))
+    assert client.post("/analyses/missing/improve").status_code == 404
+
+    mock_bias_detector.complete_improvement = AsyncMock(side_effect=ImprovementFailed())
+    assert client.post("/analyses/abc123/improve").status_code == 503
+
+# Test stage and field selection
+def test_analyze_scores_only(client, mock_bias_detector):
+    """Test ?fields=scores runs only detection and returns only score fields"""
+    mock_bias_detector.analyze_comprehensive = AsyncMock(return_value=_simple_result())
+
+    response = client.post("/analyze?fields=scores", json={"text": BATCH_TEXT})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert "bias_score" in data
+    assert "issues" not in data
+    assert "improved_text" not in data
+    assert mock_bias_detector.analyze_comprehensive.call_args.kwargs["stages"] == {"detect"}
+
+def test_analyze_file_detect_stage_only(client, mock_text_extractor, mock_bias_detector):
+    """Test ?stages=detect on /analyze-file keeps the extracted text and detection fields"""
+    mock_text_extractor.extract_from_content = AsyncMock(return_value=TextExtractionResponse(
+        success=True,
+        extracted_text=BATCH_TEXT,
+        file_type="txt"
+    ))
+    mock_bias_detector.analyze_comprehensive = AsyncMock(return_value=_simple_result())
+
+    response = client.post("/analyze-file?stages=detect",
+                           files={'file': ('job.txt', BATCH_TEXT.encode(), 'text/plain')})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["extracted_text"] == BATCH_TEXT
+    assert "issues" in data["analysis"]
+    assert "suggestions" not in data["analysis"]
+
+def test_analyze_rejects_unknown_stage(client, mock_bias_detector):
+    """Test an invalid stages/fields selection is a validation error"""
+    response = client.post("/analyze?stages=translate", json={"text": BATCH_TEXT})
+
+    assert response.status_code == 400
+    assert "stages" in response.json()["message"]
+    mock_bias_detector.analyze_comprehensive.assert_not_called()
+
+def test_analyze_incremental_uses_incremental_detector(client, mock_bias_detector):
+    """Test ?incremental=true routes to the paragraph-level analysis"""
+    mock_bias_detector.analyze_incremental = AsyncMock(return_value=_simple_result())
+    mock_bias_detector.analyze_comprehensive = AsyncMock()
+
+    response = client.post("/analyze?incremental=true&stages=detect", json={"text": BATCH_TEXT})
+
+    assert response.status_code == 200
+    mock_bias_detector.analyze_comprehensive.assert_not_called()
+    assert mock_bias_detector.analyze_incremental.call_args.kwargs["stages"] == frozenset({"detect"})
+
+def test_live_analysis_sends_rules_then_analysis(client, mock_bias_detector):
+    """Test /ws/analyze pushes keyword hits at once and the Gemini analysis after the debounce"""
+    mock_bias_detector.detect_rule_based_bias = Mock(return_value=[])
+    mock_bias_detector.analyze_incremental = AsyncMock(return_value=_simple_result())
+
+    with patch('app.main.live_hub.debounce_seconds', 0.01):
+        with client.websocket_connect("/ws/analyze?fields=scores") as websocket:
+            websocket.send_json({"text": BATCH_TEXT, "revision": 7})
+            rules = websocket.receive_json()
+            analysis = websocket.receive_json()
+
+    assert rules == {"type": "rules", "revision": 7, "issues": []}
+    assert analysis["type"] == "analysis"
+    assert analysis["revision"] == 7
+    assert "issues" not in analysis["analysis"]
+    assert mock_bias_detector.analyze_incremental.call_args.kwargs["stages"] == frozenset({"detect"})
+
+def test_live_analysis_reports_bad_messages(client, mock_bias_detector):
+    """Test malformed messages and short texts come back as error messages without closing"""
+    mock_bias_detector.detect_rule_based_bias = Mock(return_value=[])
+
+    with patch('app.main.live_hub.debounce_seconds', 0.01):
+        with client.websocket_connect("/ws/analyze") as websocket:
+            websocket.send_text("not json")
+            malformed = websocket.receive_json()
+            websocket.send_json({"text": "too short"})
+            websocket.receive_json()
+            short = websocket.receive_json()
+
+    assert malformed["status_code"] == 400
+    assert short["type"] == "error"
+    assert short["error_type"] == "validation_error"
+    assert short["revision"] == 1
+
+def test_live_analysis_connection_limit(client):
+    """Test connections over LIVE_MAX_CONNECTIONS are closed with 1013"""
+    from starlette.websockets import WebSocketDisconnect
+
+    with patch('app.main.live_hub.max_connections', 0):
+        with client.websocket_connect("/ws/analyze") as websocket:
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                websocket.receive_json()
+
+    assert exc_info.value.code == 1013
@@ -0,0 +1,65 @@
+import threading
+from app.utils.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("stage_seconds", "Stage latency", ("stage",), buckets=(0.1, 1.0))
+
+    latency.observe(0.05, stage="ocr")
+    latency.observe(0.5, stage="ocr")
+    latency.observe(5.0, stage="ocr")
+
+    text = registry.render()
+    assert "# TYPE stage_seconds histogram" in text
+    assert 'stage_seconds_bucket{stage="ocr",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="ocr",le="1"} 2' in text
+    assert 'stage_seconds_bucket{stage="ocr",le="+Inf"} 3' in text
+    assert 'stage_seconds_sum{stage="ocr"} 5.55' in text
+    assert 'stage_seconds_count{stage="ocr"} 3' in text
+
+
+def test_histogram_time_records_on_error():
+    registry = MetricsRegistry()
+    latency = registry.histogram("stage_seconds", "Stage latency", ("stage",))
+
+    try:
+        with latency.time(stage="json_parse"):
+            raise ValueError("bad json")
+    except ValueError:
+        pass
+
+    assert latency.count(stage="json_parse") == 1
+
+
+def test_counter_and_gauge():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("path", "status"))
+    in_flight = registry.gauge("in_flight", "In flight")
+
+    requests.inc(path="/analyze", status=200)
+    requests.inc(path="/analyze", status=200)
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+
+    text = registry.render()
+    assert 'requests_total{path="/analyze",status="200"} 2' in text
+    assert "in_flight 1" in text
+
+
+def test_counter_is_thread_safe():
+    registry = MetricsRegistry()
+    counter = registry.counter("ocr_total", "OCR runs")
+
+    def work():
+        for _ in range(10000):
+            counter.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.value() == 40000
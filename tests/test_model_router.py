@@ -0,0 +1,91 @@
+import pytest
+from app.services.model_router import ModelRouter, ModelTier, StagePolicy
+from app.services.token_usage import TokenUsage
+
+
+@pytest.fixture
+def router():
+    return ModelRouter(
+        ModelTier("main", "gemini-2.5-flash", 0.30, 2.50),
+        ModelTier("fast", "gemini-2.5-flash-lite", 0.10, 0.40),
+        {
+            "detect_bias": StagePolicy(max_chars=100),
+            "improve_language": StagePolicy(max_chars=100, max_issues=1)
+        }
+    )
+
+
+def _detection(**overrides):
+    result = {
+        "role": "Software Engineer",
+        "issues": [{"type": "gender", "text": "salesman"}],
+        "bias_score": 0.2
+    }
+    result.update(overrides)
+    return result
+
+
+def test_short_input_goes_to_fast_tier(router):
+    assert router.choose("detect_bias", "Hiring a nurse.").name == "fast"
+    assert router.choose("detect_bias", "x" * 101).name == "main"
+
+
+def test_improve_language_with_many_issues_stays_on_main(router):
+    assert router.choose("improve_language", "short", issue_count=1).name == "fast"
+    assert router.choose("improve_language", "short", issue_count=2).name == "main"
+
+
+def test_stage_without_policy_stays_on_main(router):
+    assert router.choose("summarize", "short").name == "main"
+
+
+def test_from_env_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("MODEL_ROUTING", raising=False)
+    assert ModelRouter.from_env("gemini-2.5-flash") is None
+
+
+def test_from_env_reads_stage_policies(monkeypatch):
+    monkeypatch.setenv("MODEL_ROUTING", "true")
+    monkeypatch.setenv("FAST_MODEL", "gemini-2.0-flash-lite")
+    monkeypatch.setenv("ROUTE_DETECT_BIAS_MAX_CHARS", "0")
+    monkeypatch.setenv("ROUTE_IMPROVE_LANGUAGE_MAX_ISSUES", "5")
+
+    router = ModelRouter.from_env("gemini-2.5-flash")
+
+    assert router.fast.model_name == "gemini-2.0-flash-lite"
+    assert router.choose("detect_bias", "short").name == "main"
+    assert router.policies["improve_language"].max_issues == 5
+
+
+@pytest.mark.parametrize("result, reason", [
+    (_detection(), None),
+    (_detection(role="N/A", bias_score="N/A", issues=[]), None),
+    (_detection(bias_score=0.5), "ambiguous"),
+    (_detection(bias_score="high"), "incomplete"),
+    (_detection(issues=[{"type": "gender"}]), "incomplete"),
+    ({"role": "Engineer"}, "incomplete"),
+    (["not", "an", "object"], "malformed"),
+])
+def test_detect_bias_escalation_reason(router, result, reason):
+    assert router.escalation_reason("detect_bias", result) == reason
+
+
+def test_improve_language_without_suggestions_for_detected_issues_is_ambiguous(router):
+    result = {"suggestions": [], "improved_text": "Rewritten posting"}
+
+    assert router.escalation_reason("improve_language", result, issue_count=1) == "ambiguous"
+    assert router.escalation_reason("improve_language", result, issue_count=0) is None
+
+
+def test_snapshot_splits_latency_and_cost_by_tier(router):
+    usage = TokenUsage("detect_bias", prompt_tokens=1_000_000, response_tokens=100_000, static_prompt_tokens=0)
+    router.record("detect_bias", router.fast, 200.0, usage)
+    router.record("detect_bias", router.main, 900.0, usage)
+    router.record_escalation("detect_bias", "ambiguous")
+
+    calls = router.snapshot()["calls"]["detect_bias"]
+
+    assert calls["fast"] == {"calls": 1, "avg_ms": 200.0, "prompt_tokens": 1_000_000,
+                             "response_tokens": 100_000, "cost_usd": 0.14}
+    assert calls["main"]["cost_usd"] == 0.55
+    assert calls["escalations"] == {"ambiguous": 1}
@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from app.services.near_duplicate import MinHasher, NearDuplicateIndex, value_nbytes
+
+random.seed(7)
+VOCABULARY = [f"word{i}" for i in range(2000)]
+
+
+def _text(words: int = 300) -> str:
+    return " ".join(random.choice(VOCABULARY) for _ in range(words))
+
+
+def _repost(text: str) -> str:
+    """The same posting with a changed date line"""
+    words = text.split()
+    words[20:24] = ["posted", "on", "june", "3rd"]
+    return " ".join(words)
+
+
+def test_signature_similarity_estimates_jaccard():
+    hasher = MinHasher(num_perm=256)
+    text = _text()
+
+    same = (hasher.signature(text) == hasher.signature(text.replace(" ", "  \n"))).mean()
+    repost = (hasher.signature(text) == hasher.signature(_repost(text))).mean()
+    unrelated = (hasher.signature(text) == hasher.signature(_text())).mean()
+
+    assert same == 1.0
+    assert repost > 0.9
+    assert unrelated < 0.1
+
+
+def test_query_finds_reposts_only():
+    index = NearDuplicateIndex(capacity=100)
+    texts = [_text() for _ in range(50)]
+    for i, text in enumerate(texts):
+        index.add(text, i)
+
+    similarity, value = index.query(_repost(texts[17]))
+
+    assert value == 17
+    assert similarity >= index.threshold
+    assert index.query(_text()) is None
+    assert (index.hits, index.misses) == (1, 1)
+
+
+def test_oldest_entries_are_overwritten():
+    index = NearDuplicateIndex(capacity=4)
+    texts = [_text() for _ in range(10)]
+    for i, text in enumerate(texts):
+        index.add(text, i)
+
+    assert len(index) == 4
+    assert index.query(texts[0]) is None
+    assert index.query(texts[9])[1] == 9
+    assert index.query(texts[6])[1] == 6
+
+
+def test_memory_is_allocated_up_front():
+    small, large = NearDuplicateIndex(capacity=1000), NearDuplicateIndex(capacity=2000)
+    before = small.nbytes
+    for _ in range(20):
+        small.add(_text(50), None)
+
+    assert small.nbytes == before
+    assert large.nbytes == pytest.approx(2 * small.nbytes, rel=0.01)
+
+
+def test_values_are_evicted_oldest_first_past_their_budget():
+    value = "x" * 1000
+    index = NearDuplicateIndex(capacity=100, max_value_bytes=3 * value_nbytes(value))
+    texts = [_text() for _ in range(5)]
+    for text in texts:
+        index.add(text, value)
+
+    assert len(index) == 3
+    assert index.value_bytes <= index.max_value_bytes
+    assert index.query(texts[1]) is None
+    assert index.query(texts[2])[1] == value
+    assert not index.add(_text(), "x" * 4000)
+
+
+def test_bands_must_divide_signature():
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(num_perm=64, bands=10)
@@ -0,0 +1,30 @@
+from app.utils.offset_map import MappedTextBuilder
+
+
+def test_copied_pieces_map_one_to_one():
+    original = "Intro.\n\n\nSkip me.\n\nKeep this."
+    builder = MappedTextBuilder(original)
+    builder.copy(0, 6)
+    builder.insert("\n\n", 19)
+    builder.copy(19, 29)
+    derived, offsets = builder.build()
+
+    assert derived == "Intro.\n\nKeep this."
+    start = derived.index("this")
+    assert original[slice(*offsets.span_to_original(start, start + 4))] == "this"
+    assert offsets.to_original(0) == 0
+    assert offsets.to_original(len(derived)) == len(original)
+
+
+def test_inserted_pieces_map_to_their_position():
+    original = "a   \n  b"
+    builder = MappedTextBuilder(original)
+    builder.copy(0, 1)
+    builder.insert(" ", 1)
+    builder.copy(7, 8)
+    derived, offsets = builder.build()
+
+    assert derived == "a b"
+    assert offsets.to_original(1) == 1
+    assert offsets.span_to_original(0, 3) == (0, 8)
+    assert offsets.span_to_original(2, 2) == (7, 7)
@@ -0,0 +1,99 @@
+import pytest
+from unittest.mock import MagicMock
+from app.services.prompt_cache import LocalContextCacheBackend, PromptCacheManager
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def backend(clock):
+    return LocalContextCacheBackend(MagicMock(), clock=clock)
+
+
+@pytest.fixture
+def manager(backend, clock):
+    return PromptCacheManager(backend, "gemini-2.5-flash", ttl_seconds=600,
+                              refresh_margin_seconds=60, retry_seconds=30, clock=clock)
+
+
+@pytest.mark.asyncio
+async def test_creates_once_and_reuses(manager, backend):
+    first = await manager.model_for("detect_bias", "INSTRUCTIONS")
+    second = await manager.model_for("detect_bias", "INSTRUCTIONS")
+
+    assert first is second
+    assert [op[0] for op in backend.operations] == ["create"]
+
+
+@pytest.mark.asyncio
+async def test_cached_model_prepends_instructions(manager, backend):
+    model = await manager.model_for("detect_bias", "INSTRUCTIONS\n")
+    model.generate_content("Job Description: ...", generation_config="cfg")
+
+    backend.base_model.generate_content.assert_called_once_with(
+        "INSTRUCTIONS\nJob Description: ...", generation_config="cfg"
+    )
+
+
+@pytest.mark.asyncio
+async def test_refreshes_ttl_near_expiry(manager, backend, clock):
+    await manager.model_for("detect_bias", "INSTRUCTIONS")
+    clock.now += 560  # 40s left, inside the 60s margin
+
+    await manager.model_for("detect_bias", "INSTRUCTIONS")
+
+    assert [op[0] for op in backend.operations] == ["create", "refresh"]
+    assert manager.snapshot()["detect_bias"]["expires_in_seconds"] == 600
+
+
+@pytest.mark.asyncio
+async def test_recreates_when_prompt_changes(manager, backend):
+    await manager.model_for("detect_bias", "OLD INSTRUCTIONS")
+    await manager.model_for("detect_bias", "NEW INSTRUCTIONS")
+
+    assert [op[0] for op in backend.operations] == ["create", "delete", "create"]
+
+
+@pytest.mark.asyncio
+async def test_recreates_after_expiry(manager, backend, clock):
+    await manager.model_for("detect_bias", "INSTRUCTIONS")
+    clock.now += 700
+
+    await manager.model_for("detect_bias", "INSTRUCTIONS")
+
+    assert [op[0] for op in backend.operations] == ["create", "create"]
+
+
+@pytest.mark.asyncio
+async def test_creation_failure_falls_back_and_backs_off(manager, backend, clock):
+    backend.create = MagicMock(side_effect=RuntimeError("content too small to cache"))
+
+    assert await manager.model_for("detect_bias", "INSTRUCTIONS") is None
+    assert await manager.model_for("detect_bias", "INSTRUCTIONS") is None
+    assert backend.create.call_count == 1
+
+    clock.now += 31
+    await manager.model_for("detect_bias", "INSTRUCTIONS")
+    assert backend.create.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_close_deletes_entries(manager, backend):
+    await manager.model_for("detect_bias", "A")
+    await manager.model_for("improve_language", "B")
+
+    await manager.close()
+
+    assert sorted(op[0] for op in backend.operations) == ["create", "create", "delete", "delete"]
+    assert manager.snapshot() == {}
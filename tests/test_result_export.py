@@ -0,0 +1,57 @@
+import pytest
+
+from app.models.schemas import BatchResultLine, BiasAnalysisResult, BiasIssue, Suggestion
+from app.services.result_export import ANALYSES_FILE, ISSUES_FILE, ParquetResultWriter, export_results, read_results
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def _result(n_issues: int, bias_score=0.4) -> BiasAnalysisResult:
+    return BiasAnalysisResult(
+        role="Cook",
+        industry="Hospitality",
+        bias_score=bias_score,
+        inclusivity_score=0.6 if bias_score != "N/A" else "N/A",
+        clarity_score=0.9 if bias_score != "N/A" else "N/A",
+        issues=[BiasIssue(type="age", text=f"young {i}", start_index=i, end_index=i + 7, severity="medium",
+                          explanation="Age-coded") for i in range(n_issues)],
+        suggestions=[Suggestion(original="young", improved="motivated", rationale="Neutral", category="inclusivity")]
+        if n_issues else [],
+        seo_keywords=["line cook"],
+        improved_text="We need a motivated cook.",
+        overall_assessment="Some age-coded wording"
+    )
+
+
+def test_round_trip_across_row_groups(tmp_path):
+    results = [(f"job-{i}", _result(i % 3)) for i in range(7)] + [("not-a-job", _result(0, "N/A"))]
+
+    with ParquetResultWriter(str(tmp_path), row_group_size=3) as writer:
+        for analysis_id, result in results:
+            writer.write(analysis_id, result)
+
+    assert list(read_results(str(tmp_path), batch_size=2)) == results
+    assert pq.ParquetFile(tmp_path / ANALYSES_FILE).metadata.num_row_groups == 3
+    table = pq.read_table(tmp_path / ISSUES_FILE)
+    assert table.num_rows == sum(i % 3 for i in range(7))
+    assert table.column("analysis_id").to_pylist()[:3] == ["job-1", "job-2", "job-2"]
+
+
+def test_repeated_ids_keep_their_own_issues(tmp_path):
+    with ParquetResultWriter(str(tmp_path)) as writer:
+        writer.write("job", _result(1))
+        writer.write("job", _result(2))
+
+    assert [len(result.issues) for _, result in read_results(str(tmp_path))] == [1, 2]
+
+
+def test_export_from_batch_lines_skips_failures(tmp_path):
+    lines = [
+        BatchResultLine(id="a", success=True, result=_result(1)).model_dump_json(),
+        BatchResultLine(id="b", success=False, error={"message": "Empty file provided", "status_code": 400,
+                                                      "type": "validation_error"}).model_dump_json(),
+        ""
+    ]
+
+    assert export_results(lines, str(tmp_path / "export")) == (1, 1)
+    assert [analysis_id for analysis_id, _ in read_results(str(tmp_path / "export"))] == ["a"]
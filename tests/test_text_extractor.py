@@ -329,4 +329,55 @@ async def test_static_txt_extraction_unicode_error():
     
     result = TextExtractor._extract_from_txt(txt_content)
     assert isinstance(result, str)
-    # Should handle the encoding error gracefully
\ No newline at end of file
+    # Should handle the encoding error gracefully
+
+def _make_multipage_tiff(sizes):
+    """Build an in-memory multi-page TIFF with one frame per size"""
+    from PIL import Image
+    frames = [Image.new("RGB", size, "white") for size in sizes]
+    buffer = io.BytesIO()
+    frames[0].save(buffer, format="TIFF", save_all=True, append_images=frames[1:])
+    return buffer.getvalue()
+
+@pytest.mark.asyncio
+async def test_extract_from_multipage_tiff():
+    # Every page of a multi-page TIFF goes through one batched OCR call
+    extractor = TextExtractor()
+    tiff_content = _make_multipage_tiff([(200, 100), (200, 100), (150, 80)])
+
+    with patch.object(extractor, 'reader') as mock_reader:
+        mock_reader.readtext_batched.return_value = [
+            [([(0, 0), (10, 0), (10, 10), (0, 10)], "Page one", 0.9)],
+            [([(0, 0), (10, 0), (10, 10), (0, 10)], "Page two", 0.9)],
+            [([(0, 0), (10, 0), (10, 10), (0, 10)], "Page three", 0.9)],
+        ]
+
+        result = await extractor.extract_from_content(tiff_content, "fax.tiff")
+        assert result.success is True
+        assert result.file_type == "tiff"
+        assert result.extracted_text == "Page one\n\nPage two\n\nPage three"
+
+        mock_reader.readtext.assert_not_called()
+        frames = mock_reader.readtext_batched.call_args[0][0]
+        assert len(frames) == 3
+        # Smaller pages are padded so the batch has a single shape
+        assert all(frame.shape == (100, 200, 3) for frame in frames)
+
+@pytest.mark.asyncio
+async def test_extract_from_multipage_tiff_frame_cap():
+    # Only the first OCR_MAX_FRAMES frames are OCRed and the truncation is reported
+    extractor = TextExtractor()
+    extractor.max_frames = 2
+    tiff_content = _make_multipage_tiff([(50, 50)] * 3)
+
+    with patch.object(extractor, 'reader') as mock_reader:
+        mock_reader.readtext_batched.return_value = [
+            [([(0, 0), (10, 0), (10, 10), (0, 10)], "Page one", 0.9)],
+            [([(0, 0), (10, 0), (10, 10), (0, 10)], "Page two", 0.9)],
+        ]
+
+        result = await extractor.extract_from_content(tiff_content, "fax.tif")
+        assert result.success is True
+        assert result.extracted_text == "Page one\n\nPage two"
+        assert "only the first 2 were processed" in result.warning
+        assert len(mock_reader.readtext_batched.call_args[0][0]) == 2
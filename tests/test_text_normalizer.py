@@ -0,0 +1,54 @@
+from app.utils.text_normalizer import normalize_text
+
+EXTRACTED = (
+    "ACME Corp | Careers\n"
+    "We  are   hiring a\tsenior engineer to lead develop-\n"
+    "ment of our platform.   \n"
+    "\n"
+    "Page 1 of 2\n"
+    "ACME Corp | Careers\n"
+    "\n"
+    "You will mentor a small team.\n"
+    "\n\n\n"
+    "Apply with your CV.\n"
+    "- 2 -\n"
+    "ACME Corp | Careers\n"
+)
+
+
+def test_whitespace_hyphenation_and_furniture():
+    normalized = normalize_text(EXTRACTED)
+
+    assert normalized.text == (
+        "We are hiring a senior engineer to lead development of our platform.\n\n"
+        "You will mentor a small team.\n\n"
+        "Apply with your CV."
+    )
+
+
+def test_offsets_point_into_the_original():
+    normalized = normalize_text(EXTRACTED)
+
+    for phrase, original in (("senior engineer", "senior engineer"), ("development", "develop-\nment"),
+                             ("We are hiring", "We  are   hiring"), ("mentor", "mentor")):
+        start = normalized.text.index(phrase)
+        span = normalized.offsets.span_to_original(start, start + len(phrase))
+        assert EXTRACTED[slice(*span)] == original
+
+
+def test_page_break_in_mid_sentence_is_closed_up():
+    text = "Build tools that help our cus-\n\nPage 3\n\ntomers every day.\n\nPage 4"
+
+    assert normalize_text(text).text == "Build tools that help our customers every day."
+
+
+def test_hyphens_before_capitals_and_lines_repeated_less_often_are_kept():
+    text = "Experience with Python-\nBased tooling.\nRequirements:\nRequirements:"
+
+    assert normalize_text(text).text == text
+
+
+def test_clean_text_is_unchanged():
+    text = "A short posting.\n\nWith two paragraphs."
+
+    assert normalize_text(text).text == text
@@ -0,0 +1,77 @@
+import pytest
+from unittest.mock import MagicMock
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.services.token_usage import (
+    TokenUsage, TokenUsageMiddleware, UsageReport, format_usage_header, record_usage
+)
+
+
+def _response(prompt_tokens=None, response_tokens=None, cached_tokens=None):
+    response = MagicMock()
+    if prompt_tokens is not None:
+        response.usage_metadata.prompt_token_count = prompt_tokens
+        response.usage_metadata.candidates_token_count = response_tokens
+        response.usage_metadata.cached_content_token_count = cached_tokens
+    return response
+
+
+def test_from_response_uses_reported_counts():
+    usage = TokenUsage.from_response("detect_bias", _response(1000, 200, 0), "p" * 4000, "r" * 800, static_chars=3000)
+
+    assert usage.prompt_tokens == 1000
+    assert usage.response_tokens == 200
+    assert usage.static_prompt_tokens == 750
+    assert usage.user_prompt_tokens == 250
+    assert usage.estimated is False
+
+
+def test_from_response_estimates_for_fake_backends():
+    # MagicMock metadata fields are not ints, so the counts are estimated from text
+    usage = TokenUsage.from_response("improve_language", _response(), "p" * 400, "r" * 80, static_chars=100)
+
+    assert usage.prompt_tokens == 100
+    assert usage.response_tokens == 20
+    assert usage.static_prompt_tokens == 25
+    assert usage.estimated is True
+
+
+def test_usage_report_static_fraction():
+    report = UsageReport()
+    report.record(TokenUsage("detect_bias", 1000, 100, 900))
+    report.record(TokenUsage("detect_bias", 1000, 100, 700))
+
+    snapshot = report.snapshot()["detect_bias"]
+    assert snapshot["calls"] == 2
+    assert snapshot["prompt_tokens"] == 2000
+    assert snapshot["user_prompt_tokens"] == 400
+    assert snapshot["static_fraction"] == 0.8
+
+
+def test_format_usage_header_marks_estimates():
+    header = format_usage_header([
+        TokenUsage("detect_bias", 1000, 100, 900),
+        TokenUsage("improve_language", 50, 10, 40, estimated=True)
+    ])
+    assert header == (
+        "detect_bias;prompt=1000;static=900;response=100, "
+        "improve_language;prompt=50;static=40;response=10;estimated"
+    )
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_middleware_adds_header_when_enabled(enabled):
+    app = FastAPI()
+
+    @app.get("/call")
+    async def call():
+        record_usage(TokenUsage("detect_bias", 120, 30, 100))
+        return {"ok": True}
+
+    client = TestClient(TokenUsageMiddleware(app, enabled=enabled))
+    response = client.get("/call")
+
+    if enabled:
+        assert response.headers["X-Token-Usage"] == "detect_bias;prompt=120;static=100;response=30"
+    else:
+        assert "X-Token-Usage" not in response.headers
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import pytest
+from app.utils import tracing
+from app.utils.tracing import InMemoryExporter, JsonLinesExporter, span, traced
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemoryExporter()
+    tracing.set_exporter(exporter)
+    yield exporter
+    tracing.set_exporter(None)
+
+
+def test_spans_nest_and_export_once_per_trace(exporter):
+    with span("root", kind="test") as root:
+        with span("child") as child:
+            child.set(tokens=12)
+
+    assert [s.name for s in exporter.spans] == ["child", "root"]
+    child_span, root_span = exporter.spans
+    assert child_span.parent_id == root_span.span_id
+    assert child_span.trace_id == root_span.trace_id
+    assert child_span.attributes == {"tokens": 12}
+    assert root.attributes == {"kind": "test"}
+    assert root_span.duration_ms >= child_span.duration_ms
+
+
+@pytest.mark.asyncio
+async def test_traced_covers_async_functions_and_worker_threads(exporter):
+    @traced("ocr")
+    def ocr():
+        return "text"
+
+    @traced("extract")
+    async def extract():
+        return await asyncio.to_thread(ocr)
+
+    assert await extract() == "text"
+    names = {s.name: s for s in exporter.spans}
+    assert names["ocr"].parent_id == names["extract"].span_id
+
+
+def test_span_records_errors(exporter):
+    with pytest.raises(ValueError):
+        with span("json_parse"):
+            raise ValueError("bad json")
+
+    assert exporter.spans[0].error == "ValueError: bad json"
+
+
+def test_span_is_noop_without_exporter():
+    tracing.set_exporter(None)
+    with span("anything") as current:
+        assert current is None
+
+
+def test_json_lines_exporter_appends(tmp_path, exporter):
+    path = tmp_path / "traces.jsonl"
+    tracing.set_exporter(JsonLinesExporter(str(path)))
+
+    with span("first"):
+        pass
+    with span("second"):
+        pass
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["first", "second"]
+    assert lines[0]["trace_id"] != lines[1]["trace_id"]
+
+
+def test_request_id_is_echoed_and_used_as_trace_id(exporter, tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    monkeypatch.setenv("JOB_DB_PATH", str(tmp_path / "jobs.db"))
+
+    with TestClient(app) as client:
+        response = client.get("/health", headers={"X-Request-ID": "req-123"})
+        generated = client.get("/health")
+
+    assert response.headers["X-Request-ID"] == "req-123"
+    assert len(generated.headers["X-Request-ID"]) == 32
+    root = next(s for s in exporter.spans if s.trace_id == "req-123")
+    assert root.name == "http.request"
+    assert root.attributes["status"] == 200